@@ -14,7 +14,14 @@ from alembic import context
 from app.core.settings import get_settings
 
 # Import all schemas so SQLModel.metadata is populated for autogenerate.
-from app.schemas import Goal, GoalCompletion, User  # noqa: F401
+from app.schemas import (  # noqa: F401
+    Goal,
+    GoalCompletion,
+    RefreshSession,
+    StravaActivity,
+    StravaBackfillJob,
+    User,
+)
 
 config = context.config
 
@@ -0,0 +1,56 @@
+"""add backfill job leases and one completion per goal and Strava activity
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-20
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f6a7b8c9d0e1"
+down_revision: str | Sequence[str] | None = "e5f6a7b8c9d0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "strava_backfill_jobs",
+        sa.Column("lease_owner", sqlmodel.sql.sqltypes.AutoString(length=128), nullable=True),
+    )
+    op.add_column(
+        "strava_backfill_jobs",
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    # Concurrent syncs could record the same activity twice; keep the oldest copy.
+    op.execute(
+        """
+        DELETE FROM goal_completions a
+        USING goal_completions b
+        WHERE a.strava_activity_id IS NOT NULL
+          AND a.goal_id = b.goal_id
+          AND a.strava_activity_id = b.strava_activity_id
+          AND (a.created_at, a.id) > (b.created_at, b.id)
+        """
+    )
+    op.create_index(
+        "uq_goal_completions_goal_activity",
+        "goal_completions",
+        ["goal_id", "strava_activity_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_goal_completions_goal_activity", table_name="goal_completions")
+    op.drop_column("strava_backfill_jobs", "lease_expires_at")
+    op.drop_column("strava_backfill_jobs", "lease_owner")
@@ -4,37 +4,501 @@ Usage in route handlers / services:
 
     async def my_route(session: AsyncSession = Depends(get_session)):
         ...
+
+Read-only routes depend on ``get_read_session`` instead (with
+``get_current_reader`` for the principal):
+
+    async def my_get(
+        session: AsyncSession = Depends(get_read_session, scope="function"),
+        current_user: User = Depends(get_current_reader),
+    ): ...
+
+Its transactions are ``READ ONLY`` on PostgreSQL and are never committed, and
+``scope="function"`` returns the connection to the pool as soon as the
+endpoint has produced its response instead of after it has been sent.  When a
+replica is configured (``POSTGRES_REPLICA_HOST``) its queries go to the
+replica unless the replica lags by more than ``DB_REPLICA_MAX_LAG_SECONDS`` or
+the current user committed a write within that window (read-your-writes).
+The write is remembered in this process and, because the next request may
+land on another worker or pod, in a short-lived ``db_read_primary`` cookie set
+on the response to the writing request; either one sends reads to the primary.
+
+Sessions check out a connection on their first query.  Routers built with
+``route_class=SessionReleasingRoute`` also hand it back as soon as the endpoint
+returns (write sessions commit, read sessions close) rather than holding it
+through response serialization and sending; ``db_connection_hold_seconds``
+shows how long connections stay checked out.
 """
 
-from collections.abc import AsyncGenerator
+import functools
+import inspect
+import math
+import time
+import uuid
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import structlog
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import URL, event, exc, make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel import SQLModel
 
+from app.core.metrics import registry
+from app.core.principal_cache import TTLCache
 from app.core.settings import Settings
+from app.core.tracing import start_span, tracing_enabled
+
+logger = structlog.get_logger()
 
 # Module-level engine & session factory — initialised at startup via `init_db`.
 _engine = None
 _async_session_factory = None
+_replica_engine: AsyncEngine | None = None
+_read_session_factory = None
+# Read-only views of the engines ("primary" / "replica") used by RoutingSession.
+_read_binds: dict = {}
+
+
+# ── Pool telemetry ───────────────────────────────────────────────────────────
+
+POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for (or opening) a pooled connection",
+)
+POOL_CHECKOUT_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after db_pool_timeout seconds",
+)
+POOL_PINGS = registry.counter("db_pool_pings_total", "Liveness pings issued on checkout")
+CONNECTION_HOLD = registry.histogram(
+    "db_connection_hold_seconds", "Time a connection stays checked out of the pool"
+)
+
+
+def _pool_stat(name: str) -> float:
+    pool = _engine.pool if _engine is not None else None
+    return getattr(pool, name)() if pool is not None and hasattr(pool, name) else 0
+
+
+registry.gauge("db_pool_size", "Configured persistent connections", lambda: _pool_stat("size"))
+registry.gauge(
+    "db_pool_checked_out", "Connections currently in use", lambda: _pool_stat("checkedout")
+)
+registry.gauge(
+    "db_pool_checked_in", "Idle connections held by the pool", lambda: _pool_stat("checkedin")
+)
+registry.gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (negative: unused)",
+    lambda: _pool_stat("overflow"),
+)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records checkout waits and timeouts."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+        return connection
+
+
+def _install_hold_timer(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _checked_out(dbapi_connection, record, proxy) -> None:
+        record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _checked_in(dbapi_connection, record) -> None:
+        checked_out_at = record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            CONNECTION_HOLD.observe(time.perf_counter() - checked_out_at)
+
+
+def _install_idle_pre_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    """Ping only connections that sat idle for *idle_seconds*; fresh ones skip the round trip."""
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def _checked_in(dbapi_connection, record) -> None:
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _checked_out(dbapi_connection, record, proxy) -> None:
+        checked_in_at = record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        POOL_PINGS.inc()
+        try:
+            alive = engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            # The pool discards this connection and retries with a new one.
+            raise exc.DisconnectionError("Idle connection failed liveness ping")
+
+
+def pool_options(settings: Settings) -> dict:
+    """Engine keyword arguments for the configured pool."""
+    if settings.db_pool_pre_ping not in ("always", "idle", "never"):
+        raise ValueError(f"Unknown DB_POOL_PRE_PING strategy: {settings.db_pool_pre_ping!r}")
+    return {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping == "always",
+    }
 
 
-def init_db(settings: Settings) -> None:
-    """Create the async engine and session factory.  Call once at startup."""
-    global _engine, _async_session_factory
+def engine_url(settings: Settings, url: str | None = None) -> URL:
+    """The database URL, with asyncpg's prepared-statement cache sized from settings."""
+    parsed = make_url(url or settings.database_url)
+    if parsed.drivername == "postgresql+asyncpg":
+        # SQLAlchemy keeps an LRU of asyncpg prepared statements per connection,
+        # keyed by SQL string; the app's hot statements must all fit.
+        parsed = parsed.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.db_statement_cache_size)}
+        )
+    return parsed
 
-    _engine = create_async_engine(
-        settings.database_url,
+
+# ── Query telemetry ──────────────────────────────────────────────────────────
+
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "Time from sending a statement to its cursor returning"
+)
+
+
+@dataclass(slots=True)
+class QueryTally:
+    """Statements executed (and time spent in them) within one `track_queries` block.
+
+    Blocks nest: a statement counts towards every enclosing tally, so a test
+    can put a budget around a request that the app tallies itself.
+    """
+
+    count: int = 0
+    seconds: float = 0.0
+    # Statement text -> executions; an N+1 loop shows up as one large count.
+    statements: dict[str, int] = field(default_factory=dict)
+    parent: "QueryTally | None" = None
+
+
+_query_tally: ContextVar[QueryTally | None] = ContextVar("query_tally", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryTally]:
+    """Tally the statements run in this context, e.g. for one request."""
+    tally = QueryTally(parent=_query_tally.get())
+    token = _query_tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _query_tally.reset(token)
+
+
+def current_query_tally() -> QueryTally | None:
+    """The innermost active tally, if any."""
+    return _query_tally.get()
+
+
+def install_query_timer(engine: AsyncEngine, n_plus_one_threshold: int = 0) -> None:
+    """Time every statement on *engine* and add it to the active tallies.
+
+    With *n_plus_one_threshold* set, the same statement running that many
+    times within one tally logs an ``n_plus_one_suspected`` warning (once).
+    """
+
+    # The sync events run in the caller's greenlet, so the request's context is visible.
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if tracing_enabled():
+            conn.info["query_span"] = start_span(
+                statement.split(None, 1)[0] if statement else "SQL",
+                {"db.system": engine.dialect.name, "db.statement": statement[:1000]},
+                kind="client",
+            )
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        started_at = conn.info.pop("query_started_at", None)
+        if started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+        if (span := conn.info.pop("query_span", None)) is not None:
+            span.end()
+        DB_QUERY_DURATION.observe(elapsed)
+        tally = _query_tally.get()
+        if tally is None:
+            return
+        if tally.statements.get(statement, 0) + 1 == n_plus_one_threshold:
+            logger.warning(
+                "n_plus_one_suspected", statement=statement[:200], executions=n_plus_one_threshold
+            )
+        while tally is not None:
+            tally.count += 1
+            tally.seconds += elapsed
+            tally.statements[statement] = tally.statements.get(statement, 0) + 1
+            tally = tally.parent
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _failed(context) -> None:
+        conn = context.connection
+        if conn is None:
+            return
+        conn.info.pop("query_started_at", None)
+        if (span := conn.info.pop("query_span", None)) is not None:
+            span.record_error(context.original_exception)
+            span.end()
+
+
+def create_engine(settings: Settings, url: str | None = None) -> AsyncEngine:
+    """Create an async engine with the configured, instrumented pool."""
+    engine = create_async_engine(
+        engine_url(settings, url),
         echo=settings.echo_db,
-        pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10,
+        **pool_options(settings),
     )
+    _install_hold_timer(engine)
+    install_query_timer(engine, settings.db_n_plus_one_threshold)
+    if settings.db_pool_pre_ping == "idle":
+        _install_idle_pre_ping(engine, settings.db_pool_pre_ping_idle_seconds)
+    return engine
+
+
+# ── Read replica routing ─────────────────────────────────────────────────────
+
+READ_SESSIONS = registry.counter(
+    "db_read_sessions_total", "Read-only sessions by the engine that served them"
+)
+REPLICA_LAG = registry.gauge("db_replica_lag_seconds", "Last measured replica replay lag")
+
+# Set on responses to requests that committed a write; shared by every worker.
+READ_PRIMARY_COOKIE = "db_read_primary"
+
+# user_id -> commit time; a user listed here reads from the primary (this process only).
+_recent_writers: TTLCache[uuid.UUID, float] = TTLCache(100_000)
+_max_lag_seconds = 5.0
+_lag_check_seconds = 5.0
+_lag_checked_at = float("-inf")
+_lag_seconds = 0.0
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_write(orm_execute_state) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+def note_write(user_id: uuid.UUID) -> None:
+    """Pin *user_id*'s reads to the primary until the replica has surely caught up."""
+    _recent_writers.set(user_id, time.monotonic(), _max_lag_seconds)
+
+
+@event.listens_for(Session, "after_commit")
+def _note_committed_write(session: Session) -> None:
+    # At commit, not when the dependency exits: release_request_sessions commits
+    # before the response is sent, and the client's next read must see the write.
+    # get_current_user tags the session with its principal.
+    if session.info.pop("wrote", False):
+        session.info["committed_write"] = True
+        if user_id := session.info.get("user_id"):
+            note_write(user_id)
+
+
+def pin_to_primary(response: Response) -> None:
+    """Have this client's reads skip the replica for as long as it may lag."""
+    response.set_cookie(
+        READ_PRIMARY_COOKIE, "1", max_age=math.ceil(_max_lag_seconds), httponly=True, samesite="lax"
+    )
+
+
+async def measure_replica_lag(engine: AsyncEngine) -> float:
+    """Seconds the replica's replay trails the primary (0 for non-PostgreSQL stand-ins)."""
+    if engine.dialect.name != "postgresql":
+        return 0.0
+    async with engine.connect() as conn:
+        # An idle primary stops producing WAL, so "caught up" must not read as lag.
+        lag = await conn.scalar(
+            text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            )
+        )
+    return float(lag or 0.0)
+
+
+async def replica_is_fresh() -> bool:
+    """Whether the replica's lag is within bounds, re-measured at most every few seconds."""
+    global _lag_checked_at, _lag_seconds
+    if _replica_engine is None:
+        return False
+    now = time.monotonic()
+    if now - _lag_checked_at >= _lag_check_seconds:
+        _lag_checked_at = now
+        try:
+            _lag_seconds = await measure_replica_lag(_replica_engine)
+        except Exception:
+            logger.warning("replica_lag_check_failed", exc_info=True)
+            _lag_seconds = float("inf")
+        REPLICA_LAG.set(_lag_seconds)
+    return _lag_seconds <= _max_lag_seconds
+
+
+class RoutingSession(Session):
+    """Session that picks primary or replica on its first query and sticks with it.
+
+    Deferring the choice to ``get_bind`` lets authentication dependencies run
+    first, so the current user (``request.state.user_id``) is known when the
+    read-your-writes check happens.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        target = self.info.get("target")
+        if target is None:
+            target = "replica" if self.info.get("replica_ok") else "primary"
+            request = self.info.get("request")
+            if target == "replica" and request is not None and _wrote_recently(request):
+                target = "primary"
+            self.info["target"] = target
+            READ_SESSIONS.inc(target=target)
+        return _read_binds[target]
+
+
+def _wrote_recently(request: Request) -> bool:
+    if READ_PRIMARY_COOKIE in request.cookies:
+        return True
+    user_id = getattr(request.state, "user_id", None)
+    return user_id is not None and _recent_writers.get(user_id) is not None
+
+
+def init_db(settings: Settings, *, url: str | None = None, replica_url: str | None = None) -> None:
+    """Create the async engine(s) and session factories.  Call once at startup."""
+    global _engine, _async_session_factory, _replica_engine, _read_session_factory
+    global _max_lag_seconds, _lag_check_seconds, _lag_checked_at
+
+    _engine = create_engine(settings, url)
     _async_session_factory = sessionmaker(
         bind=_engine,
         class_=AsyncSession,
         expire_on_commit=False,
     )
+    logger.info(
+        "db_pool_configured",
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pre_ping=settings.db_pool_pre_ping,
+    )
+
+    replica_url = replica_url or settings.replica_database_url
+    _replica_engine = create_engine(settings, replica_url) if replica_url else None
+    # asyncpg opens these transactions with BEGIN READ ONLY (no extra round trip);
+    # other dialects ignore the option.
+    _read_binds.clear()
+    for target, engine in (("primary", _engine), ("replica", _replica_engine)):
+        if engine is not None:
+            _read_binds[target] = engine.sync_engine.execution_options(postgresql_readonly=True)
+    _read_session_factory = sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+    )
+    _max_lag_seconds = settings.db_replica_max_lag_seconds
+    _lag_check_seconds = settings.db_replica_lag_check_seconds
+    _lag_checked_at = float("-inf")
+    if _replica_engine is not None:
+        logger.info("db_replica_configured", max_lag_seconds=_max_lag_seconds)
+
+
+def get_session_factory() -> sessionmaker:
+    """Return the session factory for work running outside a request (background jobs)."""
+    if _async_session_factory is None:
+        raise RuntimeError("Database not initialised. Call init_db() first.")
+    return _async_session_factory
+
+
+# ── Per-request session release ──────────────────────────────────────────────
+
+# Sessions opened by the current request's dependencies; set by SessionReleasingRoute.
+_request_sessions: ContextVar[list[AsyncSession] | None] = ContextVar(
+    "request_sessions", default=None
+)
+
+
+def _track(session: AsyncSession) -> None:
+    sessions = _request_sessions.get()
+    if sessions is not None:
+        sessions.append(session)
+
+
+async def release_request_sessions() -> None:
+    """Return the current request's connections to the pool.
+
+    Write sessions commit (the dependency's own commit then has nothing to
+    do); read sessions close, leaving their loaded objects detached but
+    readable for serialization.
+    """
+    for session in _request_sessions.get() or ():
+        if session.info.get("read_only"):
+            await session.close()
+        else:
+            await session.commit()
+
+
+def _release_after(endpoint: Callable) -> Callable:
+    if not inspect.iscoroutinefunction(endpoint):
+        return endpoint  # sync endpoints run in the threadpool; leave them alone
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        await release_request_sessions()
+        return result
+
+    return wrapper
+
+
+class SessionReleasingRoute(APIRoute):
+    """Route that releases the request's DB connections once the endpoint returns."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _release_after(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def tracked_handler(request: Request):
+            sessions: list[AsyncSession] = []
+            token = _request_sessions.set(sessions)
+            try:
+                response = await handler(request)
+                wrote = any(session.info.get("committed_write") for session in sessions)
+                if wrote and _replica_engine is not None:
+                    pin_to_primary(response)
+                return response
+            finally:
+                _request_sessions.reset(token)
+
+        return tracked_handler
 
 
 async def get_session() -> AsyncGenerator[AsyncSession]:
@@ -43,6 +507,7 @@ async def get_session() -> AsyncGenerator[AsyncSession]:
         raise RuntimeError("Database not initialised. Call init_db() first.")
 
     async with _async_session_factory() as session:
+        _track(session)
         try:
             yield session
             await session.commit()
@@ -51,12 +516,28 @@ async def get_session() -> AsyncGenerator[AsyncSession]:
             raise
 
 
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession]:
+    """FastAPI dependency for read-only routes: no commit, possibly served by the replica."""
+    if _read_session_factory is None:
+        raise RuntimeError("Database not initialised. Call init_db() first.")
+
+    async with _read_session_factory() as session:
+        _track(session)
+        session.info["read_only"] = True
+        session.info["request"] = request
+        session.info["replica_ok"] = await replica_is_fresh()
+        yield session
+
+
 async def close_db() -> None:
-    """Dispose of the engine's connection pool.  Call at shutdown."""
-    global _engine
+    """Dispose of the engines' connection pools.  Call at shutdown."""
+    global _engine, _replica_engine
     if _engine is not None:
         await _engine.dispose()
         _engine = None
+    if _replica_engine is not None:
+        await _replica_engine.dispose()
+        _replica_engine = None
 
 
 async def create_all_tables() -> None:
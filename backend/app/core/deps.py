@@ -1,16 +1,27 @@
 """Reusable FastAPI dependencies (auth, current user, etc.)."""
 
+import secrets
 import uuid
 
 import structlog
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
 from sqlmodel import select
 
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
+from app.core.principal_cache import (
+    cache_principal,
+    cache_token,
+    principal_cache,
+    token_cache,
+    token_digest,
+)
 from app.core.security import decode_access_token
+from app.core.settings import get_settings
 from app.schemas.user import User
 
 logger = structlog.get_logger()
@@ -18,28 +29,49 @@ logger = structlog.get_logger()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: AsyncSession = Depends(get_session),
-) -> User:
-    """Decode the JWT and return the corresponding active user."""
+async def _load_principal(session: AsyncSession, user_id: uuid.UUID) -> User | None:
+    """Return the user attached to *session*, from the principal cache when possible."""
+    key = identity_key(User, user_id)
+    if (user := session.identity_map.get(key)) is not None:
+        return user
+
+    snapshot = principal_cache.get(user_id)
+    if snapshot is not None:
+        # Rebuild a per-request instance and attach it without a SELECT.
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return await session.merge(user, load=False)
+
+    result = await session.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if user is not None:
+        cache_principal(user)
+    return user
+
+
+async def _authenticate(request: Request, token: str, session: AsyncSession) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = decode_access_token(token)
-        user_id: str | None = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError as err:
-        raise credentials_exception from err
+    user_id = token_cache.get(token_digest(token))
+    if user_id is None:
+        try:
+            payload = decode_access_token(token)
+            subject: str | None = payload.get("sub")
+            if subject is None:
+                raise credentials_exception
+            user_id = uuid.UUID(subject)
+        except (JWTError, ValueError) as err:
+            raise credentials_exception from err
+        cache_token(token, user_id, payload.get("exp"))
 
-    stmt = select(User).where(User.id == uuid.UUID(user_id))
-    result = await session.execute(stmt)
-    user = result.scalars().first()
+    # Lets the session layer attribute writes (and replica routing) to this user.
+    request.state.user_id = user_id
+    session.info["user_id"] = user_id
+    user = await _load_principal(session, user_id)
 
     if user is None:
         raise credentials_exception
@@ -52,6 +84,28 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_session),
+) -> User:
+    """Decode the JWT and return the corresponding active user."""
+    return await _authenticate(request, token, session)
+
+
+async def get_current_reader(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_read_session, scope="function"),
+) -> User:
+    """``get_current_user`` for read-only routes, loaded through the read-only session.
+
+    Routes must declare their session as ``Depends(get_read_session, scope="function")``
+    too, so both share one session.  The returned user must not be modified.
+    """
+    return await _authenticate(request, token, session)
+
+
 async def get_current_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -62,3 +116,15 @@ async def get_current_superuser(
             detail="Insufficient privileges",
         )
     return current_user
+
+
+async def require_internal_access(request: Request) -> None:
+    """Guard ``/internal`` endpoints with ``METRICS_TOKEN`` (open in development)."""
+    settings = get_settings()
+    if not settings.metrics_token:
+        if settings.environment == "development":
+            return
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not secrets.compare_digest(supplied.encode(), settings.metrics_token.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
@@ -0,0 +1,166 @@
+"""Batched, compressed log shipping to Loki.
+
+`LokiHandler` sits behind the log writer thread (see ``app.core.logging``):
+``emit`` formats a record and appends the line to an in-memory buffer, nothing
+more.  A shipper thread drains that buffer in batches, pushing whenever
+``batch_size`` lines are waiting or ``flush_interval`` seconds have passed.
+Each push is one gzip-compressed request to Loki's push API, with one stream
+per severity.  Failed pushes are retried with exponential backoff and jitter.
+
+Memory stays bounded while Loki is slow or down: the buffer holds at most
+``max_buffer`` lines, and the overflow policy decides which lines to drop once
+it is full.  Every line Loki never receives is counted in
+``loki_lines_dropped_total``.
+"""
+
+import gzip
+import logging
+import random
+import threading
+import time
+from collections import deque
+from enum import StrEnum
+
+import httpx
+from pydantic_core import to_json
+
+from app.core.metrics import registry
+
+LOKI_LINES_DROPPED = registry.counter(
+    "loki_lines_dropped_total", "Log lines never delivered to Loki, by reason"
+)
+LOKI_PUSHES = registry.counter("loki_pushes_total", "Loki push attempts, by outcome")
+
+
+class OverflowPolicy(StrEnum):
+    DROP_OLDEST = "drop_oldest"  # keep the most recent lines
+    DROP_NEWEST = "drop_newest"  # keep what is already buffered
+
+
+class LokiHandler(logging.Handler):
+    """Logging handler that ships formatted records to Loki in the background."""
+
+    def __init__(
+        self,
+        url: str,
+        labels: dict[str, str],
+        *,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_buffer: int = 10_000,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 5.0,
+        verify: bool = True,
+    ):
+        super().__init__()
+        self.url = f"{url.rstrip('/')}/loki/api/v1/push"
+        self.labels = labels
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.overflow = OverflowPolicy(overflow)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        # (severity, timestamp in ns, line)
+        self._buffer: deque[tuple[str, str, str]] = deque()
+        self._ready = threading.Condition()
+        self._closed = threading.Event()
+        self._timeout = timeout
+        self._client = httpx.Client(timeout=timeout, verify=verify)
+        self._shipper = threading.Thread(target=self._run, name="loki-shipper", daemon=True)
+        self._shipper.start()
+
+    # ── Producer side (log writer thread) ────────────────────────────────
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        entry = (record.levelname.lower(), str(int(record.created * 1e9)), line)
+        with self._ready:
+            if len(self._buffer) >= self.max_buffer:
+                LOKI_LINES_DROPPED.inc(reason="overflow")
+                if self.overflow is OverflowPolicy.DROP_NEWEST:
+                    return
+                self._buffer.popleft()
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.batch_size:
+                self._ready.notify()
+
+    def close(self) -> None:
+        """Push what is still buffered (one attempt per batch), then stop."""
+        if not self._closed.is_set():
+            with self._ready:
+                self._closed.set()
+                self._ready.notify()
+            # Bounded, so an unreachable Loki cannot hold up shutdown for long.
+            self._shipper.join(timeout=2 * self._timeout)
+            self._client.close()
+        super().close()
+
+    # ── Shipper thread ───────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while True:
+            with self._ready:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._buffer) < self.batch_size and not self._closed.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+                if not self._buffer and self._closed.is_set():
+                    return
+                batch = [
+                    self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))
+                ]
+            if batch:
+                self._push(batch)
+
+    def _payload(self, batch: list[tuple[str, str, str]]) -> bytes:
+        streams: dict[str, list[list[str]]] = {}
+        for severity, ts, line in batch:
+            streams.setdefault(severity, []).append([ts, line])
+        body = {
+            "streams": [
+                {"stream": {**self.labels, "severity": severity}, "values": values}
+                for severity, values in streams.items()
+            ]
+        }
+        return gzip.compress(to_json(body), compresslevel=6)
+
+    def _push(self, batch: list[tuple[str, str, str]]) -> None:
+        payload = self._payload(batch)
+        headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._client.post(self.url, content=payload, headers=headers)
+            except httpx.HTTPError:
+                pass  # connection trouble: retry
+            else:
+                status = response.status_code
+                if status < 300:
+                    LOKI_PUSHES.inc(outcome="sent")
+                    return
+                if status < 500 and status != 429:
+                    # Loki rejected the batch itself (bad labels, too old...); retrying won't help.
+                    LOKI_PUSHES.inc(outcome="rejected")
+                    LOKI_LINES_DROPPED.inc(len(batch), reason="rejected")
+                    return
+
+            if attempt == self.max_retries or self._closed.is_set():
+                break
+            LOKI_PUSHES.inc(outcome="retry")
+            delay = min(self.max_backoff, self.backoff * 2**attempt)
+            # Jittered, so instances that lost Loki together don't retry in lockstep.
+            self._closed.wait(random.uniform(delay / 2, delay))
+
+        LOKI_PUSHES.inc(outcome="failed")
+        LOKI_LINES_DROPPED.inc(len(batch), reason="push_failed")
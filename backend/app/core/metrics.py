@@ -0,0 +1,369 @@
+"""Process-local metrics registry.
+
+A deliberately small counter / gauge / histogram implementation so hot paths
+can record measurements without a client library.  Components register their
+metrics on ``registry`` at import time; ``GET /internal/metrics`` serves
+``collect()`` as JSON and ``GET /internal/metrics/prometheus`` renders it in
+the Prometheus text format.
+
+    POOL_WAIT = registry.histogram("db_pool_wait_seconds", "Time to check out a connection")
+    POOL_WAIT.observe(elapsed)
+
+Labels are passed as keyword arguments (``counter.inc(route="/goals")``) and
+each distinct label set is tracked separately.  Gauges may instead be backed by
+a callback that is evaluated when the snapshot is taken.
+
+Recording is lock-free: every thread updates its own shard of each metric and
+the shards are merged when a snapshot is taken.
+
+With several worker processes, set ``METRICS_MULTIPROC_DIR`` to a directory
+they share.  Each worker then writes its snapshot there every
+``METRICS_FLUSH_INTERVAL_SECONDS`` (see `start_metrics_flusher`), and a scrape
+of any worker merges them all.  Counters and histograms are summed, and gauges
+get a ``pid`` label so each worker keeps its own series.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from app.core.settings import get_settings
+
+logger = structlog.get_logger()
+
+LabelKey = tuple[tuple[str, str], ...]
+
+# Latency buckets in seconds, from sub-millisecond to ten seconds.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class _Shards:
+    """Per-thread value dicts, so recording never takes a lock.
+
+    Each thread writes only to its own dict; readers merge copies of all of
+    them.  A thread's dict is registered (under a lock) the first time it
+    records, which happens once per thread and metric.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._all: list[dict] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._all.append(values)
+            return values
+
+    def copies(self) -> list[dict]:
+        # dict() of a dict is a single C call, so a concurrent write can't break it.
+        return [dict(shard) for shard in self._all]
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._shards = _Shards()
+
+    def samples(self) -> list[dict[str, Any]]:
+        raise NotImplementedError
+
+    def _totals(self) -> dict[LabelKey, float]:
+        totals: dict[LabelKey, float] = {}
+        for shard in self._shards.copies():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        values = self._shards.mine()
+        key = _key(labels)
+        values[key] = values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._totals().get(_key(labels), 0)
+
+    def samples(self) -> list[dict[str, Any]]:
+        return [{"labels": dict(k), "value": v} for k, v in self._totals().items()]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, callback: Callable[[], float] | None = None):
+        super().__init__(name, help)
+        self._values: dict[LabelKey, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the value; meant for gauges that are only ever set, not mixed with inc/dec."""
+        self._values[_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        values = self._shards.mine()
+        key = _key(labels)
+        values[key] = values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        if self._callback is not None:
+            return self._callback()
+        key = _key(labels)
+        return self._values.get(key, 0) + self._totals().get(key, 0)
+
+    def samples(self) -> list[dict[str, Any]]:
+        if self._callback is not None:
+            return [{"labels": {}, "value": self._callback()}]
+        values = self._totals()
+        for key, value in dict(self._values).items():
+            values[key] = values.get(key, 0) + value
+        return [{"labels": dict(k), "value": v} for k, v in values.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        # Per thread: label set -> [per-bucket counts..., +Inf count, sum]
+        series_by_key = self._shards.mine()
+        key = _key(labels)
+        series = series_by_key.get(key)
+        if series is None:
+            series = series_by_key[key] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _merged(self) -> dict[LabelKey, list[float]]:
+        merged: dict[LabelKey, list[float]] = {}
+        for shard in self._shards.copies():
+            for key, series in shard.items():
+                total = merged.setdefault(key, [0] * (len(self.buckets) + 2))
+                for i, n in enumerate(list(series)):
+                    total[i] += n
+        return merged
+
+    def count(self, **labels: Any) -> int:
+        series = self._merged().get(_key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> list[dict[str, Any]]:
+        out = []
+        for key, series in self._merged().items():
+            cumulative, buckets = 0, {}
+            for bound, n in zip((*self.buckets, "+Inf"), series[:-1], strict=True):
+                cumulative += n
+                buckets[str(bound)] = cumulative
+            out.append(
+                {"labels": dict(key), "buckets": buckets, "count": cumulative, "sum": series[-1]}
+            )
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def _register[M: Metric](self, metric: M) -> M:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name!r} already registered as {existing.kind}")
+            return existing  # type: ignore[return-value]
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._register(Counter(name, help))
+
+    def gauge(self, name: str, help: str, callback: Callable[[], float] | None = None) -> Gauge:
+        return self._register(Gauge(name, help, callback))
+
+    def histogram(
+        self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, buckets))
+
+    def __iter__(self):
+        return iter(self._metrics.values())
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {
+            metric.name: {"type": metric.kind, "help": metric.help, "samples": metric.samples()}
+            for metric in self._metrics.values()
+        }
+
+
+registry = MetricsRegistry()
+
+
+# ── Multiple workers ─────────────────────────────────────────────────────────
+
+_flusher: asyncio.Task | None = None
+
+
+def _worker_file(directory: str, pid: int) -> Path:
+    return Path(directory) / f"{pid}.json"
+
+
+def write_worker_snapshot(directory: str) -> None:
+    """Atomically replace this worker's snapshot file in *directory*."""
+    path = _worker_file(directory, os.getpid())
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(registry.snapshot()))
+    os.replace(tmp, path)
+
+
+def collect() -> dict[str, dict[str, Any]]:
+    """This worker's snapshot, merged with the other workers' when configured."""
+    settings = get_settings()
+    if not settings.metrics_multiproc_dir:
+        return registry.snapshot()
+
+    pid = os.getpid()
+    snapshots = {pid: registry.snapshot()}
+    # A worker that died without cleaning up stops counting after a few flushes.
+    stale_before = time.time() - 3 * settings.metrics_flush_interval_seconds
+    for path in Path(settings.metrics_multiproc_dir).glob("*.json"):
+        try:
+            if path.stem == str(pid) or path.stat().st_mtime < stale_before:
+                continue
+            snapshots[int(path.stem)] = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue  # removed or half-written mid-scrape; it'll be there next time
+    return merge_snapshots(snapshots)
+
+
+def merge_snapshots(snapshots: dict[int, dict[str, dict[str, Any]]]) -> dict[str, dict[str, Any]]:
+    """Merge per-worker snapshots keyed by pid (see the module docstring)."""
+    merged: dict[str, dict[str, Any]] = {}
+    for pid, snapshot in snapshots.items():
+        for name, metric in snapshot.items():
+            into = merged.setdefault(name, {**metric, "samples": {}})
+            for sample in metric["samples"]:
+                labels = sample["labels"]
+                if metric["type"] == "gauge":
+                    labels = {**labels, "pid": str(pid)}
+                key = _key(labels)
+                existing = into["samples"].get(key)
+                if existing is None:
+                    into["samples"][key] = {**sample, "labels": labels}
+                elif metric["type"] == "histogram":
+                    existing["count"] += sample["count"]
+                    existing["sum"] += sample["sum"]
+                    existing["buckets"] = {
+                        le: n + sample["buckets"].get(le, 0)
+                        for le, n in existing["buckets"].items()
+                    }
+                else:
+                    existing["value"] += sample["value"]
+    for metric in merged.values():
+        metric["samples"] = list(metric["samples"].values())
+    return merged
+
+
+async def _flush_periodically(directory: str, interval: float) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(write_worker_snapshot, directory)
+        except OSError:
+            logger.exception("metrics_flush_failed", directory=directory)
+        await asyncio.sleep(interval)
+
+
+def start_metrics_flusher() -> None:
+    """Start writing this worker's snapshot, if ``METRICS_MULTIPROC_DIR`` is set."""
+    global _flusher
+    settings = get_settings()
+    if settings.metrics_multiproc_dir and _flusher is None:
+        Path(settings.metrics_multiproc_dir).mkdir(parents=True, exist_ok=True)
+        _flusher = asyncio.create_task(
+            _flush_periodically(
+                settings.metrics_multiproc_dir, settings.metrics_flush_interval_seconds
+            )
+        )
+
+
+async def stop_metrics_flusher() -> None:
+    """Stop the flusher and remove this worker's file, so its gauges disappear."""
+    global _flusher
+    if _flusher is None:
+        return
+    _flusher.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _flusher
+    _flusher = None
+    _worker_file(get_settings().metrics_multiproc_dir, os.getpid()).unlink(missing_ok=True)
+
+
+# ── Prometheus text format ───────────────────────────────────────────────────
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict[str, str], **extra: str) -> str:
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(snapshot: dict[str, dict[str, Any]]) -> str:
+    """Render a snapshot (``registry.snapshot()`` or `collect()`) in the text format."""
+    lines: list[str] = []
+    for name, metric in snapshot.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for sample in metric["samples"]:
+            labels = sample["labels"]
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(sample['value'])}")
+                continue
+            for le, n in sample["buckets"].items():
+                lines.append(f"{name}_bucket{_labels(labels, le=le)} {n}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(sample['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {sample['count']}")
+    return "\n".join(lines) + "\n"
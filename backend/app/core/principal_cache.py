@@ -0,0 +1,119 @@
+"""In-process caches for request authentication.
+
+``get_current_user`` would otherwise verify the JWT and ``SELECT`` the user on
+every request.  Two small TTL caches short-circuit that:
+
+* the token cache maps a SHA-256 digest of the bearer token to its user ID, so
+  a token seen recently skips signature verification;
+* the principal cache maps a user ID to a snapshot of the ``users`` row, so
+  most requests authenticate without a database round trip.
+
+Entries live for ``principal_cache_ttl_seconds`` (never past the token's own
+expiry) and both caches are LRU-bounded.  Code that deactivates a user or
+changes their Strava link must call ``invalidate_user``; other workers see the
+change once their entries expire, which is what bounds the TTL.
+"""
+
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import get_settings
+from app.schemas.user import User
+
+_USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
+
+
+class TTLCache[K, V]:
+    """A size-bounded LRU mapping whose entries expire individually."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float) -> None:
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def discard_where(self, predicate) -> None:
+        """Drop every entry whose value satisfies *predicate*."""
+        for key in [k for k, (_, v) in self._data.items() if predicate(v)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+_settings = get_settings()
+token_cache: TTLCache[bytes, uuid.UUID] = TTLCache(_settings.principal_cache_size)
+principal_cache: TTLCache[uuid.UUID, dict[str, Any]] = TTLCache(_settings.principal_cache_size)
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def cache_token(token: str, user_id: uuid.UUID, expires_at: float | None) -> None:
+    """Remember a verified token until the TTL or its own ``exp``, whichever is first."""
+    ttl = float(get_settings().principal_cache_ttl_seconds)
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    token_cache.set(token_digest(token), user_id, ttl)
+
+
+def cache_principal(user: User) -> None:
+    snapshot = {column: getattr(user, column) for column in _USER_COLUMNS}
+    principal_cache.set(user.id, snapshot, get_settings().principal_cache_ttl_seconds)
+
+
+def _forget(user_id: uuid.UUID) -> None:
+    principal_cache.pop(user_id)
+    token_cache.discard_where(lambda cached_id: cached_id == user_id)
+
+
+def invalidate_user(user_id: uuid.UUID, session: AsyncSession | None = None) -> None:
+    """Forget the user's cached row and every cached token that resolves to them.
+
+    Pass the *session* holding the uncommitted change: the entries are dropped
+    again when it commits, so a request that read the old row in the meantime
+    cannot leave it cached.
+    """
+    _forget(user_id)
+    if session is not None:
+        event.listen(session.sync_session, "after_commit", lambda _: _forget(user_id), once=True)
+
+
+def clear_auth_caches() -> None:
+    token_cache.clear()
+    principal_cache.clear()
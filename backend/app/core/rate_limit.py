@@ -0,0 +1,179 @@
+"""Sliding-window login throttling.
+
+Every ``POST /auth/login`` is counted against the submitted email and the
+client IP *before* any database or bcrypt work, so a credential-stuffing burst
+is shed for the price of two dictionary lookups.
+
+Each key keeps two fixed-window counters (current and previous window); the
+sliding-window count is the current count plus the previous one weighted by
+how much of it still overlaps the window.  That is three numbers per key in
+memory.  Multi-worker deployments can share counts by pointing
+``LOGIN_THROTTLE_BACKEND`` at a ``module:factory`` returning any object that
+implements ``ThrottleBackend`` (e.g. Redis ``INCR``/``EXPIRE`` on
+``{key}:{window index}``).
+
+The IP is the socket peer unless that peer is one of ``TRUSTED_PROXIES``;
+then X-Forwarded-For is read from the right, skipping trusted hops, so
+entries a client prepends itself are never used as the key.
+"""
+
+import importlib
+import ipaddress
+import math
+import time
+from typing import Protocol
+
+import structlog
+from starlette.requests import Request
+
+from app.core.metrics import registry
+from app.core.settings import Settings, get_settings
+
+logger = structlog.get_logger()
+
+LOGIN_THROTTLE_ATTEMPTS = registry.counter(
+    "login_throttle_attempts_total", "Login attempts checked by the throttle, by outcome"
+)
+
+
+class ThrottleBackend(Protocol):
+    async def hit(self, key: str, window: int, now: float) -> float:
+        """Record an attempt for *key*; return the sliding-window count including it."""
+        ...
+
+    async def reset(self, key: str) -> None:
+        """Forget *key*'s attempts (e.g. after a successful login)."""
+        ...
+
+
+class MemoryThrottleBackend:
+    """In-process backend: ``key -> [window index, current count, previous count]``."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._counters: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    async def hit(self, key: str, window: int, now: float) -> float:
+        index = int(now // window)
+        entry = self._counters.get(key)
+        if entry is None:
+            if len(self._counters) >= self.max_keys:
+                self._evict(index)
+            entry = self._counters[key] = [index, 0, 0]
+        elif entry[0] != index:
+            # Roll forward; anything older than the previous window no longer counts.
+            entry[2] = entry[1] if entry[0] == index - 1 else 0
+            entry[0], entry[1] = index, 0
+        entry[1] += 1
+        overlap = 1 - (now % window) / window
+        return entry[1] + entry[2] * overlap
+
+    async def reset(self, key: str) -> None:
+        self._counters.pop(key, None)
+
+    def _evict(self, index: int) -> None:
+        # Drop keys idle for two windows; if still full, the oldest insertions go.
+        stale = [k for k, (i, _, _) in self._counters.items() if i < index - 1]
+        for key in stale:
+            del self._counters[key]
+        overflow = len(self._counters) - self.max_keys + 1
+        for key in list(self._counters)[: max(overflow, 0)]:
+            del self._counters[key]
+
+
+class LoginThrottledError(Exception):
+    """Raised when a login attempt exceeds a limit; ``retry_after`` is in seconds."""
+
+    def __init__(self, scope: str, retry_after: int):
+        super().__init__(f"Too many login attempts ({scope})")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class LoginThrottle:
+    """Per-IP and per-email sliding-window limits for login attempts."""
+
+    def __init__(self, backend: ThrottleBackend, settings: Settings):
+        self.backend = backend
+        self.ip_limit = settings.login_throttle_ip_limit
+        self.ip_window = settings.login_throttle_ip_window_seconds
+        self.email_limit = settings.login_throttle_email_limit
+        self.email_window = settings.login_throttle_email_window_seconds
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy, strict=False) for proxy in settings.trusted_proxies
+        ]
+
+    def client_ip(self, request: Request) -> str | None:
+        """The address to throttle: the nearest hop not operated by us."""
+        peer = request.client.host if request.client else None
+        if peer is None or not self._trusted(peer):
+            return peer
+        hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",")]
+        for hop in reversed(hops):
+            if hop and not self._trusted(hop):
+                return hop
+        return peer
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    async def check(self, email: str, ip: str | None, now: float | None = None) -> None:
+        """Count an attempt; raise ``LoginThrottledError`` if either limit is exceeded."""
+        now = time.time() if now is None else now
+        if ip and self.ip_limit:
+            count = await self.backend.hit(f"ip:{ip}", self.ip_window, now)
+            if count > self.ip_limit:
+                LOGIN_THROTTLE_ATTEMPTS.inc(outcome="rejected_ip")
+                raise LoginThrottledError("ip", _retry_after(self.ip_window, now))
+        if self.email_limit:
+            count = await self.backend.hit(f"email:{_normalize(email)}", self.email_window, now)
+            if count > self.email_limit:
+                LOGIN_THROTTLE_ATTEMPTS.inc(outcome="rejected_email")
+                raise LoginThrottledError("email", _retry_after(self.email_window, now))
+        LOGIN_THROTTLE_ATTEMPTS.inc(outcome="allowed")
+
+    async def succeeded(self, email: str) -> None:
+        """Clear the email's count so a legitimate user isn't locked out later."""
+        if self.email_limit:
+            await self.backend.reset(f"email:{_normalize(email)}")
+
+
+def _normalize(email: str) -> str:
+    return email.strip().lower()
+
+
+def _retry_after(window: int, now: float) -> int:
+    return max(1, math.ceil(window - now % window))
+
+
+_login_throttle: LoginThrottle | None = None
+
+
+def _load_backend(settings: Settings) -> ThrottleBackend:
+    if not settings.login_throttle_backend:
+        return MemoryThrottleBackend(settings.login_throttle_max_keys)
+    module_name, _, factory = settings.login_throttle_backend.partition(":")
+    backend = getattr(importlib.import_module(module_name), factory)(settings)
+    logger.info("login_throttle_backend", backend=settings.login_throttle_backend)
+    return backend
+
+
+def get_login_throttle() -> LoginThrottle:
+    global _login_throttle
+    if _login_throttle is None:
+        settings = get_settings()
+        _login_throttle = LoginThrottle(_load_backend(settings), settings)
+    return _login_throttle
+
+
+def reset_login_throttle() -> None:
+    """Drop the throttle (and its in-memory counts); the next call rebuilds it."""
+    global _login_throttle
+    _login_throttle = None
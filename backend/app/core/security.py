@@ -1,19 +1,32 @@
 """Password hashing, JWT, and token encryption utilities."""
 
+import asyncio
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import UTC, datetime, timedelta
 
 import bcrypt
 from cryptography.fernet import Fernet, InvalidToken
 from jose import JWTError, jwt
 
+from app.core.metrics import registry
 from app.core.settings import get_settings
 
 # ── Password helpers ─────────────────────────────────────────────────────────
 
 
-def hash_password(plain: str) -> str:
-    """Return a bcrypt hash of the plain-text password."""
-    return bcrypt.hashpw(plain.encode(), bcrypt.gensalt()).decode()
+# Hashes are written as ``$2b$<rounds>$<salt+digest>``; anything else is legacy.
+BCRYPT_PREFIX = b"2b"
+
+
+def hash_password(plain: str, *, rounds: int | None = None) -> str:
+    """Return a bcrypt hash of the plain-text password at the policy's cost."""
+    rounds = rounds or get_settings().password_bcrypt_rounds
+    return bcrypt.hashpw(plain.encode(), bcrypt.gensalt(rounds, BCRYPT_PREFIX)).decode()
 
 
 def verify_password(plain: str, hashed: str) -> bool:
@@ -21,6 +34,140 @@ def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain.encode(), hashed.encode())
 
 
+def needs_rehash(hashed: str) -> bool:
+    """Whether *hashed* was made with a different variant or cost than the policy."""
+    parts = hashed.split("$")
+    if len(parts) != 4 or parts[1] != BCRYPT_PREFIX.decode() or not parts[2].isdigit():
+        return True
+    return int(parts[2]) != get_settings().password_bcrypt_rounds
+
+
+# ── Password worker pool ─────────────────────────────────────────────────────
+#
+# bcrypt takes ~200 ms of CPU per call and releases the GIL while it runs, so
+# request handlers hand it to a small dedicated thread pool instead of blocking
+# the event loop.  The pool is bounded: once ``password_hash_max_queue`` calls
+# are waiting for a worker, further calls fail fast with ``PasswordPoolBusyError``.
+
+
+class PasswordPoolBusyError(Exception):
+    """Raised when the password pool's queue is full."""
+
+
+@dataclass
+class PasswordPoolStats:
+    """Counters for the password worker pool (times in seconds)."""
+
+    workers: int = 0
+    max_queue: int = 0
+    in_flight: int = 0  # running on a worker
+    queued: int = 0  # submitted, waiting for a worker
+    max_queued: int = 0
+    completed: int = 0
+    rejected: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    run_seconds_total: float = 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        return asdict(self)
+
+
+_password_executor: ThreadPoolExecutor | None = None
+password_pool_stats = PasswordPoolStats()
+_stats_lock = threading.Lock()
+
+PASSWORD_HASH_DURATION = registry.histogram(
+    "password_hash_duration_seconds",
+    "bcrypt time on a pool worker, by operation (hash_password / verify_password)",
+)
+PASSWORD_POOL_WAIT = registry.histogram(
+    "password_pool_wait_seconds", "Time a hash/verify call waited for a pool worker"
+)
+registry.gauge(
+    "password_pool_in_flight", "Calls running on a worker", lambda: password_pool_stats.in_flight
+)
+registry.gauge(
+    "password_pool_queued", "Calls waiting for a worker", lambda: password_pool_stats.queued
+)
+PASSWORD_POOL_REJECTED = registry.counter(
+    "password_pool_rejected_total", "Calls refused with the queue full"
+)
+
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    if _password_executor is None:
+        settings = get_settings()
+        workers = settings.password_hash_workers or min(max((os.cpu_count() or 2) - 1, 1), 8)
+        _password_executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="password",
+        )
+        password_pool_stats.workers = workers
+        password_pool_stats.max_queue = settings.password_hash_max_queue
+    return _password_executor
+
+
+def _timed[T](fn: Callable[..., T], submitted: float, *args) -> T:
+    stats = password_pool_stats
+    started = time.perf_counter()
+    waited = started - submitted
+    with _stats_lock:
+        stats.queued -= 1
+        stats.in_flight += 1
+        stats.wait_seconds_total += waited
+        stats.wait_seconds_max = max(stats.wait_seconds_max, waited)
+    PASSWORD_POOL_WAIT.observe(waited)
+    try:
+        return fn(*args)
+    finally:
+        ran = time.perf_counter() - started
+        PASSWORD_HASH_DURATION.observe(ran, op=fn.__name__)
+        with _stats_lock:
+            stats.in_flight -= 1
+            stats.completed += 1
+            stats.run_seconds_total += ran
+
+
+async def _run_in_password_pool[T](fn: Callable[..., T], *args) -> T:
+    executor = _get_password_executor()
+    stats = password_pool_stats
+    with _stats_lock:
+        if stats.queued >= stats.max_queue:
+            stats.rejected += 1
+            PASSWORD_POOL_REJECTED.inc()
+            raise PasswordPoolBusyError("Password hashing queue is full")
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+    future = executor.submit(_timed, fn, time.perf_counter(), *args)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        if future.cancel():  # never reached a worker, so _timed didn't dequeue it
+            with _stats_lock:
+                stats.queued -= 1
+        raise
+
+
+async def hash_password_async(plain: str) -> str:
+    """``hash_password`` on the password pool, off the event loop."""
+    return await _run_in_password_pool(hash_password, plain)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """``verify_password`` on the password pool, off the event loop."""
+    return await _run_in_password_pool(verify_password, plain, hashed)
+
+
+def shutdown_password_pool() -> None:
+    """Stop the pool's worker threads.  Call at shutdown."""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
+
+
 # ── JWT helpers ──────────────────────────────────────────────────────────────
 
 
@@ -38,6 +38,19 @@ class Settings(BaseSettings):
     postgres_port: int = 5432
     postgres_db: str = "accountabilidash"
     echo_db: bool = False
+    # Pool sizing is per worker process: total connections = workers x (size + overflow).
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30  # Seconds to wait for a connection before erroring
+    db_pool_recycle: int = 1800  # Replace connections older than this (seconds); -1 = never
+    db_pool_pre_ping: str = "idle"  # always | idle (ping only after idle_seconds) | never
+    db_pool_pre_ping_idle_seconds: float = 30
+    db_statement_cache_size: int = 256  # asyncpg prepared statements per connection; 0 = off
+    postgres_replica_host: str = ""  # Read replica for read-only routes; empty = use primary
+    postgres_replica_port: int = 5432
+    db_replica_max_lag_seconds: float = 5  # Fall back to primary beyond this; also RYW window
+    db_replica_lag_check_seconds: float = 5  # How long a replica lag measurement is reused
+    db_n_plus_one_threshold: int = 10  # Warn when a statement repeats this often per request
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -47,6 +60,16 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def replica_database_url(self) -> str | None:
+        if not self.postgres_replica_host:
+            return None
+        return (
+            f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}"
+            f"@{self.postgres_replica_host}:{self.postgres_replica_port}/{self.postgres_db}"
+        )
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def database_url_sync(self) -> str:
@@ -60,19 +83,60 @@ class Settings(BaseSettings):
     strava_id: str = ""
     strava_secret: str = ""
     strava_redirect_uri: str = "http://localhost/api/v1/auth/strava/callback"
+    strava_base_url: str = "https://www.strava.com"  # Point at a local emulator for load tests
     frontend_url: str = "http://localhost"  # Where to redirect after OAuth success
+    strava_backfill_page_size: int = 200  # Activities per request (Strava max is 200)
+    strava_backfill_lease_seconds: int = 120  # Until a crashed worker's backfill is taken over
+    strava_rate_limit_headroom: int = 5  # Requests left unused in each rate-limit window
+    strava_webhook_verify_token: str = ""  # Shared secret echoed by Strava on subscribe
+    strava_webhook_subscription_id: int | None = None  # Events are rejected until set
+    strava_webhook_queue_size: int = 1000  # Events buffered before the endpoint sheds load
 
     # ── Auth / JWT ───────────────────────────────────────────────────────
     secret_key: str = "CHANGE-ME-in-production"
     token_encryption_key: str = ""  # Fernet key for Strava tokens; see .env.example
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 30  # Lifetime of each rotated refresh token
+    refresh_token_reuse_grace_seconds: int = 30  # Replays this soon get the successor back
     allow_registration: bool = True  # Set False to disable public sign-up
+    password_bcrypt_rounds: int = 12  # bcrypt cost (4-31); calibrate per host, see README
+    password_hash_workers: int = 0  # bcrypt threads; 0 = CPU count - 1 (min 1, max 8)
+    password_hash_max_queue: int = 64  # Waiting hash/verify calls before logins get 503
+    principal_cache_ttl_seconds: int = 30  # Reuse verified tokens/user rows; 0 disables
+    principal_cache_size: int = 10_000  # Entries per auth cache (LRU beyond this)
+    login_throttle_ip_limit: int = 30  # Login attempts per IP per window; 0 disables
+    login_throttle_ip_window_seconds: int = 60
+    login_throttle_email_limit: int = 10  # Login attempts per email per window; 0 disables
+    login_throttle_email_window_seconds: int = 300
+    login_throttle_max_keys: int = 100_000  # In-memory keys kept before evicting idle ones
+    login_throttle_backend: str = ""  # "module:factory" for a shared store; empty = in-process
+    trusted_proxies: list[str] = []  # Proxy IPs/CIDRs whose X-Forwarded-For names the client
+
+    # ── Internal endpoints ───────────────────────────────────────────────
+    metrics_token: str = ""  # Bearer token for /internal/*; empty = development only
+    metrics_multiproc_dir: str = ""  # Shared dir to merge metrics across workers; empty = off
+    metrics_flush_interval_seconds: float = 5.0  # How often each worker writes its metrics there
 
     # ── Logging ──────────────────────────────────────────────────────────
     log_level: str = "INFO"
     log_json: bool = False  # Set True in production for structured JSON logs
     loki_url: str | None = None  # e.g. http://loki:3100
+    loki_batch_size: int = 500  # Lines per push to Loki
+    loki_flush_interval_seconds: float = 1.0  # Longest a partial batch waits before a push
+    loki_max_buffer: int = 10_000  # Lines held while Loki is slow or down
+    loki_overflow_policy: str = "drop_oldest"  # Or "drop_newest" once the buffer is full
+    loki_max_retries: int = 5  # Retries per batch, with exponential backoff
+    loki_verify_tls: bool = False  # Homelab Loki uses a self-signed certificate
+    log_queue_size: int = 10_000  # Records awaiting the writer thread; overflow is dropped
+    # Share of each high-volume event kept; {} logs everything
+    log_sample_rates: dict[str, float] = {"request_completed": 0.1, "strava_completion_added": 0.25}
+
+    # ── Tracing ──────────────────────────────────────────────────────────
+    tracing_exporter: str = ""  # "" (off) | file | otlp
+    tracing_file_path: str = "traces.jsonl"  # JSON lines, one span each (exporter=file)
+    tracing_otlp_endpoint: str = "http://localhost:4318"  # OTLP/HTTP collector (exporter=otlp)
+    tracing_sample_rate: float = 1.0  # Share of traces recorded, decided at the root span
 
 
 @lru_cache
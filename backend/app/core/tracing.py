@@ -0,0 +1,414 @@
+"""Lightweight, OpenTelemetry-style request tracing.
+
+Spans cover the request (``TracingMiddleware``), service functions decorated
+with `traced`, SQL statements (engine events, see ``app.core.database``) and
+Strava HTTP calls (httpx hooks, see ``app.services.strava``).  The current span
+lives in a ContextVar, so nesting follows the call stack across ``await``s:
+
+    @traced
+    async def sync_strava_to_goals(session, user): ...
+
+    with span("matcher.compile", {"goals": len(goals)}):
+        ...
+
+Tracing is off unless ``TRACING_EXPORTER`` is set.  When it is off, `span`
+returns a shared no-op context manager and `traced` functions make a single
+global check before calling through.  When it is on, finished spans are queued
+and exported in batches by a background thread, either as JSON lines to
+``TRACING_FILE_PATH`` or to an OTLP/HTTP collector (JSON encoding) at
+``TRACING_OTLP_ENDPOINT``; spans that don't fit the queue are dropped and
+counted.  ``TRACING_SAMPLE_RATE`` decides per trace, at its root span.
+
+Request spans carry the request ID, and the request's log lines carry the
+trace ID, so logs and traces can be joined either way.
+"""
+
+import functools
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+import httpx
+import structlog
+from pydantic_core import to_json
+
+from app.core.metrics import registry
+from app.core.settings import Settings
+
+logger = structlog.get_logger()
+
+TRACE_SPANS_DROPPED = registry.counter(
+    "trace_spans_dropped_total", "Finished spans never exported, by reason"
+)
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = (
+        "attributes",
+        "end_ns",
+        "error",
+        "kind",
+        "name",
+        "parent_id",
+        "span_id",
+        "start_ns",
+        "trace_id",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        attributes: dict[str, Any] | None,
+        kind: str,
+        parent: "Span | None",
+    ):
+        self.name = name
+        self.kind = kind  # server | client | internal
+        self.attributes = attributes or {}
+        # Plain ints; formatting them as hex costs more than the rest of a span,
+        # so it happens on the exporter thread.
+        self.trace_id = parent.trace_id if parent is not None else random.getrandbits(128)
+        self.span_id = random.getrandbits(64)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.error: str | None = None
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    @property
+    def trace_id_hex(self) -> str:
+        return f"{self.trace_id:032x}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException | str) -> None:
+        self.error = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        processor = _processor
+        if processor is not None:
+            processor.on_end(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "trace_id": self.trace_id_hex,
+            "span_id": f"{self.span_id:016x}",
+            "parent_id": f"{self.parent_id:016x}" if self.parent_id is not None else None,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# Marks a context whose trace was not sampled, so its children aren't either.
+_NOT_SAMPLED: Any = object()
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_processor: "BatchSpanProcessor | None" = None
+_sample_rate = 1.0
+
+
+def tracing_enabled() -> bool:
+    return _processor is not None
+
+
+def current_span() -> Span | None:
+    parent = _current_span.get()
+    return None if parent is _NOT_SAMPLED else parent
+
+
+def start_span(
+    name: str, attributes: dict[str, Any] | None = None, *, kind: str = "internal"
+) -> Span | None:
+    """Start a leaf span under the current one; the caller must `Span.end` it.
+
+    Returns None when tracing is off or the trace isn't sampled.
+    """
+    if _processor is None:
+        return None
+    parent = _current_span.get()
+    if parent is _NOT_SAMPLED or (parent is None and random.random() >= _sample_rate):
+        return None
+    return Span(name, attributes, kind, parent)
+
+
+class _SpanScope:
+    """Context manager that makes a new span current for its block."""
+
+    __slots__ = ("_attributes", "_kind", "_name", "_span", "_token")
+
+    def __init__(self, name: str, attributes: dict[str, Any] | None, kind: str):
+        self._name = name
+        self._attributes = attributes
+        self._kind = kind
+        self._span: Span | None = None
+
+    def __enter__(self) -> Span | None:
+        parent = _current_span.get()
+        if parent is _NOT_SAMPLED:
+            self._token = None
+        elif parent is None and random.random() >= _sample_rate:
+            self._token = _current_span.set(_NOT_SAMPLED)
+        else:
+            self._span = Span(self._name, self._attributes, self._kind, parent)
+            self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is not None:
+            _current_span.reset(self._token)
+        if self._span is not None:
+            if exc is not None:
+                self._span.record_error(exc)
+            self._span.end()
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NOOP = _NoopScope()
+
+
+def span(
+    name: str, attributes: dict[str, Any] | None = None, *, kind: str = "internal"
+) -> _SpanScope | _NoopScope:
+    """``with span(name) as s:`` — *s* is None when tracing is off or unsampled."""
+    if _processor is None:
+        return _NOOP
+    return _SpanScope(name, attributes, kind)
+
+
+def traced[F: Callable[..., Any]](fn: F) -> F:
+    """Run every call of *fn* in a span named ``<module>.<function>``."""
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    if inspect.iscoroutinefunction(fn):
+
+        async def traced_call(*args, **kwargs):
+            with _SpanScope(name, None, "internal"):
+                return await fn(*args, **kwargs)
+
+        # A plain function handing back fn's own coroutine while tracing is off,
+        # so the disabled path adds no extra coroutine frame to await.
+        @functools.wraps(fn)
+        def async_wrapper(*args, **kwargs):
+            if _processor is None:
+                return fn(*args, **kwargs)
+            return traced_call(*args, **kwargs)
+
+        return inspect.markcoroutinefunction(async_wrapper)  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _processor is None:
+            return fn(*args, **kwargs)
+        with _SpanScope(name, None, "internal"):
+            return fn(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+# ── Export ───────────────────────────────────────────────────────────────────
+
+
+class FileSpanExporter:
+    """Appends each span as one JSON line (see `Span.to_dict`)."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "ab")  # noqa: SIM115 — closed in shutdown()
+
+    def export(self, spans: list[Span]) -> None:
+        self._file.write(b"".join(to_json(s.to_dict(), fallback=repr) + b"\n" for s in spans))
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPSpanExporter:
+    """Posts spans to an OTLP/HTTP collector (``/v1/traces``, JSON encoding)."""
+
+    def __init__(self, endpoint: str, service_name: str, *, timeout: float = 5.0):
+        self.url = f"{endpoint.rstrip('/')}/v1/traces"
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=timeout)
+
+    def payload(self, spans: list[Span]) -> dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": _otlp_value(self.service_name)}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.core.tracing"},
+                            "spans": [
+                                {
+                                    "traceId": s.trace_id_hex,
+                                    "spanId": f"{s.span_id:016x}",
+                                    "parentSpanId": (
+                                        f"{s.parent_id:016x}" if s.parent_id is not None else ""
+                                    ),
+                                    "name": s.name,
+                                    "kind": _OTLP_KINDS[s.kind],
+                                    "startTimeUnixNano": str(s.start_ns),
+                                    "endTimeUnixNano": str(s.end_ns),
+                                    "attributes": [
+                                        {"key": k, "value": _otlp_value(v)}
+                                        for k, v in s.attributes.items()
+                                    ],
+                                    "status": (
+                                        {"code": 2, "message": s.error} if s.error else {"code": 0}
+                                    ),
+                                }
+                                for s in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, spans: list[Span]) -> None:
+        response = self._client.post(
+            self.url,
+            content=to_json(self.payload(spans), fallback=repr),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+
+    def shutdown(self) -> None:
+        self._client.close()
+
+
+class BatchSpanProcessor:
+    """Queues finished spans and exports them in batches on a background thread."""
+
+    def __init__(
+        self,
+        exporter: FileSpanExporter | OTLPSpanExporter,
+        *,
+        max_queue: int = 2048,
+        batch_size: int = 512,
+        flush_interval: float = 2.0,
+    ):
+        self.exporter = exporter
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: deque[Span] = deque()
+        self._ready = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        # deque.append is atomic; only wake the exporter when a batch is ready.
+        if len(self._queue) >= self.max_queue:
+            TRACE_SPANS_DROPPED.inc(reason="queue_full")
+            return
+        self._queue.append(span)
+        if len(self._queue) >= self.batch_size:
+            with self._ready:
+                self._ready.notify()
+
+    def shutdown(self) -> None:
+        """Export everything still queued, then stop."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        self._thread.join(timeout=10)
+        self.exporter.shutdown()
+
+    def _run(self) -> None:
+        while True:
+            with self._ready:
+                if not self._closed and len(self._queue) < self.batch_size:
+                    self._ready.wait(self.flush_interval)
+                closed = self._closed
+            while self._queue:
+                batch = [
+                    self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+                try:
+                    self.exporter.export(batch)
+                except Exception:
+                    TRACE_SPANS_DROPPED.inc(len(batch), reason="export_failed")
+                    logger.warning("trace_export_failed", spans=len(batch), exc_info=True)
+            if closed:
+                return
+
+
+# ── Lifecycle ────────────────────────────────────────────────────────────────
+
+
+def start_tracing(
+    exporter: FileSpanExporter | OTLPSpanExporter, *, sample_rate: float = 1.0, **batch: Any
+) -> None:
+    """Start recording spans into *exporter* (replacing any previous setup)."""
+    global _processor, _sample_rate
+    shutdown_tracing()
+    _sample_rate = sample_rate
+    _processor = BatchSpanProcessor(exporter, **batch)
+
+
+def setup_tracing(settings: Settings) -> None:
+    """Start tracing if ``TRACING_EXPORTER`` is configured."""
+    match settings.tracing_exporter:
+        case "":
+            return
+        case "file":
+            exporter: FileSpanExporter | OTLPSpanExporter = FileSpanExporter(
+                settings.tracing_file_path
+            )
+        case "otlp":
+            exporter = OTLPSpanExporter(settings.tracing_otlp_endpoint, settings.app_name)
+        case other:
+            raise ValueError(f"Unknown TRACING_EXPORTER {other!r} (expected file or otlp)")
+    start_tracing(exporter, sample_rate=settings.tracing_sample_rate)
+    logger.info("tracing_enabled", exporter=settings.tracing_exporter)
+
+
+def shutdown_tracing() -> None:
+    """Stop recording and flush the spans still queued."""
+    global _processor
+    processor, _processor = _processor, None
+    if processor is not None:
+        processor.shutdown()
@@ -8,10 +8,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.database import close_db, init_db
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.metrics import start_metrics_flusher, stop_metrics_flusher
+from app.core.security import shutdown_password_pool
 from app.core.settings import get_settings
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.middleware.metrics import MetricsMiddleware
 from app.middleware.request_logging import RequestLoggingMiddleware
-from app.routers import auth, goals, health, users
+from app.middleware.tracing import TracingMiddleware
+from app.routers import auth, goals, health, internal, strava, users
+from app.services.strava import close_http_client
+from app.services.strava_backfill import cancel_backfills, resume_backfills
+from app.services.strava_webhook import start_webhook_worker, stop_webhook_worker
 
 logger = structlog.get_logger()
 
@@ -23,7 +31,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
 
     # ── Startup ──────────────────────────────────────────────────────────
     setup_logging(settings)
+    setup_tracing(settings)
     init_db(settings)
+    await resume_backfills()
+    start_webhook_worker()
+    start_metrics_flusher()
     logger.info(
         "app_startup",
         app=settings.app_name,
@@ -33,8 +45,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     yield
 
     # ── Shutdown ─────────────────────────────────────────────────────────
+    await stop_metrics_flusher()
+    await stop_webhook_worker()
+    await cancel_backfills()
+    await close_http_client()
+    shutdown_password_pool()
     await close_db()
+    shutdown_tracing()
     logger.info("app_shutdown")
+    shutdown_logging()
 
 
 def create_app() -> FastAPI:
@@ -50,7 +69,7 @@ def create_app() -> FastAPI:
         redoc_url="/redoc",
     )
 
-    # ── Middleware (order matters — outermost first) ──────────────────────
+    # ── Middleware (order matters — each one wraps those added before) ────
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_origins,
@@ -58,7 +77,11 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    app.add_middleware(RequestLoggingMiddleware)
+    app.add_middleware(TracingMiddleware)  # inside the logging middleware, sees its request ID
+    app.add_middleware(
+        RequestLoggingMiddleware, query_headers=settings.environment == "development"
+    )
+    app.add_middleware(MetricsMiddleware)  # added last, so it wraps the logging middleware
 
     # ── Routers ──────────────────────────────────────────────────────────
     api_prefix = "/api/v1"
@@ -66,6 +89,8 @@ def create_app() -> FastAPI:
     app.include_router(auth.router, prefix=api_prefix)
     app.include_router(users.router, prefix=api_prefix)
     app.include_router(goals.router, prefix=api_prefix)
+    app.include_router(strava.router, prefix=api_prefix)
+    app.include_router(internal.router, prefix=api_prefix)
 
     return app
 
@@ -0,0 +1,69 @@
+"""Middleware that records per-route request metrics."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.database import track_queries
+from app.core.metrics import registry
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Request latency by method, route template and status"
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Requests currently being handled by this worker"
+)
+HTTP_REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request, by route template",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+HTTP_REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request, by route template"
+)
+
+
+def route_template(scope: Scope) -> str:
+    """The matched route's path template, e.g. ``/goals/{goal_id}``.
+
+    Templates (not raw paths) keep label cardinality bounded.  Routes on
+    included routers carry their router-relative path, so the ``/api/v1``
+    prefix is not part of it.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route latency, in-flight count and SQL per request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # if the app fails before starting a response
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            with track_queries() as queries:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.observe(
+                elapsed, method=scope["method"], route=route, status=status
+            )
+            HTTP_REQUEST_DB_QUERIES.observe(queries.count, route=route)
+            HTTP_REQUEST_DB_SECONDS.observe(queries.seconds, route=route)
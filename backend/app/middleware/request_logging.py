@@ -4,29 +4,69 @@ import time
 import uuid
 
 import structlog
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.database import current_query_tally
 
 logger = structlog.get_logger()
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware: binds a request ID, times the request and logs it.
+
+    Unlike ``BaseHTTPMiddleware`` it does not run the app in a separate task or
+    re-wrap the response body, so streaming responses pass through untouched.
+    The elapsed time covers the whole exchange, up to the last body chunk.
+
+    When ``MetricsMiddleware`` (outside this one) is tallying the request's SQL,
+    the log line carries ``db_queries`` and ``db_ms``; with *query_headers*
+    (development) they are also sent as ``X-DB-Queries`` / ``X-DB-Time-Ms``,
+    counted up to the moment the response starts.
+    """
+
+    def __init__(self, app: ASGIApp, *, query_headers: bool = False) -> None:
+        self.app = app
+        self.query_headers = query_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         request_id = str(uuid.uuid4())[:8]
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(request_id=request_id)
 
+        status = 500  # if the app fails before starting a response
         start = time.perf_counter()
-        response = await call_next(request)
-        elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
-
-        logger.info(
-            "request_completed",
-            method=request.method,
-            path=request.url.path,
-            status=response.status_code,
-            elapsed_ms=elapsed_ms,
-        )
-        response.headers["X-Request-ID"] = request_id
-        return response
+        queries = current_query_tally()
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                if self.query_headers and queries is not None:
+                    headers.append("X-DB-Queries", str(queries.count))
+                    headers.append("X-DB-Time-Ms", f"{queries.seconds * 1000:.2f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+            db = (
+                {"db_queries": queries.count, "db_ms": round(queries.seconds * 1000, 2)}
+                if queries is not None
+                else {}
+            )
+            logger.info(
+                "request_completed",
+                method=scope["method"],
+                path=scope["path"],
+                status=status,
+                elapsed_ms=elapsed_ms,
+                **db,
+            )
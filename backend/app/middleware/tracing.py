@@ -0,0 +1,53 @@
+"""Middleware that opens the root span of each request's trace."""
+
+import structlog
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import span, tracing_enabled
+from app.middleware.metrics import route_template
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: one server span per request, named after its route.
+
+    The span carries the request ID bound by ``RequestLoggingMiddleware``, and
+    the trace ID is bound into the structlog context, so both the request's log
+    lines and its ``request_completed`` line carry it.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # if the app fails before starting a response
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        attributes = {
+            "http.request.method": method,
+            "url.path": scope["path"],
+            "request_id": structlog.contextvars.get_contextvars().get("request_id"),
+        }
+        with span(method, attributes, kind="server") as root:
+            if root is None:  # not sampled
+                await self.app(scope, receive, send)
+                return
+            structlog.contextvars.bind_contextvars(trace_id=root.trace_id_hex)
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = route_template(scope)
+                root.name = f"{method} {route}"
+                root.set_attribute("http.route", route)
+                root.set_attribute("http.response.status_code", status)
+                if status >= 500 and root.error is None:
+                    root.record_error(f"HTTP {status}")
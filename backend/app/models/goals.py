@@ -3,7 +3,7 @@
 import uuid
 from datetime import date, datetime
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, TypeAdapter, model_validator
 
 from app.schemas.goals import Frequency, GoalType, ValueType
 
@@ -124,6 +124,16 @@ class AllGoalsTrends(BaseModel):
     goals: list[GoalTrends]
 
 
+# ── Adapters ─────────────────────────────────────────────────────────────────
+
+# Compiled once at import.  Validating a whole list in one call stays inside
+# pydantic-core instead of looping over ``model_validate`` in Python.
+GOAL_READ_LIST = TypeAdapter(list[GoalRead])
+GOAL_WITH_PROGRESS_LIST = TypeAdapter(list[GoalWithProgress])
+COMPLETION_READ_LIST = TypeAdapter(list[CompletionRead])
+TREND_POINT_LIST = TypeAdapter(list[PeriodTrendPoint])
+
+
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 
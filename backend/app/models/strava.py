@@ -0,0 +1,50 @@
+"""Pydantic models for Strava-related request / response bodies."""
+
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, computed_field
+
+from app.schemas.strava import BackfillStatus
+
+# ── Request models ───────────────────────────────────────────────────────────
+
+
+class StravaWebhookEvent(BaseModel):
+    """Push event delivered by a Strava webhook subscription."""
+
+    object_type: Literal["activity", "athlete"]
+    object_id: int
+    aspect_type: Literal["create", "update", "delete"]
+    owner_id: int
+    subscription_id: int
+    event_time: int
+    updates: dict[str, Any] = {}
+
+
+# ── Response models ──────────────────────────────────────────────────────────
+
+
+class BackfillRead(BaseModel):
+    """Progress of the user's full-history Strava import."""
+
+    status: BackfillStatus
+    pages_fetched: int
+    activities_ingested: int
+    completions_added: int
+    cursor_before: int | None
+    error: str | None
+    resume_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+    completed_at: datetime | None
+
+    model_config = {"from_attributes": True}
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def oldest_activity_at(self) -> datetime | None:
+        """Start time of the oldest activity imported so far."""
+        if self.cursor_before is None:
+            return None
+        return datetime.fromtimestamp(self.cursor_before, tz=UTC)
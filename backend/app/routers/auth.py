@@ -3,34 +3,42 @@
 import uuid
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
-from app.core.deps import get_current_user
+from app.core.database import SessionReleasingRoute, get_session
+from app.core.deps import get_current_reader, get_current_user
+from app.core.principal_cache import invalidate_user
+from app.core.rate_limit import LoginThrottledError, get_login_throttle
 from app.core.security import (
     create_access_token,
     create_oauth_state_token,
     decode_oauth_state_token,
-    decrypt_token,
     encrypt_token,
 )
-from app.models.user import Token, UserCreate, UserLogin, UserRead
+from app.models.user import RefreshRequest, Token, UserCreate, UserLogin, UserRead
 from app.schemas.user import User
-from app.services.auth import AuthError, authenticate_user, register_user
+from app.services.auth import (
+    AuthError,
+    authenticate_user,
+    issue_refresh_token,
+    register_user,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
 from app.services.strava import (
     build_authorization_url,
     exchange_code_for_tokens,
     fetch_athlete,
-    is_token_expired,
-    refresh_strava_token,
 )
+from app.services.strava_backfill import schedule_backfill, start_backfill
+from app.services.strava_sync import get_access_token
 
 logger = structlog.get_logger()
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=SessionReleasingRoute)
 
 
 @router.post("/register", response_model=UserRead, status_code=201)
@@ -48,21 +56,59 @@ async def register(
 @router.post("/login", response_model=Token)
 async def login(
     data: UserLogin,
+    request: Request,
     session: AsyncSession = Depends(get_session),
 ) -> Token:
     """Authenticate and return a JWT access token."""
+    throttle = get_login_throttle()
+    try:
+        await throttle.check(data.email, throttle.client_ip(request))
+    except LoginThrottledError as exc:
+        logger.warning("login_throttled", scope=exc.scope, email=data.email)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts. Try again later.",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+
     try:
         user = await authenticate_user(session, data.email, data.password)
     except AuthError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    await throttle.succeeded(data.email)
 
     token = create_access_token(subject=str(user.id))
-    return Token(access_token=token)
+    refresh_token = await issue_refresh_token(session, user.id)
+    return Token(access_token=token, refresh_token=refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    data: RefreshRequest,
+    session: AsyncSession = Depends(get_session),
+) -> Token:
+    """Rotate a refresh token and return a new access / refresh token pair."""
+    try:
+        user, refresh_token = await rotate_refresh_token(session, data.refresh_token)
+    except AuthError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+
+    token = create_access_token(subject=str(user.id))
+    return Token(access_token=token, refresh_token=refresh_token)
+
+
+@router.post("/logout", status_code=204)
+async def logout(
+    data: RefreshRequest,
+    session: AsyncSession = Depends(get_session),
+) -> None:
+    """Revoke the refresh token and every token rotated from the same login."""
+    await revoke_refresh_token(session, data.refresh_token)
 
 
 @router.get("/me", response_model=UserRead)
 async def read_current_user(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_reader),
 ) -> User:
     """Return the currently authenticated user."""
     return current_user
@@ -73,7 +119,7 @@ async def read_current_user(
 
 @router.get("/strava/connect")
 async def strava_connect(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_reader),
 ) -> RedirectResponse:
     """Redirect the authenticated user to Strava to authorize and link their account."""
     try:
@@ -87,7 +133,7 @@ async def strava_connect(
 
 @router.get("/strava/connect-url")
 async def strava_connect_url(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_reader),
 ) -> dict[str, str]:
     """Return the Strava authorization URL for the frontend to redirect to (auth required)."""
     try:
@@ -143,7 +189,12 @@ async def strava_callback(
         )
     )
     await session.execute(stmt)
+    invalidate_user(uuid.UUID(user_id), session)
+    # Import the athlete's full history in the background; progress is
+    # reported by GET /strava/backfill.
+    await start_backfill(session, uuid.UUID(user_id), restart=True)
     await session.commit()
+    schedule_backfill(uuid.UUID(user_id))
 
     return RedirectResponse(url=f"{frontend_url}/account?strava=connected", status_code=302)
 
@@ -160,22 +211,8 @@ async def strava_me(
             detail="Strava account not linked. Connect Strava first.",
         )
 
-    access_token = decrypt_token(current_user.strava_access_token)
-    refresh_token = decrypt_token(current_user.strava_refresh_token)
-    if is_token_expired(current_user.strava_expires_at) and refresh_token:
-        data = await refresh_strava_token(refresh_token)
-        access_token = data["access_token"]
-        stmt = (
-            update(User)
-            .where(User.id == current_user.id)
-            .values(
-                strava_access_token=encrypt_token(data["access_token"]),
-                strava_refresh_token=encrypt_token(data["refresh_token"]),
-                strava_expires_at=data["expires_at"],
-            )
-        )
-        await session.execute(stmt)
-        await session.commit()
+    access_token = await get_access_token(session, current_user)
+    await session.commit()
 
     athlete = await fetch_athlete(access_token)
     return athlete
@@ -6,9 +6,10 @@ from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
-from app.core.deps import get_current_user
+from app.core.database import SessionReleasingRoute, get_read_session, get_session
+from app.core.deps import get_current_reader, get_current_user
 from app.models.goals import (
+    COMPLETION_READ_LIST,
     CheckInCreate,
     CompletionRead,
     GoalCreate,
@@ -34,7 +35,7 @@ from app.services.goals import (
 )
 from app.services.strava_sync import sync_strava_to_goals
 
-router = APIRouter(prefix="/goals", tags=["goals"])
+router = APIRouter(prefix="/goals", tags=["goals"], route_class=SessionReleasingRoute)
 
 
 @router.post("/sync-strava")
@@ -49,8 +50,8 @@ async def sync_strava(
 
 @router.get("/dashboard", response_model=list[GoalWithProgress])
 async def dashboard(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session, scope="function"),
+    current_user: User = Depends(get_current_reader),
 ) -> list[GoalWithProgress]:
     """Return all active goals with current-period progress for the dashboard."""
     return await list_goals_with_progress(session, current_user.id)
@@ -74,8 +75,8 @@ async def goal_check_in(
 @router.get("/{goal_id}/completions", response_model=list[CompletionRead])
 async def list_goal_completions(
     goal_id: uuid.UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session, scope="function"),
+    current_user: User = Depends(get_current_reader),
 ) -> list[CompletionRead]:
     """List completions for a goal in the current period."""
     completions = await list_completions_for_period(
@@ -83,15 +84,15 @@ async def list_goal_completions(
         goal_id,
         current_user.id,
     )
-    return [CompletionRead.model_validate(c, from_attributes=True) for c in completions]
+    return COMPLETION_READ_LIST.validate_python(completions, from_attributes=True)
 
 
 @router.get("/trends", response_model=list[GoalTrends])
 async def get_trends(
     start_date: date = Query(..., description="Start of date range"),
     end_date: date = Query(..., description="End of date range"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session, scope="function"),
+    current_user: User = Depends(get_current_reader),
 ) -> list[GoalTrends]:
     """Get trend data for all goals over a date range."""
     if start_date > end_date:
@@ -112,8 +113,8 @@ async def get_goal_trends_endpoint(
     goal_id: uuid.UUID,
     start_date: date = Query(..., description="Start of date range"),
     end_date: date = Query(..., description="End of date range"),
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session, scope="function"),
+    current_user: User = Depends(get_current_reader),
 ) -> GoalTrends:
     """Get trend data for a single goal over a date range."""
     if start_date > end_date:
@@ -147,19 +148,18 @@ async def create(
 @router.get("", response_model=list[GoalRead])
 async def list_all(
     active_only: bool = True,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session, scope="function"),
+    current_user: User = Depends(get_current_reader),
 ) -> list[GoalRead]:
     """List all goals for the authenticated user."""
-    goals = await list_goals(session, current_user.id, active_only=active_only)
-    return goals  # type: ignore[return-value]
+    return await list_goals(session, current_user.id, active_only=active_only)
 
 
 @router.get("/{goal_id}", response_model=GoalRead)
 async def read_one(
     goal_id: uuid.UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session, scope="function"),
+    current_user: User = Depends(get_current_reader),
 ) -> GoalRead:
     """Get a single goal by ID."""
     goal = await get_goal(session, goal_id, current_user.id)
@@ -0,0 +1,28 @@
+"""Internal operational endpoints (metrics).  Not part of the public API."""
+
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.core.deps import require_internal_access
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, collect, render_prometheus
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(require_internal_access)],
+    include_in_schema=False,
+)
+
+
+@router.get("/metrics")
+async def metrics() -> dict[str, Any]:
+    """Snapshot of every registered metric (all workers when merging is configured)."""
+    return collect()
+
+
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """The same metrics in the Prometheus text exposition format, for scraping."""
+    return PlainTextResponse(render_prometheus(collect()), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,81 @@
+"""Strava integration endpoints: history backfill and webhook ingestion."""
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import SessionReleasingRoute, get_read_session, get_session
+from app.core.deps import get_current_reader, get_current_user
+from app.core.settings import get_settings
+from app.models.strava import BackfillRead, StravaWebhookEvent
+from app.schemas.strava import StravaBackfillJob
+from app.schemas.user import User
+from app.services.strava_backfill import get_backfill_job, schedule_backfill, start_backfill
+from app.services.strava_webhook import enqueue_event
+
+logger = structlog.get_logger()
+
+router = APIRouter(prefix="/strava", tags=["strava"], route_class=SessionReleasingRoute)
+
+
+@router.get("/backfill", response_model=BackfillRead)
+async def backfill_status(
+    session: AsyncSession = Depends(get_read_session, scope="function"),
+    current_user: User = Depends(get_current_reader),
+) -> StravaBackfillJob:
+    """Return progress of the current user's Strava history import."""
+    job = await get_backfill_job(session, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No Strava backfill for this user")
+    return job
+
+
+@router.post("/backfill", response_model=BackfillRead, status_code=202)
+async def resume_backfill(
+    restart: bool = False,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> StravaBackfillJob:
+    """Resume (or with ``restart=true``, restart) the Strava history import."""
+    if not current_user.strava_connected:
+        raise HTTPException(
+            status_code=404,
+            detail="Strava account not linked. Connect Strava first.",
+        )
+    job = await start_backfill(session, current_user.id, restart=restart)
+    await session.commit()
+    schedule_backfill(current_user.id)
+    return job
+
+
+# ── Webhook ─────────────────────────────────────────────────────────────────
+
+
+@router.get("/webhook")
+async def verify_webhook_subscription(
+    hub_mode: str = Query(alias="hub.mode"),
+    hub_challenge: str = Query(alias="hub.challenge"),
+    hub_verify_token: str = Query(alias="hub.verify_token"),
+) -> dict[str, str]:
+    """Answer Strava's subscription validation request by echoing the challenge."""
+    expected = get_settings().strava_webhook_verify_token
+    if hub_mode != "subscribe" or not expected or hub_verify_token != expected:
+        raise HTTPException(status_code=403, detail="Invalid webhook verification request")
+    return {"hub.challenge": hub_challenge}
+
+
+@router.post("/webhook")
+async def receive_webhook_event(event: StravaWebhookEvent) -> dict[str, str]:
+    """Queue a Strava push event; the worker applies it asynchronously."""
+    subscription_id = get_settings().strava_webhook_subscription_id
+    if subscription_id is None:
+        # Events are unsigned; without our subscription id anything could be posted.
+        logger.warning("strava_webhook_unconfigured")
+        raise HTTPException(status_code=403, detail="Webhook not configured")
+    if event.subscription_id != subscription_id:
+        logger.warning("strava_webhook_foreign_subscription", subscription_id=event.subscription_id)
+        raise HTTPException(status_code=403, detail="Unknown subscription")
+    if not enqueue_event(event):
+        # Non-2xx makes Strava redeliver the event later.
+        raise HTTPException(status_code=503, detail="Webhook queue full")
+    return {"status": "queued"}
@@ -3,13 +3,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.core.database import SessionReleasingRoute, get_session
 from app.core.deps import get_current_superuser
 from app.models.user import UserAdminCreate, UserCreate, UserRead
 from app.schemas.user import User
 from app.services.auth import AuthError, register_user
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=SessionReleasingRoute)
 
 
 @router.post("", response_model=UserRead, status_code=201)
@@ -1,4 +1,13 @@
 from app.schemas.goals import Goal, GoalCompletion
+from app.schemas.session import RefreshSession
+from app.schemas.strava import StravaActivity, StravaBackfillJob
 from app.schemas.user import User
 
-__all__ = ["Goal", "GoalCompletion", "User"]
+__all__ = [
+    "Goal",
+    "GoalCompletion",
+    "RefreshSession",
+    "StravaActivity",
+    "StravaBackfillJob",
+    "User",
+]
@@ -61,7 +61,11 @@ class Goal(SQLModel, table=True):
 
 class GoalCompletion(SQLModel, table=True):
     __tablename__ = "goal_completions"
-    __table_args__ = (Index("ix_goal_completions_goal_period", "goal_id", "period_start"),)
+    __table_args__ = (
+        Index("ix_goal_completions_goal_period", "goal_id", "period_start"),
+        # One completion per (goal, Strava activity); manual check-ins (NULL) are exempt.
+        Index("uq_goal_completions_goal_activity", "goal_id", "strava_activity_id", unique=True),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     goal_id: uuid.UUID = Field(
@@ -0,0 +1,43 @@
+"""Refresh-token session database schema (SQLModel table)."""
+
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import Field, SQLModel
+
+
+class RefreshSession(SQLModel, table=True):
+    """One issued refresh token; only its SHA-256 digest is stored.
+
+    Every rotation inserts a new row in the same ``family_id`` and stamps the
+    old one's ``used_at``.  Presenting a token whose row is already used means
+    it was stolen or replayed, so the whole family is revoked; the exception
+    is a short grace window after rotation, when the successor (an HMAC of
+    the old token, never stored) is handed out again, so two browser tabs
+    refreshing at the same moment don't log the user out.
+    """
+
+    __tablename__ = "refresh_sessions"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    token_hash: str = Field(max_length=64, unique=True, index=True)
+    family_id: uuid.UUID = Field(index=True)
+    user_id: uuid.UUID = Field(
+        sa_column_kwargs={"nullable": False},
+        foreign_key="users.id",
+        index=True,
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    expires_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    used_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    revoked_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
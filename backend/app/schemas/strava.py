@@ -0,0 +1,89 @@
+"""Strava activity store and backfill job database schemas (SQLModel tables)."""
+
+import uuid
+from datetime import UTC, date, datetime
+from enum import StrEnum
+
+from sqlalchemy import BigInteger, Column, DateTime, Index
+from sqlmodel import Field, SQLModel
+
+
+class StravaActivity(SQLModel, table=True):
+    """Summary of an ingested Strava activity, keyed by Strava's activity ID.
+
+    Kept so goals can be (re-)matched against history without refetching.
+    """
+
+    __tablename__ = "strava_activities"
+    __table_args__ = (Index("ix_strava_activities_user_date", "user_id", "local_date"),)
+
+    id: int = Field(sa_column=Column(BigInteger, primary_key=True, autoincrement=False))
+    user_id: uuid.UUID = Field(
+        sa_column_kwargs={"nullable": False},
+        foreign_key="users.id",
+    )
+    type: str = Field(default="", max_length=64)
+    sport_type: str = Field(default="", max_length=64)
+    name: str = Field(default="", max_length=256)
+    start_date: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    local_date: date = Field(nullable=False)
+    distance: float = Field(default=0)  # meters
+    moving_time: int = Field(default=0)  # seconds
+    ingested_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+
+class BackfillStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    RATE_LIMITED = "rate_limited"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class StravaBackfillJob(SQLModel, table=True):
+    """Checkpointed progress of a user's full-history Strava import.
+
+    ``cursor_before`` is the Unix timestamp of the oldest activity ingested so
+    far; a resumed job continues paging backwards from there.  A worker runs
+    the job only while it holds the lease (``lease_owner`` until
+    ``lease_expires_at``), so several workers or pods never run it at once.
+    """
+
+    __tablename__ = "strava_backfill_jobs"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    user_id: uuid.UUID = Field(
+        sa_column_kwargs={"nullable": False},
+        foreign_key="users.id",
+        unique=True,
+    )
+    status: BackfillStatus = Field(default=BackfillStatus.PENDING)
+    cursor_before: int | None = Field(default=None, sa_column=Column(BigInteger, nullable=True))
+    pages_fetched: int = Field(default=0)
+    activities_ingested: int = Field(default=0)
+    completions_added: int = Field(default=0)
+    error: str | None = Field(default=None, max_length=512)
+    resume_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    completed_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    lease_owner: str | None = Field(default=None, max_length=128)
+    lease_expires_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
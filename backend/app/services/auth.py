@@ -1,12 +1,28 @@
 """Authentication service — business logic for user registration and login."""
 
+import base64
+import contextlib
+import hashlib
+import hmac
+import secrets
+import uuid
+from datetime import UTC, datetime, timedelta
+
 import structlog
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from app.core.security import hash_password, verify_password
+from app.core.security import (
+    PasswordPoolBusyError,
+    hash_password_async,
+    needs_rehash,
+    verify_password_async,
+)
 from app.core.settings import get_settings
+from app.core.tracing import traced
 from app.models.user import UserCreate
+from app.schemas.session import RefreshSession
 from app.schemas.user import User
 
 logger = structlog.get_logger()
@@ -20,6 +36,26 @@ class AuthError(Exception):
         self.status_code = status_code
 
 
+_POOL_BUSY_DETAIL = "Too many sign-in attempts in progress; retry shortly."
+
+
+async def _hash(password: str) -> str:
+    try:
+        return await hash_password_async(password)
+    except PasswordPoolBusyError:
+        logger.warning("password_pool_busy", operation="hash")
+        raise AuthError(_POOL_BUSY_DETAIL, status_code=503) from None
+
+
+async def _verify(password: str, hashed: str) -> bool:
+    try:
+        return await verify_password_async(password, hashed)
+    except PasswordPoolBusyError:
+        logger.warning("password_pool_busy", operation="verify")
+        raise AuthError(_POOL_BUSY_DETAIL, status_code=503) from None
+
+
+@traced
 async def register_user(
     session: AsyncSession,
     data: UserCreate,
@@ -45,7 +81,7 @@ async def register_user(
 
     user = User(
         email=data.email,
-        hashed_password=hash_password(data.password),
+        hashed_password=await _hash(data.password),
         full_name=data.full_name,
     )
     session.add(user)
@@ -55,13 +91,14 @@ async def register_user(
     return user
 
 
+@traced
 async def authenticate_user(session: AsyncSession, email: str, password: str) -> User:
     """Verify credentials and return the user.  Raises ``AuthError`` on failure."""
     stmt = select(User).where(User.email == email)
     result = await session.execute(stmt)
     user = result.scalars().first()
 
-    if user is None or not verify_password(password, user.hashed_password):
+    if user is None or not await _verify(password, user.hashed_password):
         logger.warning("login_failed", email=email)
         raise AuthError("Invalid email or password.", status_code=401)
 
@@ -69,5 +106,136 @@ async def authenticate_user(session: AsyncSession, email: str, password: str) ->
         logger.warning("login_inactive_user", email=email)
         raise AuthError("User account is disabled.", status_code=403)
 
+    if needs_rehash(user.hashed_password):
+        # The plain password is only available now; upgrade to the current policy.
+        # Under load, leave it for a later login rather than failing this one.
+        with contextlib.suppress(PasswordPoolBusyError):
+            user.hashed_password = await hash_password_async(password)
+            session.add(user)
+            logger.info("password_rehashed", user_id=str(user.id))
+
     logger.info("user_authenticated", user_id=str(user.id))
     return user
+
+
+# ── Refresh sessions ─────────────────────────────────────────────────────────
+
+
+def _digest(refresh_token: str) -> str:
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+def _successor_of(refresh_token: str) -> str:
+    # Derived, not stored: a racing replay can be handed the same successor
+    # without a live token ever sitting in the database.
+    mac = hmac.new(
+        get_settings().secret_key.encode(),
+        b"refresh-successor:" + refresh_token.encode(),
+        hashlib.sha256,
+    )
+    return base64.urlsafe_b64encode(mac.digest()).rstrip(b"=").decode()
+
+
+@traced
+async def issue_refresh_token(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    *,
+    family_id: uuid.UUID | None = None,
+    token: str | None = None,
+) -> str:
+    """Create a refresh session and return its opaque token (shown only once)."""
+    token = token or secrets.token_urlsafe(32)
+    expires_at = datetime.now(UTC) + timedelta(days=get_settings().refresh_token_expire_days)
+    session.add(
+        RefreshSession(
+            token_hash=_digest(token),
+            family_id=family_id or uuid.uuid4(),
+            user_id=user_id,
+            expires_at=expires_at,
+        )
+    )
+    await session.flush()
+    return token
+
+
+async def _revoke_family(session: AsyncSession, family_id: uuid.UUID) -> None:
+    await session.execute(
+        update(RefreshSession)
+        .where(RefreshSession.family_id == family_id, RefreshSession.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(UTC))
+    )
+
+
+@traced
+async def rotate_refresh_token(session: AsyncSession, refresh_token: str) -> tuple[User, str]:
+    """Exchange a refresh token for its successor and return ``(user, new_token)``.
+
+    The token is consumed with a single conditional ``UPDATE`` on its digest,
+    so two concurrent refreshes cannot both succeed.  Presenting an
+    already-rotated token revokes every session descended from the same login,
+    unless it was rotated within ``refresh_token_reuse_grace_seconds``: then
+    the same successor is returned again (another tab refreshed first).
+    Raises ``AuthError`` (401) for unknown, expired, revoked or reused tokens.
+    """
+    digest = _digest(refresh_token)
+    now = datetime.now(UTC)
+    new_token = _successor_of(refresh_token)
+    consumed = await session.execute(
+        update(RefreshSession)
+        .where(
+            RefreshSession.token_hash == digest,
+            RefreshSession.used_at.is_(None),
+            RefreshSession.revoked_at.is_(None),
+            RefreshSession.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(RefreshSession.user_id, RefreshSession.family_id)
+    )
+    row = consumed.first()
+
+    if row is None:
+        stmt = select(RefreshSession).where(RefreshSession.token_hash == digest)
+        existing = (await session.execute(stmt)).scalars().first()
+        if existing is not None and existing.used_at is not None and existing.revoked_at is None:
+            used_at = existing.used_at
+            if used_at.tzinfo is None:
+                used_at = used_at.replace(tzinfo=UTC)  # SQLite drops the offset
+            grace = timedelta(seconds=get_settings().refresh_token_reuse_grace_seconds)
+            if now - used_at <= grace:
+                user = await session.get(User, existing.user_id)
+                if user is not None and user.is_active:
+                    logger.info("refresh_token_rotated_concurrently", user_id=str(user.id))
+                    return user, new_token
+            await _revoke_family(session, existing.family_id)
+            # Commit before raising: the request's session rolls back on errors.
+            await session.commit()
+            logger.warning(
+                "refresh_token_reused",
+                user_id=str(existing.user_id),
+                family_id=str(existing.family_id),
+            )
+        raise AuthError("Invalid or expired refresh token.", status_code=401)
+
+    user_id, family_id = row
+    user = await session.get(User, user_id)
+    if user is None or not user.is_active:
+        await _revoke_family(session, family_id)
+        await session.commit()
+        raise AuthError("User account is disabled.", status_code=403)
+
+    await issue_refresh_token(session, user_id, family_id=family_id, token=new_token)
+    logger.info("refresh_token_rotated", user_id=str(user_id))
+    return user, new_token
+
+
+@traced
+async def revoke_refresh_token(session: AsyncSession, refresh_token: str) -> None:
+    """Log out: revoke the token's whole session family.  Unknown tokens are ignored."""
+    stmt = select(RefreshSession.family_id).where(
+        RefreshSession.token_hash == _digest(refresh_token)
+    )
+    family_id = (await session.execute(stmt)).scalars().first()
+    if family_id is not None:
+        await _revoke_family(session, family_id)
+        logger.info("refresh_session_revoked", family_id=str(family_id))
@@ -4,21 +4,33 @@ import uuid
 from datetime import UTC, date, datetime, timedelta
 
 import structlog
-from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
+from app.core.tracing import traced
 from app.models.goals import (
+    GOAL_READ_LIST,
+    GOAL_WITH_PROGRESS_LIST,
+    TREND_POINT_LIST,
     CheckInCreate,
+    GoalRead,
     GoalTrends,
     GoalWithProgress,
-    PeriodTrendPoint,
 )
 from app.schemas.goals import (
     Frequency,
-    Goal,
     GoalCompletion,
 )
+from app.services.queries import (
+    ACTIVE_GOAL_ROWS_BY_OWNER,
+    GOAL_BY_OWNER,
+    GOAL_ROW_BY_OWNER,
+    PERIOD_COMPLETION_COUNT,
+    PERIOD_COMPLETIONS,
+    PERIOD_COUNTS_BY_GOAL,
+    TREND_AGGREGATES,
+    TREND_AGGREGATES_BY_GOAL,
+    row_dicts,
+)
 
 logger = structlog.get_logger()
 
@@ -43,6 +55,7 @@ def compute_period_start(frequency: Frequency | None, dt: date) -> date:
     return dt
 
 
+@traced
 async def check_in(
     session: AsyncSession,
     goal_id: uuid.UUID,
@@ -54,8 +67,7 @@ async def check_in(
     Raises ValueError if the goal is already fully completed for the current period.
     """
     # Fetch goal (scoped to user).
-    stmt = select(Goal).where(Goal.id == goal_id, Goal.user_id == user_id)
-    result = await session.execute(stmt)
+    result = await session.execute(GOAL_BY_OWNER, {"goal_id": goal_id, "user_id": user_id})
     goal = result.scalars().first()
 
     if goal is None:
@@ -69,12 +81,8 @@ async def check_in(
     ps = compute_period_start(goal.frequency, today)
 
     # Count existing completions for this period.
-    count_stmt = (
-        select(func.count())
-        .where(GoalCompletion.goal_id == goal_id)
-        .where(GoalCompletion.period_start == ps)
-    )
-    current_count = (await session.execute(count_stmt)).scalar_one()
+    params = {"goal_id": goal_id, "period_start": ps}
+    current_count = (await session.execute(PERIOD_COMPLETION_COUNT, params)).scalar_one()
 
     if current_count >= goal.target_count:
         msg = "Goal already completed for this period"
@@ -99,19 +107,15 @@ async def check_in(
     return completion
 
 
+@traced
 async def list_goals_with_progress(
     session: AsyncSession,
     user_id: uuid.UUID,
 ) -> list[GoalWithProgress]:
     """Return all active goals for a user with current-period progress."""
-    # Fetch active goals.
-    goals_stmt = (
-        select(Goal)
-        .where(Goal.user_id == user_id, Goal.is_active.is_(True))
-        .order_by(Goal.created_at.desc())
-    )
-    goals_result = await session.execute(goals_stmt)
-    goals = list(goals_result.scalars().all())
+    # Fetch active goals as plain rows; only response models are built from them.
+    goals_result = await session.execute(ACTIVE_GOAL_ROWS_BY_OWNER, {"user_id": user_id})
+    goals = row_dicts(goals_result)
 
     if not goals:
         return []
@@ -121,7 +125,7 @@ async def list_goals_with_progress(
     # Build a map of goal_id -> period_start for the current period.
     period_map: dict[uuid.UUID, date] = {}
     for g in goals:
-        period_map[g.id] = compute_period_start(g.frequency, today)
+        period_map[g["id"]] = compute_period_start(g["frequency"], today)
 
     # Batch-query completion counts: one query per distinct period_start value.
     # Group goals by their period_start to minimise queries.
@@ -131,56 +135,36 @@ async def list_goals_with_progress(
 
     counts: dict[uuid.UUID, int] = {}
     for ps, goal_ids in ps_to_goal_ids.items():
-        stmt = (
-            select(GoalCompletion.goal_id, func.count())
-            .where(
-                GoalCompletion.goal_id.in_(goal_ids),
-                GoalCompletion.period_start == ps,
-            )
-            .group_by(GoalCompletion.goal_id)
-        )
-        rows = (await session.execute(stmt)).all()
+        params = {"goal_ids": goal_ids, "period_start": ps}
+        rows = (await session.execute(PERIOD_COUNTS_BY_GOAL, params)).all()
         for gid, cnt in rows:
             counts[gid] = cnt
 
-    # Assemble response.
-    result: list[GoalWithProgress] = []
+    # Assemble response: fill in progress, then validate the whole list once.
     for g in goals:
-        completions = counts.get(g.id, 0)
-        is_completed = completions >= g.target_count
-        progress = GoalWithProgress.model_validate(
-            g,
-            from_attributes=True,
-        )
-        progress.period_completions = completions
-        progress.is_completed = is_completed
-        result.append(progress)
+        completions = counts.get(g["id"], 0)
+        g["period_completions"] = completions
+        g["is_completed"] = completions >= g["target_count"]
 
-    return result
+    return GOAL_WITH_PROGRESS_LIST.validate_python(goals)
 
 
+@traced
 async def list_completions_for_period(
     session: AsyncSession,
     goal_id: uuid.UUID,
     user_id: uuid.UUID,
 ) -> list[GoalCompletion]:
     """Return all completions for a goal in the current period."""
-    stmt = select(Goal).where(Goal.id == goal_id, Goal.user_id == user_id)
-    result = await session.execute(stmt)
-    goal = result.scalars().first()
+    goal = await _get_goal_if_owned(session, goal_id, user_id)
     if goal is None:
         return []
 
     today = date.today()
     ps = compute_period_start(goal.frequency, today)
 
-    stmt = (
-        select(GoalCompletion)
-        .where(GoalCompletion.goal_id == goal_id)
-        .where(GoalCompletion.period_start == ps)
-        .order_by(GoalCompletion.completed_at.desc())
-    )
-    result = await session.execute(stmt)
+    params = {"goal_id": goal_id, "period_start": ps}
+    result = await session.execute(PERIOD_COMPLETIONS, params)
     return list(result.scalars().all())
 
 
@@ -221,6 +205,7 @@ def iter_periods_in_range(
     return [start_date]
 
 
+@traced
 async def get_goal_trends(
     session: AsyncSession,
     goal_id: uuid.UUID,
@@ -237,6 +222,7 @@ async def get_goal_trends(
     return await _build_goal_trends(session, goal, start_date, end_date)
 
 
+@traced
 async def get_all_goals_trends(
     session: AsyncSession,
     user_id: uuid.UUID,
@@ -245,80 +231,74 @@ async def get_all_goals_trends(
     end_date: date,
 ) -> list[GoalTrends]:
     """Return trend data for all active goals over a date range."""
-    stmt = (
-        select(Goal)
-        .where(Goal.user_id == user_id, Goal.is_active.is_(True))
-        .order_by(Goal.created_at.desc())
-    )
-    result = await session.execute(stmt)
-    goals = list(result.scalars().all())
+    result = await session.execute(ACTIVE_GOAL_ROWS_BY_OWNER, {"user_id": user_id})
+    goals = GOAL_READ_LIST.validate_python(row_dicts(result))
     if not goals:
         return []
 
-    return [await _build_goal_trends(session, g, start_date, end_date) for g in goals]
+    # One grouped query for every goal, rather than one per goal.
+    params = {"goal_ids": [g.id for g in goals], "start_date": start_date, "end_date": end_date}
+    by_goal: dict[uuid.UUID, dict[date, tuple[int, float | None, float | None]]] = {}
+    for goal_id, ps, cnt, sum_val, avg_val in await session.execute(
+        TREND_AGGREGATES_BY_GOAL, params
+    ):
+        by_goal.setdefault(goal_id, {})[ps] = (cnt, sum_val, avg_val)
+
+    return [
+        _goal_trends(
+            g, iter_periods_in_range(g.frequency, start_date, end_date), by_goal.get(g.id, {})
+        )
+        for g in goals
+    ]
 
 
 async def _get_goal_if_owned(
     session: AsyncSession,
     goal_id: uuid.UUID,
     user_id: uuid.UUID,
-) -> Goal | None:
-    stmt = select(Goal).where(Goal.id == goal_id, Goal.user_id == user_id)
-    result = await session.execute(stmt)
-    return result.scalars().first()
+) -> GoalRead | None:
+    params = {"goal_id": goal_id, "user_id": user_id}
+    rows = row_dicts(await session.execute(GOAL_ROW_BY_OWNER, params))
+    return GoalRead.model_validate(rows[0]) if rows else None
 
 
 async def _build_goal_trends(
     session: AsyncSession,
-    goal: Goal,
+    goal: GoalRead,
     start_date: date,
     end_date: date,
 ) -> GoalTrends:
     """Build trend data for one goal."""
-    from app.models.goals import GoalRead
-
     periods = iter_periods_in_range(goal.frequency, start_date, end_date)
     if not periods:
-        return GoalTrends(
-            goal=GoalRead.model_validate(goal, from_attributes=True),
-            periods=[],
-        )
+        return GoalTrends(goal=goal, periods=[])
+
+    params = {"goal_id": goal.id, "start_date": start_date, "end_date": end_date}
+    rows = (await session.execute(TREND_AGGREGATES, params)).all()
+    by_period = {ps: (cnt, sum_val, avg_val) for ps, cnt, sum_val, avg_val in rows}
+    return _goal_trends(goal, periods, by_period)
 
-    stmt = (
-        select(
-            GoalCompletion.period_start,
-            func.count().label("cnt"),
-            func.sum(GoalCompletion.value).label("sum_val"),
-            func.avg(GoalCompletion.value).label("avg_val"),
-        )
-        .where(
-            GoalCompletion.goal_id == goal.id,
-            GoalCompletion.period_start >= start_date,
-            GoalCompletion.period_start <= end_date,
-        )
-        .group_by(GoalCompletion.period_start)
-    )
-    rows = (await session.execute(stmt)).all()
-    by_period: dict[date, tuple[int, float | None, float | None]] = {}
-    for ps, cnt, sum_val, avg_val in rows:
-        by_period[ps] = (cnt, sum_val, avg_val)
 
-    points: list[PeriodTrendPoint] = []
+def _goal_trends(
+    goal: GoalRead,
+    periods: list[date],
+    by_period: dict[date, tuple[int, float | None, float | None]],
+) -> GoalTrends:
+    """Fill each of *periods* from its aggregates (zero where there are none)."""
+    # Long (e.g. daily) series: build plain dicts and validate them in one call.
+    target = goal.target_count
+    points: list[dict] = []
     for ps in periods:
         cnt, sum_val, avg_val = by_period.get(ps, (0, None, None))
-        is_completed = cnt >= goal.target_count
         points.append(
-            PeriodTrendPoint(
-                period_start=ps,
-                completion_count=cnt,
-                target_count=goal.target_count,
-                is_completed=is_completed,
-                sum_value=float(sum_val) if sum_val is not None else None,
-                avg_value=float(avg_val) if avg_val is not None else None,
-            )
+            {
+                "period_start": ps,
+                "completion_count": cnt,
+                "target_count": target,
+                "is_completed": cnt >= target,
+                "sum_value": float(sum_val) if sum_val is not None else None,
+                "avg_value": float(avg_val) if avg_val is not None else None,
+            }
         )
 
-    return GoalTrends(
-        goal=GoalRead.model_validate(goal, from_attributes=True),
-        periods=points,
-    )
+    return GoalTrends(goal=goal, periods=TREND_POINT_LIST.validate_python(points))
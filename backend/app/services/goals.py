@@ -5,14 +5,40 @@ from datetime import UTC, date, datetime
 
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
-from app.models.goals import GoalCreate, GoalUpdate, _validate_goal_fields
+from app.core.tracing import traced
+from app.models.goals import (
+    GOAL_READ_LIST,
+    GoalCreate,
+    GoalRead,
+    GoalUpdate,
+    _validate_goal_fields,
+)
 from app.schemas.goals import Goal
+from app.services.queries import (
+    ACTIVE_GOAL_ROWS_BY_OWNER,
+    GOAL_BY_OWNER,
+    GOAL_ROWS_BY_OWNER,
+    row_dicts,
+)
+from app.services.strava_sync import rematch_goal
 
 logger = structlog.get_logger()
 
+# Edits to any of these change which activities match, or the period or value
+# they were recorded with, so previously matched Strava completions are rebuilt.
+_REMATCH_FIELDS = frozenset(
+    {
+        "strava_activity_types",
+        "frequency",
+        "start_date",
+        "end_date",
+        "value_type",
+    }
+)
 
+
+@traced
 async def create_goal(
     session: AsyncSession,
     user_id: uuid.UUID,
@@ -36,35 +62,37 @@ async def create_goal(
     await session.flush()
     await session.refresh(goal)
     logger.info("goal_created", goal_id=str(goal.id), user_id=str(user_id))
+    if goal.strava_activity_types:
+        # Backfill from already-ingested activities instead of calling Strava.
+        await rematch_goal(session, goal)
     return goal
 
 
+@traced
 async def list_goals(
     session: AsyncSession,
     user_id: uuid.UUID,
     *,
     active_only: bool = True,
-) -> list[Goal]:
+) -> list[GoalRead]:
     """Return all goals for a user, optionally filtered to active only."""
-    stmt = select(Goal).where(Goal.user_id == user_id)
-    if active_only:
-        stmt = stmt.where(Goal.is_active.is_(True))
-    stmt = stmt.order_by(Goal.created_at.desc())
-    result = await session.execute(stmt)
-    return list(result.scalars().all())
+    stmt = ACTIVE_GOAL_ROWS_BY_OWNER if active_only else GOAL_ROWS_BY_OWNER
+    result = await session.execute(stmt, {"user_id": user_id})
+    return GOAL_READ_LIST.validate_python(row_dicts(result))
 
 
+@traced
 async def get_goal(
     session: AsyncSession,
     goal_id: uuid.UUID,
     user_id: uuid.UUID,
 ) -> Goal | None:
     """Return a single goal by ID, scoped to the owning user."""
-    stmt = select(Goal).where(Goal.id == goal_id, Goal.user_id == user_id)
-    result = await session.execute(stmt)
+    result = await session.execute(GOAL_BY_OWNER, {"goal_id": goal_id, "user_id": user_id})
     return result.scalars().first()
 
 
+@traced
 async def update_goal(
     session: AsyncSession,
     goal_id: uuid.UUID,
@@ -80,6 +108,11 @@ async def update_goal(
         return None
 
     update_data = data.model_dump(exclude_unset=True)
+    needs_rematch = any(
+        getattr(goal, field) != value
+        for field, value in update_data.items()
+        if field in _REMATCH_FIELDS
+    )
     for field, value in update_data.items():
         setattr(goal, field, value)
 
@@ -97,9 +130,12 @@ async def update_goal(
     await session.flush()
     await session.refresh(goal)
     logger.info("goal_updated", goal_id=str(goal_id), user_id=str(user_id))
+    if needs_rematch:
+        await rematch_goal(session, goal)
     return goal
 
 
+@traced
 async def delete_goal(
     session: AsyncSession,
     goal_id: uuid.UUID,
@@ -0,0 +1,118 @@
+"""Prebuilt statements for the hot goal and completion queries.
+
+Building a ``select()`` on every call costs Python time for the construct
+itself and for its cache key before SQLAlchemy can even look up the compiled
+form.  These statements are built once at import with named ``bindparam``
+placeholders, so each execution reuses the same object, its memoized cache key
+and (on asyncpg) the same server-side prepared statement:
+
+    result = await session.execute(GOAL_BY_OWNER, {"goal_id": goal_id, "user_id": user_id})
+
+Variable-length ``IN`` lists use expanding parameters, which keep one cache
+entry regardless of the list length.
+
+Read paths that only feed response models select ``GOAL_READ_COLUMNS`` as
+plain rows rather than ``Goal`` entities, skipping the identity map and
+attribute instrumentation; ``row_dicts`` turns such a result into the dicts
+Pydantic validates fastest.
+"""
+
+from typing import Any
+
+from sqlalchemy import Result, bindparam, func
+from sqlmodel import select
+
+from app.models.goals import GoalRead
+from app.schemas.goals import Goal, GoalCompletion
+
+# ── Goals ────────────────────────────────────────────────────────────────────
+
+GOAL_BY_OWNER = select(Goal).where(
+    Goal.id == bindparam("goal_id"),
+    Goal.user_id == bindparam("user_id"),
+)
+
+# Exactly the columns GoalRead needs, in its field order.
+GOAL_READ_COLUMNS = tuple(Goal.__table__.c[name] for name in GoalRead.model_fields)
+
+GOAL_ROW_BY_OWNER = select(*GOAL_READ_COLUMNS).where(
+    Goal.id == bindparam("goal_id"),
+    Goal.user_id == bindparam("user_id"),
+)
+
+GOAL_ROWS_BY_OWNER = (
+    select(*GOAL_READ_COLUMNS)
+    .where(Goal.user_id == bindparam("user_id"))
+    .order_by(Goal.created_at.desc())
+)
+
+ACTIVE_GOAL_ROWS_BY_OWNER = (
+    select(*GOAL_READ_COLUMNS)
+    .where(Goal.user_id == bindparam("user_id"), Goal.is_active.is_(True))
+    .order_by(Goal.created_at.desc())
+)
+
+# ── Completions ──────────────────────────────────────────────────────────────
+
+PERIOD_COMPLETION_COUNT = select(func.count()).where(
+    GoalCompletion.goal_id == bindparam("goal_id"),
+    GoalCompletion.period_start == bindparam("period_start"),
+)
+
+PERIOD_COMPLETIONS = (
+    select(GoalCompletion)
+    .where(
+        GoalCompletion.goal_id == bindparam("goal_id"),
+        GoalCompletion.period_start == bindparam("period_start"),
+    )
+    .order_by(GoalCompletion.completed_at.desc())
+)
+
+# Dashboard: completions per goal for one period_start.
+PERIOD_COUNTS_BY_GOAL = (
+    select(GoalCompletion.goal_id, func.count())
+    .where(
+        GoalCompletion.goal_id.in_(bindparam("goal_ids", expanding=True)),
+        GoalCompletion.period_start == bindparam("period_start"),
+    )
+    .group_by(GoalCompletion.goal_id)
+)
+
+# Trends: per-period aggregates for one goal over [start_date, end_date].
+TREND_AGGREGATES = (
+    select(
+        GoalCompletion.period_start,
+        func.count().label("cnt"),
+        func.sum(GoalCompletion.value).label("sum_val"),
+        func.avg(GoalCompletion.value).label("avg_val"),
+    )
+    .where(
+        GoalCompletion.goal_id == bindparam("goal_id"),
+        GoalCompletion.period_start >= bindparam("start_date"),
+        GoalCompletion.period_start <= bindparam("end_date"),
+    )
+    .group_by(GoalCompletion.period_start)
+)
+
+# Trends for many goals at once: the same aggregates, also grouped by goal.
+TREND_AGGREGATES_BY_GOAL = (
+    select(
+        GoalCompletion.goal_id,
+        GoalCompletion.period_start,
+        func.count().label("cnt"),
+        func.sum(GoalCompletion.value).label("sum_val"),
+        func.avg(GoalCompletion.value).label("avg_val"),
+    )
+    .where(
+        GoalCompletion.goal_id.in_(bindparam("goal_ids", expanding=True)),
+        GoalCompletion.period_start >= bindparam("start_date"),
+        GoalCompletion.period_start <= bindparam("end_date"),
+    )
+    .group_by(GoalCompletion.goal_id, GoalCompletion.period_start)
+)
+
+
+def row_dicts(result: Result) -> list[dict[str, Any]]:
+    """The result's rows as plain dicts, keyed by column label."""
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row, strict=True)) for row in result]
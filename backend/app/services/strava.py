@@ -1,18 +1,145 @@
-"""Strava OAuth service — token exchange and refresh."""
+"""Strava API client — OAuth token exchange / refresh and activity reads."""
 
+import re
 import time
+from dataclasses import dataclass
 from typing import Any
 
 import httpx
 import structlog
 
+from app.core.metrics import registry
 from app.core.settings import get_settings
+from app.core.tracing import start_span, traced, tracing_enabled
 
 logger = structlog.get_logger()
 
 STRAVA_AUTH_URL = "https://www.strava.com/oauth/authorize"
-STRAVA_API_BASE = "https://www.strava.com/api/v3"
-STRAVA_TOKEN_URL = "https://www.strava.com/oauth/token"
+# Paths below are resolved against ``settings.strava_base_url``.
+STRAVA_API_BASE = "/api/v3"
+STRAVA_TOKEN_URL = "/oauth/token"
+
+# Strava's short-term rate-limit window resets on the quarter hour (UTC).
+RATE_LIMIT_WINDOW_SECONDS = 15 * 60
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitStatus:
+    """Parsed ``X-RateLimit-*`` headers: (15-minute, daily) limit and usage."""
+
+    short_limit: int
+    short_usage: int
+    daily_limit: int
+    daily_usage: int
+
+    @classmethod
+    def from_headers(cls, headers: httpx.Headers) -> "RateLimitStatus | None":
+        # Read endpoints report against the read limit when Strava sends it.
+        limit = headers.get("X-ReadRateLimit-Limit") or headers.get("X-RateLimit-Limit")
+        usage = headers.get("X-ReadRateLimit-Usage") or headers.get("X-RateLimit-Usage")
+        if not limit or not usage:
+            return None
+        try:
+            short_limit, daily_limit = (int(v) for v in limit.split(","))
+            short_usage, daily_usage = (int(v) for v in usage.split(","))
+        except ValueError:
+            return None
+        return cls(short_limit, short_usage, daily_limit, daily_usage)
+
+    def remaining(self) -> int:
+        return min(self.short_limit - self.short_usage, self.daily_limit - self.daily_usage)
+
+    def seconds_until_reset(self, now: float | None = None) -> float:
+        """Seconds until the exhausted window (15-minute or daily) resets."""
+        now = time.time() if now is None else now
+        if self.daily_usage >= self.daily_limit:
+            return 86_400 - (now % 86_400)
+        return RATE_LIMIT_WINDOW_SECONDS - (now % RATE_LIMIT_WINDOW_SECONDS)
+
+
+# One pooled client per process so Strava calls reuse connections and TLS sessions.
+_http_client: httpx.AsyncClient | None = None
+
+STRAVA_REQUEST_DURATION = registry.histogram(
+    "strava_request_duration_seconds",
+    "Strava API calls (count and latency) by method, endpoint and status",
+)
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def _endpoint(request: httpx.Request) -> str:
+    # /api/v3/activities/123 -> /api/v3/activities/{id}, so labels stay bounded.
+    return _ID_SEGMENT.sub("/{id}", request.url.path)
+
+
+async def _start_timer(request: httpx.Request) -> None:
+    if tracing_enabled():
+        request.extensions["span"] = start_span(
+            f"{request.method} {_endpoint(request)}",
+            {
+                "http.request.method": request.method,
+                "server.address": request.url.host,
+                "url.path": request.url.path,
+            },
+            kind="client",
+        )
+    request.extensions["started_at"] = time.perf_counter()
+
+
+async def _record_call(response: httpx.Response) -> None:
+    request = response.request
+    started_at = request.extensions.get("started_at")
+    if started_at is not None:
+        STRAVA_REQUEST_DURATION.observe(
+            time.perf_counter() - started_at,
+            method=request.method,
+            endpoint=_endpoint(request),
+            status=response.status_code,
+        )
+    if (span := request.extensions.get("span")) is not None:
+        span.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 400:
+            span.record_error(f"HTTP {response.status_code}")
+        span.end()
+
+
+def _instrument(client: httpx.AsyncClient) -> httpx.AsyncClient:
+    hooks = client.event_hooks
+    if _record_call not in hooks["response"]:
+        hooks["request"].append(_start_timer)
+        hooks["response"].append(_record_call)
+        client.event_hooks = hooks
+    return client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared Strava HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None:
+        _http_client = _instrument(httpx.AsyncClient(base_url=get_settings().strava_base_url))
+    return _http_client
+
+
+def set_http_client(client: httpx.AsyncClient | None) -> None:
+    """Replace the shared client, e.g. with one routed to a local Strava emulator."""
+    global _http_client
+    _http_client = _instrument(client) if client is not None else None
+
+
+async def close_http_client() -> None:
+    """Close the shared client's connection pool.  Call at shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class StravaRateLimitError(Exception):
+    """Raised when Strava answers 429; ``retry_after`` is in seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Strava rate limit exceeded; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
 
 
 def build_authorization_url(state: str) -> str:
@@ -33,24 +160,24 @@ def build_authorization_url(state: str) -> str:
     return f"{STRAVA_AUTH_URL}?{qs}"
 
 
+@traced
 async def exchange_code_for_tokens(code: str) -> dict[str, Any]:
     """Exchange an authorization code for access and refresh tokens."""
     settings = get_settings()
     if not settings.strava_id or not settings.strava_secret:
         raise ValueError("Strava OAuth not configured: STRAVA_ID and STRAVA_SECRET required")
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            STRAVA_TOKEN_URL,
-            data={
-                "client_id": settings.strava_id,
-                "client_secret": settings.strava_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-            },
-        )
-        response.raise_for_status()
-        data = response.json()
+    response = await get_http_client().post(
+        STRAVA_TOKEN_URL,
+        data={
+            "client_id": settings.strava_id,
+            "client_secret": settings.strava_secret,
+            "code": code,
+            "grant_type": "authorization_code",
+        },
+    )
+    response.raise_for_status()
+    data = response.json()
 
     logger.info(
         "strava_tokens_exchanged",
@@ -59,24 +186,24 @@ async def exchange_code_for_tokens(code: str) -> dict[str, Any]:
     return data
 
 
+@traced
 async def refresh_strava_token(refresh_token: str) -> dict[str, Any]:
     """Refresh an expired Strava access token."""
     settings = get_settings()
     if not settings.strava_id or not settings.strava_secret:
         raise ValueError("Strava OAuth not configured")
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            STRAVA_TOKEN_URL,
-            data={
-                "client_id": settings.strava_id,
-                "client_secret": settings.strava_secret,
-                "grant_type": "refresh_token",
-                "refresh_token": refresh_token,
-            },
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await get_http_client().post(
+        STRAVA_TOKEN_URL,
+        data={
+            "client_id": settings.strava_id,
+            "client_secret": settings.strava_secret,
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        },
+    )
+    response.raise_for_status()
+    return response.json()
 
 
 def is_token_expired(expires_at: int | None) -> bool:
@@ -87,17 +214,29 @@ def is_token_expired(expires_at: int | None) -> bool:
     return time.time() >= (expires_at - 3600)
 
 
+@traced
 async def fetch_athlete(access_token: str) -> dict[str, Any]:
     """Fetch the authenticated athlete's profile from Strava."""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{STRAVA_API_BASE}/athlete",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await get_http_client().get(
+        f"{STRAVA_API_BASE}/athlete",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    response.raise_for_status()
+    return response.json()
 
 
+@traced
+async def fetch_activity(access_token: str, activity_id: int) -> dict[str, Any]:
+    """Fetch a single activity by ID."""
+    response = await get_http_client().get(
+        f"{STRAVA_API_BASE}/activities/{activity_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@traced
 async def fetch_athlete_activities(
     access_token: str,
     *,
@@ -115,11 +254,38 @@ async def fetch_athlete_activities(
     if before is not None:
         params["before"] = before
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{STRAVA_API_BASE}/athlete/activities",
-            headers={"Authorization": f"Bearer {access_token}"},
-            params=params,
-        )
-        response.raise_for_status()
-        return response.json()
+    response = await get_http_client().get(
+        f"{STRAVA_API_BASE}/athlete/activities",
+        headers={"Authorization": f"Bearer {access_token}"},
+        params=params,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@traced
+async def fetch_athlete_activities_page(
+    access_token: str,
+    *,
+    before: int | None = None,
+    per_page: int = 200,
+) -> tuple[list[dict[str, Any]], RateLimitStatus | None]:
+    """Fetch one page of activities older than *before* plus the rate-limit state.
+
+    Raises ``StravaRateLimitError`` when the limit is already exhausted.
+    """
+    params: dict[str, int] = {"per_page": min(per_page, 200)}
+    if before is not None:
+        params["before"] = before
+
+    response = await get_http_client().get(
+        f"{STRAVA_API_BASE}/athlete/activities",
+        headers={"Authorization": f"Bearer {access_token}"},
+        params=params,
+    )
+    limits = RateLimitStatus.from_headers(response.headers)
+    if response.status_code == 429:
+        retry_after = limits.seconds_until_reset() if limits else RATE_LIMIT_WINDOW_SECONDS
+        raise StravaRateLimitError(retry_after)
+    response.raise_for_status()
+    return response.json(), limits
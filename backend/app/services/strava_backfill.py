@@ -0,0 +1,305 @@
+"""Resumable full-history Strava backfill.
+
+A backfill walks the athlete's activity list backwards one page at a time,
+ingests each page into the local store, matches it against Strava-linked
+goals and commits a checkpoint.  The job row survives restarts, so an
+interrupted or rate-limited backfill resumes from its cursor instead of
+starting over.
+
+Every worker process tries to resume unfinished jobs at startup, so a job is
+only run by the worker that claims its lease with a conditional UPDATE; each
+checkpoint renews the lease, and a crashed worker's job becomes claimable once
+its lease runs out.
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import structlog
+from sqlalchemy import or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.database import get_session_factory
+from app.core.settings import get_settings
+from app.core.tracing import traced
+from app.schemas.strava import BackfillStatus, StravaBackfillJob
+from app.schemas.user import User
+from app.services.strava import StravaRateLimitError, fetch_athlete_activities_page
+from app.services.strava_matcher import parse_activity
+from app.services.strava_store import ingest_activities
+from app.services.strava_sync import apply_activities, get_access_token, load_strava_goals
+
+logger = structlog.get_logger()
+
+_RESUMABLE = (BackfillStatus.PENDING, BackfillStatus.RUNNING, BackfillStatus.RATE_LIMITED)
+
+# Identifies this process as a lease holder (unique across hosts and restarts).
+_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Running backfills by user ID; holds strong references so tasks aren't GC'd.
+_tasks: dict[uuid.UUID, asyncio.Task] = {}
+
+
+async def get_backfill_job(session: AsyncSession, user_id: uuid.UUID) -> StravaBackfillJob | None:
+    stmt = select(StravaBackfillJob).where(StravaBackfillJob.user_id == user_id)
+    result = await session.execute(stmt)
+    return result.scalars().first()
+
+
+@traced
+async def start_backfill(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    *,
+    restart: bool = False,
+) -> StravaBackfillJob:
+    """Create the user's backfill job, or reset it to pending.
+
+    Without *restart* a failed or rate-limited job keeps its cursor and picks
+    up where it stopped; with it (e.g. after re-linking Strava) the walk starts
+    again from the newest activity.
+    """
+    job = await get_backfill_job(session, user_id)
+    now = datetime.now(UTC)
+    if job is None:
+        job = StravaBackfillJob(user_id=user_id)
+    elif restart:
+        job.cursor_before = None
+        job.pages_fetched = 0
+        job.activities_ingested = 0
+        job.completions_added = 0
+        job.completed_at = None
+    elif job.status == BackfillStatus.COMPLETED:
+        return job
+
+    job.status = BackfillStatus.PENDING
+    job.error = None
+    job.resume_at = None
+    job.updated_at = now
+    session.add(job)
+    await session.flush()
+    logger.info("strava_backfill_started", user_id=str(user_id), restart=restart)
+    return job
+
+
+def _lease() -> timedelta:
+    return timedelta(seconds=get_settings().strava_backfill_lease_seconds)
+
+
+async def _claim(session: AsyncSession, job: StravaBackfillJob) -> bool:
+    """Take the job's lease unless another live worker holds it."""
+    now = datetime.now(UTC)
+    stmt = (
+        update(StravaBackfillJob)
+        .where(
+            StravaBackfillJob.id == job.id,
+            StravaBackfillJob.status.in_(_RESUMABLE),
+            or_(
+                StravaBackfillJob.lease_owner.is_(None),
+                StravaBackfillJob.lease_owner == _WORKER_ID,
+                StravaBackfillJob.lease_expires_at < now,
+            ),
+        )
+        .values(
+            status=BackfillStatus.RUNNING,
+            resume_at=None,
+            lease_owner=_WORKER_ID,
+            lease_expires_at=now + _lease(),
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    claimed = (await session.execute(stmt)).rowcount == 1
+    await session.commit()
+    if claimed:
+        await session.refresh(job)
+    return claimed
+
+
+async def _checkpoint(
+    session: AsyncSession,
+    job: StravaBackfillJob,
+    *,
+    hold_until: datetime | None = None,
+    **changes,
+) -> None:
+    """Save progress and renew the lease (until *hold_until*, plus the lease period)."""
+    for field, value in changes.items():
+        setattr(job, field, value)
+    job.updated_at = datetime.now(UTC)
+    if job.status in _RESUMABLE:
+        job.lease_expires_at = (hold_until or job.updated_at) + _lease()
+    else:
+        job.lease_owner = job.lease_expires_at = None
+    session.add(job)
+    await session.commit()
+
+
+async def _wait_for_rate_limit(
+    session: AsyncSession,
+    job: StravaBackfillJob,
+    seconds: float,
+) -> None:
+    resume_at = datetime.now(UTC) + timedelta(seconds=seconds)
+    await _checkpoint(
+        session, job, status=BackfillStatus.RATE_LIMITED, resume_at=resume_at, hold_until=resume_at
+    )
+    logger.info("strava_backfill_rate_limited", user_id=str(job.user_id), wait_s=round(seconds))
+    await asyncio.sleep(seconds)
+    await _checkpoint(session, job, status=BackfillStatus.RUNNING, resume_at=None)
+
+
+@traced
+async def run_backfill(session: AsyncSession, user_id: uuid.UUID) -> StravaBackfillJob | None:
+    """Drive a user's backfill job to completion, committing after every page.
+
+    Returns without doing anything if another worker holds the job's lease.
+    """
+    settings = get_settings()
+    page_size = min(settings.strava_backfill_page_size, 200)
+
+    job = await get_backfill_job(session, user_id)
+    if job is None or job.status not in _RESUMABLE:
+        return job
+    if not await _claim(session, job):
+        logger.info("strava_backfill_leased_elsewhere", user_id=str(user_id))
+        return job
+
+    user = await session.get(User, user_id)
+    if user is None or not user.strava_connected:
+        await _checkpoint(session, job, status=BackfillStatus.FAILED, error="Strava not linked")
+        return job
+
+    matcher = await load_strava_goals(session, user_id)
+
+    while True:
+        try:
+            access_token = await get_access_token(session, user)
+            page, limits = await fetch_athlete_activities_page(
+                access_token,
+                before=job.cursor_before,
+                per_page=page_size,
+            )
+        except StravaRateLimitError as exc:
+            await _wait_for_rate_limit(session, job, exc.retry_after)
+            continue
+        except (httpx.HTTPError, KeyError, ValueError) as exc:
+            logger.warning("strava_backfill_failed", user_id=str(user_id), error=str(exc))
+            await _checkpoint(session, job, status=BackfillStatus.FAILED, error=str(exc)[:512])
+            return job
+
+        parsed = [a for a in map(parse_activity, page) if a is not None]
+        new = await ingest_activities(session, user_id, parsed)
+        added = 0
+        if new and matcher:
+            added, _ = await apply_activities(session, matcher, new)
+
+        changes: dict = {
+            "pages_fetched": job.pages_fetched + 1,
+            "activities_ingested": job.activities_ingested + len(new),
+            "completions_added": job.completions_added + added,
+        }
+        if parsed:
+            changes["cursor_before"] = min(int(a.started_at.timestamp()) for a in parsed)
+
+        if len(page) < page_size or not parsed:
+            await _checkpoint(
+                session,
+                job,
+                **changes,
+                status=BackfillStatus.COMPLETED,
+                completed_at=datetime.now(UTC),
+            )
+            logger.info(
+                "strava_backfill_completed",
+                user_id=str(user_id),
+                pages=job.pages_fetched,
+                activities=job.activities_ingested,
+            )
+            return job
+
+        await _checkpoint(session, job, **changes)
+
+        if limits is not None and limits.remaining() <= settings.strava_rate_limit_headroom:
+            await _wait_for_rate_limit(session, job, limits.seconds_until_reset())
+
+
+# ── Background runner ────────────────────────────────────────────────────────
+
+
+async def _release_lease(user_id: uuid.UUID) -> None:
+    """Give up this worker's lease so another worker can resume the job right away."""
+    async with get_session_factory()() as session:
+        await session.execute(
+            update(StravaBackfillJob)
+            .where(
+                StravaBackfillJob.user_id == user_id,
+                StravaBackfillJob.lease_owner == _WORKER_ID,
+            )
+            .values(lease_owner=None, lease_expires_at=None)
+        )
+        await session.commit()
+
+
+async def _run_in_background(user_id: uuid.UUID) -> None:
+    try:
+        async with get_session_factory()() as session:
+            await run_backfill(session, user_id)
+    except asyncio.CancelledError:
+        # Shutdown: the last checkpoint stands and the job resumes on next start.
+        raise
+    except Exception:
+        logger.exception("strava_backfill_crashed", user_id=str(user_id))
+    finally:
+        _tasks.pop(user_id, None)
+        try:
+            await _release_lease(user_id)
+        except Exception:
+            logger.warning("strava_backfill_lease_release_failed", user_id=str(user_id))
+
+
+def schedule_backfill(user_id: uuid.UUID) -> None:
+    """Run the user's backfill on the event loop unless one is already running."""
+    task = _tasks.get(user_id)
+    if task is not None and not task.done():
+        return
+    _tasks[user_id] = asyncio.create_task(_run_in_background(user_id))
+
+
+async def resume_backfills() -> int:
+    """Reschedule every unfinished backfill.  Call once at startup.
+
+    Every worker does this; jobs whose lease another worker holds are skipped
+    here, and the lease claim in ``run_backfill`` settles any remaining race.
+    """
+    try:
+        async with get_session_factory()() as session:
+            stmt = select(StravaBackfillJob.user_id).where(
+                StravaBackfillJob.status.in_(_RESUMABLE),
+                or_(
+                    StravaBackfillJob.lease_owner.is_(None),
+                    StravaBackfillJob.lease_expires_at < datetime.now(UTC),
+                ),
+            )
+            user_ids = list((await session.execute(stmt)).scalars().all())
+    except Exception:
+        logger.exception("strava_backfill_resume_failed")
+        return 0
+    for user_id in user_ids:
+        schedule_backfill(user_id)
+    if user_ids:
+        logger.info("strava_backfills_resumed", count=len(user_ids))
+    return len(user_ids)
+
+
+async def cancel_backfills() -> None:
+    """Cancel running backfills (their checkpoints are kept).  Call at shutdown."""
+    tasks = list(_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
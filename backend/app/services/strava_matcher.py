@@ -0,0 +1,199 @@
+"""Compiled activity → goal matcher for Strava ingestion.
+
+Building a ``GoalMatcher`` once per sync indexes the user's Strava-linked goals
+by activity / sport type and pre-resolves each goal's date window, period
+function and unit converter.  Matching an activity then only touches the goals
+registered for its type instead of scanning (and re-parsing) every goal.
+"""
+
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import partial
+from typing import Any
+
+from app.schemas.goals import Goal, ValueType
+from app.services.completions import compute_period_start
+
+# ── Unit registry ────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True, slots=True)
+class UnitConverter:
+    """Converts a raw Strava activity metric into a goal's ``value_unit``."""
+
+    name: str
+    source: str  # "distance" (meters) | "moving_time" (seconds)
+    factor: float  # raw metric is divided by this
+    ndigits: int
+
+    def convert(self, activity: "ParsedActivity") -> float:
+        raw = activity.distance if self.source == "distance" else activity.moving_time
+        return round(raw / self.factor, self.ndigits)
+
+
+# No one-letter aliases: in free text "k" is as likely thousand steps or kcal,
+# "h" and "m" hours, minutes or miles, and a wrong guess matches silently.
+_CONVERTERS: tuple[tuple[UnitConverter, tuple[str, ...]], ...] = (
+    (
+        UnitConverter("km", "distance", 1000, 2),
+        ("km", "kms", "kilometer", "kilometers", "kilometre", "kilometres"),
+    ),
+    (
+        UnitConverter("mi", "distance", 1609.34, 2),
+        ("mi", "mile", "miles"),
+    ),
+    (
+        UnitConverter("m", "distance", 1, 0),
+        ("meter", "meters", "metre", "metres"),
+    ),
+    (
+        UnitConverter("min", "moving_time", 60, 1),
+        ("min", "mins", "minute", "minutes"),
+    ),
+    (
+        UnitConverter("h", "moving_time", 3600, 2),
+        ("hr", "hrs", "hour", "hours"),
+    ),
+)
+
+UNIT_REGISTRY: dict[str, UnitConverter] = {
+    alias: converter for converter, aliases in _CONVERTERS for alias in aliases
+}
+
+
+def resolve_unit(value_unit: str | None) -> UnitConverter | None:
+    """Return the converter for a free-text goal unit, or None if unsupported.
+
+    Matches whole words after lower-casing, so ``"km"``, ``"Miles"`` and
+    ``"minutes run"`` resolve, while ``"min"`` no longer falls through to miles.
+    """
+    if not value_unit:
+        return None
+    normalized = value_unit.strip().lower()
+    if normalized in UNIT_REGISTRY:
+        return UNIT_REGISTRY[normalized]
+    for word in normalized.replace("/", " ").replace("-", " ").split():
+        converter = UNIT_REGISTRY.get(word.strip(".,()"))
+        if converter is not None:
+            return converter
+    return None
+
+
+# ── Activities ───────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedActivity:
+    """The subset of a Strava activity summary the matcher needs."""
+
+    id: int
+    type: str
+    sport_type: str
+    started_at: datetime
+    local_date: date
+    distance: float  # meters
+    moving_time: int  # seconds
+    name: str
+
+
+def parse_activity(activity: dict[str, Any]) -> ParsedActivity | None:
+    """Parse a Strava ``SummaryActivity`` payload; None if it is unusable."""
+    act_id = activity.get("id")
+    if act_id is None:
+        return None
+
+    start_date_str = activity.get("start_date") or activity.get("start_date_local") or ""
+    try:
+        # Parse ISO date (e.g. "2024-02-13T14:30:00Z")
+        local_date = date.fromisoformat(start_date_str.split("T")[0])
+        started_at = datetime.fromisoformat(start_date_str.replace("Z", "+00:00"))
+    except (ValueError, IndexError):
+        return None
+
+    act_type = activity.get("type") or ""
+    return ParsedActivity(
+        id=int(act_id),
+        type=act_type,
+        sport_type=activity.get("sport_type") or act_type,
+        started_at=started_at,
+        local_date=local_date,
+        distance=activity.get("distance") or 0,
+        moving_time=activity.get("moving_time") or 0,
+        name=activity.get("name") or "",
+    )
+
+
+# ── Goals ────────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledGoal:
+    """A goal with its matching parameters resolved up front."""
+
+    id: uuid.UUID
+    target_count: int
+    start_date: date
+    end_date: date | None
+    period_start: Callable[[date], date]
+    converter: UnitConverter | None
+
+    def in_window(self, d: date) -> bool:
+        return self.start_date <= d and (self.end_date is None or d <= self.end_date)
+
+    def value_for(self, activity: ParsedActivity) -> float | None:
+        return self.converter.convert(activity) if self.converter else None
+
+
+def compile_goal(goal: Goal) -> CompiledGoal:
+    converter = None
+    if goal.value_type == ValueType.NUMERIC:
+        converter = resolve_unit(goal.value_unit)
+    return CompiledGoal(
+        id=goal.id,
+        target_count=goal.target_count,
+        start_date=goal.start_date,
+        end_date=goal.end_date,
+        period_start=partial(compute_period_start, goal.frequency),
+        converter=converter,
+    )
+
+
+class GoalMatcher:
+    """Index of Strava-linked goals keyed by activity / sport type."""
+
+    def __init__(self, goals: Iterable[Goal]):
+        self._by_type: dict[str, list[CompiledGoal]] = {}
+        self._by_pair: dict[tuple[str, str], list[CompiledGoal]] = {}
+        self.goals: list[CompiledGoal] = []
+        for goal in goals:
+            types = set(goal.strava_activity_types or ())
+            if not types:
+                continue
+            compiled = compile_goal(goal)
+            self.goals.append(compiled)
+            for activity_type in types:
+                self._by_type.setdefault(activity_type, []).append(compiled)
+
+    def __bool__(self) -> bool:
+        return bool(self.goals)
+
+    @property
+    def activity_types(self) -> set[str]:
+        """All activity / sport types at least one goal is listening for."""
+        return set(self._by_type)
+
+    def match(self, activity: ParsedActivity) -> list[CompiledGoal]:
+        """Return goals whose type list and date window accept *activity*."""
+        key = (activity.type, activity.sport_type)
+        candidates = self._by_pair.get(key)
+        if candidates is None:
+            candidates = self._by_type.get(activity.type, [])
+            if activity.sport_type != activity.type:
+                # A goal may list both the legacy type and the sport type.
+                seen = {id(g) for g in candidates}
+                extra = [g for g in self._by_type.get(activity.sport_type, ()) if id(g) not in seen]
+                candidates = [*candidates, *extra]
+            self._by_pair[key] = candidates
+        return [g for g in candidates if g.in_window(activity.local_date)]
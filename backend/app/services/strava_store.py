@@ -0,0 +1,117 @@
+"""Local Strava activity store — ingested summaries kept for re-matching goals."""
+
+import uuid
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import structlog
+from sqlalchemy import or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.tracing import traced
+from app.schemas.goals import Goal
+from app.schemas.strava import StravaActivity
+from app.services.strava_matcher import ParsedActivity
+
+logger = structlog.get_logger()
+
+_UPSERT_COLUMNS = (
+    "type",
+    "sport_type",
+    "name",
+    "start_date",
+    "local_date",
+    "distance",
+    "moving_time",
+)
+
+
+def _to_row(user_id: uuid.UUID, activity: ParsedActivity, now: datetime) -> dict:
+    return {
+        "id": activity.id,
+        "user_id": user_id,
+        "type": activity.type[:64],
+        "sport_type": activity.sport_type[:64],
+        "name": activity.name[:256],
+        "start_date": activity.started_at,
+        "local_date": activity.local_date,
+        "distance": activity.distance,
+        "moving_time": activity.moving_time,
+        "ingested_at": now,
+    }
+
+
+def _to_parsed(row: StravaActivity) -> ParsedActivity:
+    return ParsedActivity(
+        id=row.id,
+        type=row.type,
+        sport_type=row.sport_type,
+        started_at=row.start_date,
+        local_date=row.local_date,
+        distance=row.distance,
+        moving_time=row.moving_time,
+        name=row.name,
+    )
+
+
+@traced
+async def ingest_activities(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    activities: Sequence[ParsedActivity],
+) -> list[ParsedActivity]:
+    """Upsert activity summaries for a user in one statement.
+
+    Activities already stored are refreshed in place (Strava lets athletes edit
+    type, name, etc.).  Returns only the activities that were not stored before.
+    """
+    if not activities:
+        return []
+
+    # Deduplicate within the batch; the last copy of an activity wins.
+    by_id = {a.id: a for a in activities}
+    known = await session.execute(
+        select(StravaActivity.id).where(StravaActivity.id.in_(list(by_id)))
+    )
+    known_ids = set(known.scalars().all())
+
+    now = datetime.now(UTC)
+    rows = [_to_row(user_id, a, now) for a in by_id.values()]
+    dialect = session.get_bind().dialect.name
+    insert_fn = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert_fn(StravaActivity.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={col: stmt.excluded[col] for col in _UPSERT_COLUMNS},
+    )
+    await session.execute(stmt, rows)
+
+    new = [a for a in by_id.values() if a.id not in known_ids]
+    logger.info(
+        "strava_activities_ingested",
+        user_id=str(user_id),
+        received=len(activities),
+        new=len(new),
+    )
+    return new
+
+
+@traced
+async def load_matching_activities(session: AsyncSession, goal: Goal) -> list[ParsedActivity]:
+    """Select stored activities that fall inside a goal's type list and date window."""
+    types = list(goal.strava_activity_types or [])
+    if not types:
+        return []
+
+    stmt = select(StravaActivity).where(
+        StravaActivity.user_id == goal.user_id,
+        or_(StravaActivity.type.in_(types), StravaActivity.sport_type.in_(types)),
+        StravaActivity.local_date >= goal.start_date,
+    )
+    if goal.end_date is not None:
+        stmt = stmt.where(StravaActivity.local_date <= goal.end_date)
+    stmt = stmt.order_by(StravaActivity.start_date)
+    result = await session.execute(stmt)
+    return [_to_parsed(row) for row in result.scalars().all()]
@@ -1,37 +1,35 @@
 """Strava activity sync — match activities to goals and create completions."""
 
 import uuid
+from collections.abc import Sequence
 from datetime import UTC, date, datetime, timedelta
 
 import structlog
-from sqlalchemy import func, update
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.principal_cache import invalidate_user
 from app.core.security import decrypt_token, encrypt_token
-from app.schemas.goals import Goal, GoalCompletion, ValueType
+from app.core.tracing import traced
+from app.schemas.goals import Goal, GoalCompletion
+from app.schemas.strava import StravaActivity
 from app.schemas.user import User
-from app.services.completions import compute_period_start
 from app.services.strava import (
     fetch_athlete_activities,
     is_token_expired,
     refresh_strava_token,
 )
+from app.services.strava_matcher import GoalMatcher, ParsedActivity, parse_activity
+from app.services.strava_store import ingest_activities, load_matching_activities
 
 logger = structlog.get_logger()
 
 
-async def sync_strava_to_goals(
-    session: AsyncSession,
-    user: User,
-) -> dict[str, int]:
-    """Fetch recent Strava activities and create completions for matching goals.
-
-    Returns a dict with keys: activities_fetched, completions_added, goals_updated.
-    """
-    if not user.strava_connected or not user.strava_access_token:
-        return {"activities_fetched": 0, "completions_added": 0, "goals_updated": 0}
-
+@traced
+async def get_access_token(session: AsyncSession, user: User) -> str:
+    """Return a usable Strava access token, refreshing and persisting it if expired."""
     access_token = decrypt_token(user.strava_access_token)
     refresh_token = decrypt_token(user.strava_refresh_token)
     if is_token_expired(user.strava_expires_at) and refresh_token:
@@ -48,8 +46,39 @@ async def sync_strava_to_goals(
         )
         await session.execute(stmt)
         await session.flush()
+        invalidate_user(user.id, session)
+    return access_token or ""
+
+
+@traced
+async def load_strava_goals(session: AsyncSession, user_id: uuid.UUID) -> GoalMatcher:
+    """Compile a matcher over the user's active Strava-linked goals."""
+    stmt = (
+        select(Goal)
+        .where(Goal.user_id == user_id, Goal.is_active.is_(True))
+        .where(Goal.strava_activity_types.isnot(None))
+    )
+    result = await session.execute(stmt)
+    return GoalMatcher(result.scalars().all())
 
-    # Fetch activities from last 31 days (covers monthly/yearly periods)
+
+@traced
+async def sync_strava_to_goals(
+    session: AsyncSession,
+    user: User,
+) -> dict[str, int]:
+    """Fetch recent Strava activities and create completions for matching goals.
+
+    Returns a dict with keys: activities_fetched, completions_added, goals_updated.
+    """
+    if not user.strava_connected or not user.strava_access_token:
+        return {"activities_fetched": 0, "completions_added": 0, "goals_updated": 0}
+
+    access_token = await get_access_token(session, user)
+
+    # Fetch activities from the last 31 days (covers monthly/yearly periods).
+    # The window stays fixed so late uploads (a watch synced days later, a
+    # manual entry) are still picked up.
     after_ts = int((datetime.now(UTC) - timedelta(days=31)).timestamp())
     try:
         activities = await fetch_athlete_activities(
@@ -61,112 +90,151 @@ async def sync_strava_to_goals(
         logger.warning("strava_sync_fetch_failed", error=str(e))
         return {"activities_fetched": 0, "completions_added": 0, "goals_updated": 0}
 
+    parsed = [a for a in map(parse_activity, activities) if a is not None]
+    await ingest_activities(session, user.id, parsed)
+
     # Goals with Strava integration
-    stmt = (
-        select(Goal)
-        .where(Goal.user_id == user.id, Goal.is_active.is_(True))
-        .where(Goal.strava_activity_types.isnot(None))
-    )
-    result = await session.execute(stmt)
-    goals = list(result.scalars().all())
+    matcher = await load_strava_goals(session, user.id)
 
-    if not goals:
+    if not matcher:
         return {
             "activities_fetched": len(activities),
             "completions_added": 0,
             "goals_updated": 0,
         }
 
-    completions_added = 0
-    goals_updated: set[uuid.UUID] = set()
+    # Every fetched activity, not just unseen ones: one stored earlier may have
+    # been edited on Strava since, or predate the goal it now matches.
+    # apply_activities skips matches that are already recorded.
+    completions_added, goals_updated = await apply_activities(session, matcher, parsed)
+    return {
+        "activities_fetched": len(activities),
+        "completions_added": completions_added,
+        "goals_updated": len(goals_updated),
+    }
 
-    for activity in activities:
-        act_type = activity.get("type") or ""
-        sport_type = activity.get("sport_type") or act_type
-        start_date_str = activity.get("start_date") or activity.get("start_date_local", "")
-        try:
-            # Parse ISO date (e.g. "2024-02-13T14:30:00Z")
-            act_date = date.fromisoformat(start_date_str.split("T")[0])
-        except (ValueError, IndexError):
-            continue
 
-        act_id = activity.get("id")
-        if act_id is None:
-            continue
+@traced
+async def apply_activities(
+    session: AsyncSession,
+    matcher: GoalMatcher,
+    activities: Sequence[ParsedActivity],
+) -> tuple[int, set[uuid.UUID]]:
+    """Create completions for every (activity, goal) match not already recorded.
 
-        distance = activity.get("distance") or 0  # meters
-        moving_time = activity.get("moving_time") or 0  # seconds
-        name = activity.get("name") or ""
+    Existing Strava completions and per-period counts are loaded in two bulk
+    queries up front, so the loop itself issues no SQL.
 
-        for goal in goals:
-            types_list = goal.strava_activity_types or []
-            if not types_list:
-                continue
+    Returns the number of completions added and the ids of the goals touched.
+    """
+    matches = [(activity, matcher.match(activity)) for activity in activities]
+    matches = [(activity, goals) for activity, goals in matches if goals]
+    if not matches:
+        return 0, set()
+
+    goal_ids = list({g.id for _, goals in matches for g in goals})
+    activity_ids = list({activity.id for activity, _ in matches})
+    earliest = min(
+        g.period_start(activity.local_date) for activity, goals in matches for g in goals
+    )
 
-            # Match activity type: check type or sport_type
-            if act_type not in types_list and sport_type not in types_list:
-                continue
+    existing_rows = await session.execute(
+        select(GoalCompletion.goal_id, GoalCompletion.strava_activity_id).where(
+            GoalCompletion.goal_id.in_(goal_ids),
+            GoalCompletion.strava_activity_id.in_(activity_ids),
+        )
+    )
+    existing: set[tuple[uuid.UUID, int]] = {(gid, aid) for gid, aid in existing_rows.all()}
 
-            # Check date range
-            if act_date < goal.start_date:
-                continue
-            if goal.end_date and act_date > goal.end_date:
-                continue
+    count_rows = await session.execute(
+        select(GoalCompletion.goal_id, GoalCompletion.period_start, func.count())
+        .where(
+            GoalCompletion.goal_id.in_(goal_ids),
+            GoalCompletion.period_start >= earliest,
+        )
+        .group_by(GoalCompletion.goal_id, GoalCompletion.period_start)
+    )
+    period_counts: dict[tuple[uuid.UUID, date], int] = {
+        (gid, ps): cnt for gid, ps, cnt in count_rows.all()
+    }
 
-            period_start = compute_period_start(goal.frequency, act_date)
+    now = datetime.now(UTC)
+    rows: list[dict] = []
 
+    for activity, goals in matches:
+        for goal in goals:
             # Already have completion for this activity?
-            existing = await session.execute(
-                select(GoalCompletion).where(
-                    GoalCompletion.goal_id == goal.id,
-                    GoalCompletion.strava_activity_id == act_id,
-                )
-            )
-            if existing.scalar_one_or_none():
+            if (goal.id, activity.id) in existing:
                 continue
 
-            # Count completions for this period
-            count_stmt = (
-                select(func.count())
-                .where(GoalCompletion.goal_id == goal.id)
-                .where(GoalCompletion.period_start == period_start)
-            )
-            current = (await session.execute(count_stmt)).scalar_one()
-            if current >= goal.target_count:
+            period_start = goal.period_start(activity.local_date)
+            key = (goal.id, period_start)
+            if period_counts.get(key, 0) >= goal.target_count:
                 continue
 
-            # Compute value for numeric goals (e.g. distance in km)
-            value = None
-            if goal.value_type == ValueType.NUMERIC and goal.value_unit:
-                unit_lower = goal.value_unit.lower()
-                if "km" in unit_lower or unit_lower == "k":
-                    value = round(distance / 1000, 2)
-                elif "mile" in unit_lower or "mi" in unit_lower:
-                    value = round(distance / 1609.34, 2)
-                elif "min" in unit_lower or "minute" in unit_lower:
-                    value = round(moving_time / 60, 1)
-
-            completion = GoalCompletion(
-                goal_id=goal.id,
-                completed_at=datetime.fromisoformat(start_date_str.replace("Z", "+00:00")),
-                period_start=period_start,
-                strava_activity_id=act_id,
-                value=value,
-                note=f"Strava: {name}" if name else "Strava activity",
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "goal_id": goal.id,
+                    "completed_at": activity.started_at,
+                    "period_start": period_start,
+                    "strava_activity_id": activity.id,
+                    "value": goal.value_for(activity),
+                    "note": f"Strava: {activity.name}" if activity.name else "Strava activity",
+                    "created_at": now,
+                }
             )
-            session.add(completion)
-            completions_added += 1
-            goals_updated.add(goal.id)
+            existing.add((goal.id, activity.id))
+            period_counts[key] = period_counts.get(key, 0) + 1
             logger.info(
                 "strava_completion_added",
                 goal_id=str(goal.id),
-                activity_id=act_id,
+                activity_id=activity.id,
                 period_start=str(period_start),
             )
 
-    await session.flush()
-    return {
-        "activities_fetched": len(activities),
-        "completions_added": completions_added,
-        "goals_updated": len(goals_updated),
-    }
+    if not rows:
+        return 0, set()
+    # Executemany insert — avoids building ORM objects for every completion.  A
+    # concurrent sync, backfill or webhook may have recorded the same match
+    # since we looked; the unique (goal, activity) index turns those into no-ops.
+    dialect = session.get_bind().dialect.name
+    insert_fn = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = (
+        insert_fn(GoalCompletion.__table__)
+        .on_conflict_do_nothing(index_elements=["goal_id", "strava_activity_id"])
+        .returning(GoalCompletion.__table__.c.goal_id)
+    )
+    inserted = (await session.execute(stmt, rows)).scalars().all()
+    return len(inserted), set(inserted)
+
+
+@traced
+async def rematch_goal(session: AsyncSession, goal: Goal) -> int:
+    """Rebuild a goal's Strava completions from the local activity store.
+
+    Strava-sourced completions for activities in the store are dropped first
+    so changes to the type list, frequency or date window are reflected.
+    Completions for activities the store doesn't hold (synced before it
+    existed) can't be rebuilt, so they are kept, as are manual check-ins.  No
+    Strava API calls are made.  Returns the number of completions created.
+    """
+    if not goal.is_active or not goal.strava_activity_types:
+        return 0
+
+    stored = select(StravaActivity.id).where(StravaActivity.user_id == goal.user_id)
+    await session.execute(
+        delete(GoalCompletion).where(
+            GoalCompletion.goal_id == goal.id,
+            GoalCompletion.strava_activity_id.in_(stored),
+        )
+    )
+    activities = await load_matching_activities(session, goal)
+    added, _ = await apply_activities(session, GoalMatcher([goal]), activities)
+    logger.info(
+        "strava_goal_rematched",
+        goal_id=str(goal.id),
+        activities=len(activities),
+        completions_added=added,
+    )
+    return added
@@ -0,0 +1,266 @@
+"""Strava webhook ingestion — queue push events and apply them per activity.
+
+The webhook endpoint must answer Strava within two seconds, so it only
+validates and enqueues.  A single worker task drains the queue and touches
+just the affected user and activity: one ``GET /activities/{id}`` for creates
+and type changes, no API call at all for renames.
+
+Events are unsigned, so destructive ones are confirmed with Strava before
+they apply: a delete only once ``GET /activities/{id}`` answers 404, a
+deauthorization only once the stored refresh token is refused.
+"""
+
+import asyncio
+import contextlib
+
+import httpx
+import structlog
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.database import get_session_factory
+from app.core.principal_cache import invalidate_user
+from app.core.security import decrypt_token, encrypt_token
+from app.core.settings import get_settings
+from app.core.tracing import traced
+from app.models.strava import StravaWebhookEvent
+from app.schemas.goals import Goal, GoalCompletion
+from app.schemas.strava import StravaActivity
+from app.schemas.user import User
+from app.services.strava import fetch_activity, refresh_strava_token
+from app.services.strava_matcher import parse_activity
+from app.services.strava_store import ingest_activities
+from app.services.strava_sync import apply_activities, get_access_token, load_strava_goals
+
+logger = structlog.get_logger()
+
+_queue: asyncio.Queue[StravaWebhookEvent] | None = None
+_worker: asyncio.Task | None = None
+
+
+def get_event_queue() -> asyncio.Queue[StravaWebhookEvent]:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=get_settings().strava_webhook_queue_size)
+    return _queue
+
+
+def enqueue_event(event: StravaWebhookEvent) -> bool:
+    """Queue an event for the worker.  Returns False if the queue is full."""
+    try:
+        get_event_queue().put_nowait(event)
+    except asyncio.QueueFull:
+        logger.warning(
+            "strava_webhook_dropped",
+            object_id=event.object_id,
+            aspect_type=event.aspect_type,
+        )
+        return False
+    return True
+
+
+# ── Processing ───────────────────────────────────────────────────────────────
+
+
+async def _delete_activity_completions(
+    session: AsyncSession,
+    user: User,
+    activity_id: int,
+) -> None:
+    user_goals = select(Goal.id).where(Goal.user_id == user.id)
+    await session.execute(
+        delete(GoalCompletion).where(
+            GoalCompletion.strava_activity_id == activity_id,
+            GoalCompletion.goal_id.in_(user_goals),
+        )
+    )
+
+
+async def _upsert_activity(session: AsyncSession, user: User, event: StravaWebhookEvent) -> int:
+    if event.aspect_type == "update" and set(event.updates) <= {"title"}:
+        # Renames don't affect matching; patch the stored copy without an API call.
+        await session.execute(
+            update(StravaActivity)
+            .where(StravaActivity.id == event.object_id, StravaActivity.user_id == user.id)
+            .values(name=str(event.updates.get("title", ""))[:256])
+        )
+        return 0
+
+    access_token = await get_access_token(session, user)
+    activity = parse_activity(await fetch_activity(access_token, event.object_id))
+    if activity is None:
+        return 0
+    await ingest_activities(session, user.id, [activity])
+
+    if event.aspect_type == "update":
+        # Type or date may have changed: drop the old matches and redo them.
+        await _delete_activity_completions(session, user, activity.id)
+
+    matcher = await load_strava_goals(session, user.id)
+    if not matcher:
+        return 0
+    added, _ = await apply_activities(session, matcher, [activity])
+    return added
+
+
+async def _activity_gone(session: AsyncSession, user: User, activity_id: int) -> bool:
+    """Whether Strava confirms the activity no longer exists."""
+    if not user.strava_connected:
+        return False  # nothing to ask Strava with
+    access_token = await get_access_token(session, user)
+    try:
+        await fetch_activity(access_token, activity_id)
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == 404:
+            return True
+        raise
+    return False
+
+
+async def _access_revoked(session: AsyncSession, user: User) -> bool:
+    """Whether Strava refuses the user's refresh token (i.e. they did deauthorize)."""
+    refresh_token = decrypt_token(user.strava_refresh_token)
+    if not refresh_token:
+        return False
+    try:
+        data = await refresh_strava_token(refresh_token)
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code in (400, 401):
+            return True
+        raise
+    # Still authorized; keep what the refresh handed out.
+    user.strava_access_token = encrypt_token(data["access_token"])
+    user.strava_refresh_token = encrypt_token(data["refresh_token"])
+    user.strava_expires_at = data["expires_at"]
+    session.add(user)
+    invalidate_user(user.id, session)
+    return False
+
+
+@traced
+async def process_event(session: AsyncSession, event: StravaWebhookEvent) -> None:
+    """Apply one webhook event to the owning user's store and completions."""
+    stmt = select(User).where(User.strava_athlete_id == str(event.owner_id))
+    user = (await session.execute(stmt)).scalars().first()
+    if user is None:
+        logger.info("strava_webhook_unknown_athlete", owner_id=event.owner_id)
+        return
+
+    if event.object_type == "athlete":
+        if str(event.updates.get("authorized", "")).lower() == "false":
+            if not await _access_revoked(session, user):
+                logger.warning("strava_webhook_unconfirmed_deauth", user_id=str(user.id))
+                return
+            user.strava_access_token = None
+            user.strava_refresh_token = None
+            user.strava_expires_at = None
+            session.add(user)
+            invalidate_user(user.id, session)
+            logger.info("strava_deauthorized", user_id=str(user.id))
+        return
+
+    if event.aspect_type == "delete":
+        if not await _activity_gone(session, user, event.object_id):
+            logger.warning(
+                "strava_webhook_unconfirmed_delete",
+                user_id=str(user.id),
+                activity_id=event.object_id,
+            )
+            return
+        await _delete_activity_completions(session, user, event.object_id)
+        await session.execute(
+            delete(StravaActivity).where(
+                StravaActivity.id == event.object_id,
+                StravaActivity.user_id == user.id,
+            )
+        )
+        added = 0
+    else:
+        if not user.strava_connected:
+            return
+        added = await _upsert_activity(session, user, event)
+
+    logger.info(
+        "strava_webhook_processed",
+        user_id=str(user.id),
+        activity_id=event.object_id,
+        aspect_type=event.aspect_type,
+        completions_added=added,
+    )
+
+
+async def handle_event(session: AsyncSession, event: StravaWebhookEvent) -> bool:
+    """Process and commit one event; on any error roll back and log it.
+
+    The session stays usable either way.  Returns whether the event applied.
+    """
+    try:
+        await process_event(session, event)
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        logger.exception(
+            "strava_webhook_failed",
+            object_id=event.object_id,
+            aspect_type=event.aspect_type,
+        )
+        return False
+    return True
+
+
+async def drain_event_queue(session: AsyncSession) -> int:
+    """Handle every queued event in order using *session*; returns the count."""
+    queue = get_event_queue()
+    processed = 0
+    while not queue.empty():
+        event = queue.get_nowait()
+        try:
+            await handle_event(session, event)
+        finally:
+            queue.task_done()
+        processed += 1
+    return processed
+
+
+# ── Worker ───────────────────────────────────────────────────────────────────
+
+
+async def _run_worker() -> None:
+    queue = get_event_queue()
+    factory = get_session_factory()
+    while True:
+        event = await queue.get()
+        try:
+            async with factory() as session:
+                await handle_event(session, event)
+        finally:
+            queue.task_done()
+
+
+def start_webhook_worker() -> None:
+    """Start the background consumer.  Call once at startup."""
+    global _worker
+    if _worker is None or _worker.done():
+        _worker = asyncio.create_task(_run_worker())
+
+
+async def stop_webhook_worker(timeout: float = 5.0) -> None:
+    """Stop the consumer after giving it *timeout* seconds to finish the queue.
+
+    Strava doesn't redeliver events it got a 200 for, so anything still queued
+    after that is lost; the count is logged.  Call at shutdown.
+    """
+    global _worker
+    if _worker is None:
+        return
+    queue = get_event_queue()
+    if not _worker.done():
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(queue.join(), timeout)
+    _worker.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _worker
+    _worker = None
+    if not queue.empty():
+        logger.warning("strava_webhook_events_dropped", count=queue.qsize())
@@ -0,0 +1 @@
+"""Standalone performance benchmarks (run with ``uv run python -m benchmarks.<name>``)."""
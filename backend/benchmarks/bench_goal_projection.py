@@ -0,0 +1,135 @@
+"""Benchmark: ORM entities vs. Core row projections on the goal read paths.
+
+Times ``list_goals`` and ``list_goals_with_progress`` for one user with many
+goals, comparing the previous approach (load ``Goal`` entities, then
+``model_validate(goal, from_attributes=True)``) with the current one (select
+``GOAL_READ_COLUMNS`` as rows and build the response models from mappings).
+Results are reported per goal, so the fixed query cost is amortised away.
+
+    uv run python -m benchmarks.bench_goal_projection --goals 1000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from datetime import date, timedelta
+
+import structlog
+from sqlalchemy import bindparam
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel, select
+
+from app.models.goals import GoalRead, GoalWithProgress
+from app.schemas.goals import Frequency, Goal, GoalCompletion, GoalType
+from app.schemas.user import User
+from app.services.completions import compute_period_start, list_goals_with_progress
+from app.services.goals import list_goals
+from app.services.queries import PERIOD_COUNTS_BY_GOAL
+
+ACTIVE_GOAL_ENTITIES = (
+    select(Goal)
+    .where(Goal.user_id == bindparam("user_id"), Goal.is_active.is_(True))
+    .order_by(Goal.created_at.desc())
+)
+
+
+async def list_goals_entities(session: AsyncSession, user_id: uuid.UUID) -> list[GoalRead]:
+    result = await session.execute(ACTIVE_GOAL_ENTITIES, {"user_id": user_id})
+    return [GoalRead.model_validate(g, from_attributes=True) for g in result.scalars()]
+
+
+async def dashboard_entities(session: AsyncSession, user_id: uuid.UUID) -> list[GoalWithProgress]:
+    result = await session.execute(ACTIVE_GOAL_ENTITIES, {"user_id": user_id})
+    goals = list(result.scalars().all())
+    today = date.today()
+    by_period: dict[date, list[uuid.UUID]] = {}
+    for g in goals:
+        by_period.setdefault(compute_period_start(g.frequency, today), []).append(g.id)
+    counts: dict[uuid.UUID, int] = {}
+    for ps, goal_ids in by_period.items():
+        params = {"goal_ids": goal_ids, "period_start": ps}
+        counts.update((await session.execute(PERIOD_COUNTS_BY_GOAL, params)).all())
+    out = []
+    for g in goals:
+        progress = GoalWithProgress.model_validate(g, from_attributes=True)
+        progress.period_completions = counts.get(g.id, 0)
+        progress.is_completed = progress.period_completions >= g.target_count
+        out.append(progress)
+    return out
+
+
+async def seed(session: AsyncSession, goals: int) -> uuid.UUID:
+    user = User(email="bench@example.com", hashed_password="x")
+    session.add(user)
+    today = date.today()
+    frequencies = list(Frequency)
+    for i in range(goals):
+        goal = Goal(
+            user_id=user.id,
+            title=f"Goal {i}",
+            goal_type=GoalType.PERIODIC,
+            frequency=frequencies[i % len(frequencies)],
+            target_count=3,
+            start_date=today - timedelta(days=90),
+            strava_activity_types=["Run"] if i % 3 == 0 else None,
+        )
+        session.add(goal)
+        session.add(
+            GoalCompletion(
+                goal_id=goal.id, period_start=compute_period_start(goal.frequency, today)
+            )
+        )
+    await session.commit()
+    return user.id
+
+
+async def _per_goal_us(factory, user_id: uuid.UUID, fn, goals: int, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        # A fresh session per round, as in a request: no warm identity map.
+        async with factory() as session:
+            start = time.perf_counter()
+            await fn(session, user_id)
+            best = min(best, time.perf_counter() - start)
+    return best / goals * 1e6
+
+
+async def bench(args: argparse.Namespace) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    def factory():
+        return AsyncSession(engine, expire_on_commit=False)
+
+    async with factory() as session:
+        user_id = await seed(session, args.goals)
+
+    print(f"{args.goals} goals, best of {args.rounds} rounds (µs per goal)")
+    print(f"{'path':<26} {'entities':>10} {'rows':>10}")
+    cases = (
+        ("list_goals", list_goals_entities, list_goals),
+        ("list_goals_with_progress", dashboard_entities, list_goals_with_progress),
+    )
+    for name, old, new in cases:
+        old_us = await _per_goal_us(factory, user_id, old, args.goals, args.rounds)
+        new_us = await _per_goal_us(factory, user_id, new, args.goals, args.rounds)
+        print(f"{name:<26} {old_us:10.1f} {new_us:10.1f}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--goals", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
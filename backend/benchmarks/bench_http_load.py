@@ -0,0 +1,474 @@
+"""Load test: concurrent users against one uvicorn worker over real HTTP.
+
+Starts ``create_app()`` under uvicorn in a separate process (one worker, on a
+temporary SQLite database unless ``--url`` is given), creates accounts and
+goals through the API, then runs closed-loop virtual users.  Each virtual user
+repeatedly picks a scenario from the ``--mix`` and waits a think time (the
+``--think-ms`` mean, drawn from an exponential distribution) between page
+views.  The scenarios make the same calls, in the same order, as the frontend
+(``frontend/src/api/goals.ts`` and the pages that use it):
+
+* login      — ``POST /auth/login``, ``GET /auth/me``, then the dashboard;
+* dashboard  — ``GET /goals/dashboard``;
+* check_in   — dashboard, ``POST /goals/{id}/check-in`` on an unfinished goal
+               (with a value or note for numeric/text goals), dashboard reload,
+               and sometimes ``GET /goals/{id}/completions``;
+* trends     — ``GET /goals/trends`` over a 7-day, 30-day or 12-week range;
+* goals      — ``GET /goals``, then ``GET /goals/{id}`` (the edit page).
+
+``--users`` takes a comma-separated list of stages.  Each stage ramps up to
+that many virtual users, measures for ``--duration`` seconds, and reports
+throughput, latency percentiles and error rates per endpoint.  The summary
+shows the largest stage that stayed within ``--slo-p99-ms`` with under 1%
+errors:
+
+    uv run python -m benchmarks.bench_http_load --users 10,25,50,100 --duration 30
+
+Pass ``--base-url`` to load an already-running server instead.  Accounts are
+still created through the API, but no completion history is seeded.  Its
+login throttle has to allow repeated logins from one address
+(``LOGIN_THROTTLE_IP_LIMIT=0``, ``LOGIN_THROTTLE_EMAIL_LIMIT=0``).
+Registration and login cost depend on ``PASSWORD_BCRYPT_ROUNDS``, which the
+spawned server takes from the environment like any other setting.  The
+load generator itself runs on the same host, so on small machines it competes
+with the server for CPU.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from functools import partial
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import structlog
+from sqlalchemy import insert, select
+from sqlmodel import SQLModel
+
+from app.core.database import create_engine
+from app.core.settings import Settings
+from app.schemas.goals import Goal, GoalCompletion
+from app.services.completions import iter_periods_in_range
+
+API = "/api/v1"
+PASSWORD = "load-test-password"
+
+# What the seeded accounts track; targets are high enough that check-ins
+# rarely run out during a run.
+GOALS = [
+    {"title": "Drink water", "frequency": "daily", "target_count": 8},
+    {
+        "title": "Run",
+        "frequency": "weekly",
+        "target_count": 20,
+        "value_type": "numeric",
+        "value_unit": "km",
+    },
+    {"title": "Journal", "frequency": "daily", "target_count": 3, "value_type": "text"},
+    {"title": "Read a book", "frequency": "monthly", "target_count": 30},
+    {"title": "Climb", "frequency": "yearly", "target_count": 200},
+]
+
+
+# ── Virtual users ────────────────────────────────────────────────────────────
+
+
+@dataclass
+class Sample:
+    name: str
+    started: float
+    seconds: float
+    error: bool
+
+
+@dataclass
+class VirtualUser:
+    client: httpx.AsyncClient
+    email: str
+    rng: random.Random
+    think_seconds: float
+    samples: list[Sample]
+    headers: dict[str, str] = field(default_factory=dict)
+
+    async def call(self, method: str, path: str, name: str, **kwargs) -> httpx.Response | None:
+        """Make one request and record it under *name*; return the response if it succeeded."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, API + path, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        error = response is None or response.status_code >= 400
+        self.samples.append(Sample(name, started, time.perf_counter() - started, error))
+        return response if response is not None and response.is_success else None
+
+    async def think(self) -> None:
+        await asyncio.sleep(
+            self.rng.expovariate(1 / self.think_seconds) if self.think_seconds else 0
+        )
+
+
+# ── Scenarios (mirroring the frontend) ───────────────────────────────────────
+
+
+async def login(vu: VirtualUser) -> None:
+    """LoginPage → AuthContext.login → DashboardPage."""
+    response = await vu.call(
+        "POST", "/auth/login", "POST /auth/login", json={"email": vu.email, "password": PASSWORD}
+    )
+    if response is None:
+        return
+    vu.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    await vu.call("GET", "/auth/me", "GET /auth/me")
+    await dashboard(vu)
+
+
+async def dashboard(vu: VirtualUser) -> list[dict] | None:
+    """DashboardPage.loadDashboard."""
+    response = await vu.call("GET", "/goals/dashboard", "GET /goals/dashboard")
+    return response.json() if response is not None else None
+
+
+async def check_in(vu: VirtualUser) -> None:
+    """A quick or detailed check-in from a dashboard GoalCard, then the reload it triggers."""
+    goals = await dashboard(vu)
+    open_goals = [g for g in goals or () if not g["is_completed"]]
+    if not open_goals:
+        return
+    await vu.think()
+    goal = vu.rng.choice(open_goals)
+    body: dict = {}
+    if goal["value_type"] == "numeric":
+        body = {"value": round(vu.rng.uniform(1, 15), 1), "note": None}
+    elif goal["value_type"] == "text":
+        body = {"value": None, "note": "load test"}
+    path = f"/goals/{goal['id']}"
+    await vu.call("POST", f"{path}/check-in", "POST /goals/{id}/check-in", json=body)
+    await dashboard(vu)
+    if vu.rng.random() < 0.3:  # submissions panel open
+        await vu.call("GET", f"{path}/completions", "GET /goals/{id}/completions")
+
+
+async def trends(vu: VirtualUser) -> None:
+    """TrendsPage.loadTrends for one of its date range presets."""
+    end = date.today()
+    start = end - timedelta(days=vu.rng.choice((7, 30, 84)))
+    params = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+    await vu.call("GET", "/goals/trends", "GET /goals/trends", params=params)
+
+
+async def goals(vu: VirtualUser) -> None:
+    """GoalsPage, then EditGoalPage for one of the listed goals."""
+    response = await vu.call("GET", "/goals", "GET /goals", params={"active_only": True})
+    if response is None or not response.json():
+        return
+    await vu.think()
+    goal = vu.rng.choice(response.json())
+    await vu.call("GET", f"/goals/{goal['id']}", "GET /goals/{id}")
+
+
+SCENARIOS: dict[str, Callable[[VirtualUser], Awaitable[object]]] = {
+    "login": login,
+    "dashboard": dashboard,
+    "check_in": check_in,
+    "trends": trends,
+    "goals": goals,
+}
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# ── Setup ────────────────────────────────────────────────────────────────────
+
+
+async def create_accounts(client: httpx.AsyncClient, users: int) -> list[str]:
+    """Register *users* accounts and give each the GOALS, through the API."""
+    run = uuid.uuid4().hex[:8]  # unique emails, so an existing server can be reused
+    emails = [f"load-{run}-{n}@example.com" for n in range(users)]
+    limit = asyncio.Semaphore(8)
+
+    async def one(email: str) -> None:
+        async with limit:
+            credentials = {"email": email, "password": PASSWORD}
+            response = await client.post(f"{API}/auth/register", json=credentials)
+            response.raise_for_status()
+            response = await client.post(f"{API}/auth/login", json=credentials)
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            for goal in GOALS:
+                response = await client.post(
+                    f"{API}/goals",
+                    json={"goal_type": "periodic", "start_date": date.today().isoformat(), **goal},
+                    headers=headers,
+                )
+                response.raise_for_status()
+
+    await asyncio.gather(*(one(email) for email in emails))
+    return emails
+
+
+async def seed_history(url: str, days: int, seed: int) -> int:
+    """Backdate every goal and give it *days* of completions; return how many were added."""
+    rng = random.Random(seed)
+    today = date.today()
+    start = today - timedelta(days=days)
+    engine = create_engine(Settings(_env_file=None), url)
+    rows = []
+    async with engine.begin() as conn:
+        goals = (await conn.execute(select(Goal.id, Goal.frequency, Goal.target_count))).all()
+        await conn.execute(Goal.__table__.update().values(start_date=start))
+        for goal_id, frequency, target in goals:
+            for ps in iter_periods_in_range(frequency, start, today - timedelta(days=1)):
+                for _ in range(rng.randint(0, min(target, 10))):
+                    rows.append(
+                        {
+                            "id": uuid.UUID(int=rng.getrandbits(128)),
+                            "goal_id": goal_id,
+                            "completed_at": datetime.combine(ps, datetime.min.time(), UTC),
+                            "period_start": ps,
+                            "created_at": datetime.now(UTC),
+                        }
+                    )
+        for i in range(0, len(rows), 5000):
+            await conn.execute(insert(GoalCompletion.__table__), rows[i : i + 5000])
+    await engine.dispose()
+    return len(rows)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_server(url: str, port: int, log_path: str) -> asyncio.subprocess.Process:
+    """Run ``--serve`` in a child process and wait until it answers health checks."""
+    env = {**os.environ, "LOGIN_THROTTLE_IP_LIMIT": "0", "LOGIN_THROTTLE_EMAIL_LIMIT": "0"}
+    command = ["-m", "benchmarks.bench_http_load", "--serve", "--url", url, "--port", str(port)]
+    with open(log_path, "ab") as log:  # the app still logs every request; keep it off the report
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, *command, env=env, stdout=log, stderr=log
+        )
+    async with httpx.AsyncClient() as client:
+        for _ in range(300):
+            if process.returncode is not None:
+                raise RuntimeError(f"server exited with status {process.returncode}")
+            try:
+                if (await client.get(f"http://127.0.0.1:{port}{API}/health")).is_success:
+                    return process
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("server did not become healthy within 30s")
+
+
+def serve(args: argparse.Namespace) -> None:
+    """Child process: one uvicorn worker running ``create_app()`` on ``--url``."""
+    import uvicorn
+
+    from app.core.database import init_db
+    from app.main import create_app
+
+    with patch("app.main.init_db", partial(init_db, url=args.url)):
+        uvicorn.run(
+            create_app(), host="127.0.0.1", port=args.port, log_level="warning", access_log=False
+        )
+
+
+# ── Running and reporting ────────────────────────────────────────────────────
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+@dataclass
+class StageResult:
+    users: int
+    seconds: float
+    samples: list[Sample]
+
+    @property
+    def throughput(self) -> float:
+        return len(self.samples) / self.seconds
+
+    @property
+    def error_rate(self) -> float:
+        return sum(s.error for s in self.samples) / len(self.samples) if self.samples else 0.0
+
+    def p99_ms(self) -> float:
+        return _percentile([s.seconds for s in self.samples], 0.99) * 1000 if self.samples else 0
+
+
+async def run_stage(
+    base_url: str, emails: list[str], users: int, args: argparse.Namespace
+) -> StageResult:
+    samples: list[Sample] = []
+    names, weights = zip(*args.mix.items(), strict=True)
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    started = time.perf_counter()
+    measure_from = started + args.ramp_up
+    deadline = measure_from + args.duration
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def virtual_user(n: int) -> None:
+            vu = VirtualUser(
+                client,
+                emails[n],
+                random.Random(args.seed * 100_003 + n),
+                args.think_ms / 1000,
+                samples,
+            )
+            await asyncio.sleep(args.ramp_up * n / users)  # spread arrivals over the ramp-up
+            await login(vu)
+            while time.perf_counter() < deadline:
+                await vu.think()
+                await SCENARIOS[vu.rng.choices(names, weights)[0]](vu)
+
+        await asyncio.gather(*(virtual_user(n) for n in range(users)))
+
+    # Only requests started inside the measured window count (not the ramp-up, nor the
+    # scenarios still finishing after the deadline).
+    return StageResult(
+        users, args.duration, [s for s in samples if measure_from <= s.started < deadline]
+    )
+
+
+def report(result: StageResult) -> None:
+    print(
+        f"\n{result.users} users: {result.throughput:.1f} req/s, "
+        f"{result.error_rate:.1%} errors over {result.seconds:.0f}s"
+    )
+    print(
+        f"{'endpoint':<30} {'count':>7} {'req/s':>7} {'p50 ms':>8} {'p90 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8} {'errors':>7}"
+    )
+    by_name: dict[str, list[Sample]] = defaultdict(list)
+    for sample in result.samples:
+        by_name[sample.name].append(sample)
+    for name in sorted(by_name, key=lambda n: -len(by_name[n])):
+        group = by_name[name]
+        ms = [s.seconds * 1000 for s in group]
+        print(
+            f"{name:<30} {len(group):7d} {len(group) / result.seconds:7.1f} "
+            f"{_percentile(ms, 0.5):8.1f} {_percentile(ms, 0.9):8.1f} "
+            f"{_percentile(ms, 0.99):8.1f} {max(ms):8.1f} {sum(s.error for s in group):7d}"
+        )
+
+
+async def bench(args: argparse.Namespace) -> None:
+    stages = sorted(int(n) for n in args.users.split(","))
+    server = None
+    database = None
+    try:
+        if args.base_url:
+            base_url = args.base_url.rstrip("/")
+        else:
+            if not args.url:
+                database = Path(tempfile.mkdtemp()) / "load.db"
+            url = args.url or f"sqlite+aiosqlite:///{database}"
+            engine = create_engine(Settings(_env_file=None), url)
+            async with engine.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.create_all)
+            await engine.dispose()
+            port = _free_port()
+            server = await start_server(url, port, args.server_log)
+            base_url = f"http://127.0.0.1:{port}"
+
+        setup_started = time.perf_counter()
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            emails = await create_accounts(client, stages[-1])
+        added = 0 if args.base_url else await seed_history(url, args.history_days, args.seed)
+        print(
+            f"{stages[-1]} accounts x {len(GOALS)} goals, {added} past completions, "
+            f"set up in {time.perf_counter() - setup_started:.1f}s; "
+            f"think time {args.think_ms:g} ms, mix {args.mix}"
+        )
+
+        results = []
+        for users in stages:
+            result = await run_stage(base_url, emails, users, args)
+            report(result)
+            results.append(result)
+    finally:
+        if server is not None:
+            server.terminate()
+            await server.wait()
+        if args.url and not args.base_url:
+            engine = create_engine(Settings(_env_file=None), args.url)
+            async with engine.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.drop_all)
+            await engine.dispose()
+        if database is not None:
+            for path in database.parent.iterdir():
+                path.unlink()
+            database.parent.rmdir()
+
+    print(f"\n{'users':>6} {'req/s':>8} {'p99 ms':>8} {'errors':>7}")
+    within = None
+    for result in results:
+        ok = result.p99_ms() <= args.slo_p99_ms and result.error_rate < 0.01
+        within = result.users if ok else within
+        print(
+            f"{result.users:6d} {result.throughput:8.1f} {result.p99_ms():8.1f} "
+            f"{result.error_rate:7.1%}" + ("" if ok else "  over SLO")
+        )
+    if within is None:
+        print(f"No stage met p99 <= {args.slo_p99_ms:g} ms with < 1% errors")
+    else:
+        print(f"Highest load within p99 <= {args.slo_p99_ms:g} ms and < 1% errors: {within} users")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", default="10,25,50", help="virtual users per stage, e.g. 10,50")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds per stage")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="unmeasured seconds per stage")
+    parser.add_argument("--think-ms", type=float, default=1000.0, help="mean pause between pages")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default="login=1,dashboard=5,check_in=3,trends=1,goals=1",
+        help="scenario weights",
+    )
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0)
+    parser.add_argument("--history-days", type=int, default=90, help="past completions to seed")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="database URL (default: a temporary SQLite file)")
+    parser.add_argument("--base-url", help="load this running server instead of starting one")
+    parser.add_argument("--server-log", default=os.devnull, help="where the server's output goes")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Load test: dashboard latency during a burst of logins.
+
+Keeps a steady stream of ``GET /goals/dashboard`` requests running against the
+in-process app, first alone and then alongside a burst of concurrent
+``POST /auth/login`` calls.  Each scenario runs twice: with bcrypt inline on
+the event loop (the old behaviour) and on the password worker pool.  With the
+pool, dashboard p99 during the burst should stay close to the baseline.
+
+    uv run python -m benchmarks.bench_login_burst --logins 200 --login-concurrency 32
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from contextlib import nullcontext
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.core.database import get_read_session, get_session
+from app.core.security import (
+    create_access_token,
+    hash_password,
+    password_pool_stats,
+    verify_password,
+)
+from app.main import app
+from app.schemas.goals import Frequency, Goal, GoalType
+from app.schemas.user import User
+
+PASSWORD = "bench-password"
+
+
+async def _verify_inline(plain: str, hashed: str) -> bool:
+    return verify_password(plain, hashed)
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def seed(factory, users: int) -> list[User]:
+    hashed = hash_password(PASSWORD)
+    today = date.today()
+    created = []
+    async with factory() as session:
+        for n in range(users):
+            user = User(email=f"user{n}@example.com", hashed_password=hashed)
+            created.append(user)
+            session.add(user)
+            for i in range(5):
+                session.add(
+                    Goal(
+                        user_id=user.id,
+                        title=f"Goal {i}",
+                        goal_type=GoalType.PERIODIC,
+                        frequency=Frequency.WEEKLY,
+                        target_count=3,
+                        start_date=today - timedelta(days=30),
+                    )
+                )
+        await session.commit()
+    return created
+
+
+async def dashboard_load(
+    client: httpx.AsyncClient,
+    users: list[User],
+    pollers: int,
+    stop: asyncio.Event,
+) -> list[float]:
+    latencies: list[float] = []
+
+    async def poll(user: User) -> None:
+        headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = await client.get("/api/v1/goals/dashboard", headers=headers)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(*(poll(users[i % len(users)]) for i in range(pollers)))
+    return latencies
+
+
+async def login_burst(
+    client: httpx.AsyncClient,
+    users: list[User],
+    logins: int,
+    concurrency: int,
+) -> tuple[list[float], int]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    shed = 0
+
+    async def login(user: User) -> None:
+        nonlocal shed
+        async with gate:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/auth/login", json={"email": user.email, "password": PASSWORD}
+            )
+        if response.status_code == 503:
+            shed += 1
+            return
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(login(users[i % len(users)]) for i in range(logins)))
+    return latencies, shed
+
+
+async def scenario(
+    client: httpx.AsyncClient,
+    users: list[User],
+    args: argparse.Namespace,
+    *,
+    inline: bool,
+) -> None:
+    label = "inline bcrypt" if inline else "password pool"
+    target = "app.services.auth.verify_password_async"
+    with patch(target, _verify_inline) if inline else nullcontext():
+        stop = asyncio.Event()
+        poller = asyncio.create_task(dashboard_load(client, users, args.pollers, stop))
+        await asyncio.sleep(args.baseline_s)
+        stop.set()
+        baseline = await poller
+
+        stop = asyncio.Event()
+        poller = asyncio.create_task(dashboard_load(client, users, args.pollers, stop))
+        start = time.perf_counter()
+        login_latencies, shed = await login_burst(
+            client, users, args.logins, args.login_concurrency
+        )
+        burst_s = time.perf_counter() - start
+        stop.set()
+        during = await poller
+
+    print(f"{label}:")
+    for name, samples in (("baseline", baseline), ("during burst", during)):
+        print(
+            f"  dashboard {name:<13} n={len(samples):5d}"
+            f"  p50 {statistics.median(samples) * 1000:7.1f} ms"
+            f"  p99 {_percentile(samples, 0.99) * 1000:7.1f} ms"
+        )
+    if login_latencies:
+        print(
+            f"  logins: {len(login_latencies) / burst_s:6.1f}/s"
+            f"  p50 {statistics.median(login_latencies) * 1000:7.1f} ms"
+            f"  p99 {_percentile(login_latencies, 0.99) * 1000:7.1f} ms"
+            f"  {shed} shed with 503"
+        )
+
+
+async def bench(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}", connect_args={"timeout": 60}
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_session():
+            async with factory() as session:
+                yield session
+
+        app.dependency_overrides[get_session] = override_session
+        app.dependency_overrides[get_read_session] = override_session
+        users = await seed(factory, args.users)
+        print(
+            f"{args.pollers} dashboard pollers, {args.logins} logins "
+            f"({args.login_concurrency} concurrent)"
+        )
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await scenario(client, users, args, inline=True)
+            await scenario(client, users, args, inline=False)
+
+        stats = password_pool_stats
+        if stats.completed:
+            print(
+                f"  pool: {stats.workers} workers, max queued {stats.max_queued}, "
+                f"mean wait {stats.wait_seconds_total / stats.completed * 1000:.1f} ms, "
+                f"max wait {stats.wait_seconds_max * 1000:.1f} ms, {stats.rejected} rejected"
+            )
+
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--pollers", type=int, default=8, help="concurrent dashboard clients")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--login-concurrency", type=int, default=16)
+    parser.add_argument("--baseline-s", type=float, default=3.0)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Load test: how long requests hold pooled connections.
+
+Runs concurrent ``GET /goals/dashboard`` and ``GET /goals`` requests against
+the in-process app with a deliberately small pool, first with connections held
+until the response is sent (the old behaviour) and then released as soon as
+the endpoint returns (``SessionReleasingRoute``).  Reports the
+``db_connection_hold_seconds`` histogram, checkout waits and throughput.
+
+    uv run python -m benchmarks.bench_pool_occupancy --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from contextlib import nullcontext
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import structlog
+from sqlmodel import SQLModel
+
+from app.core import database
+from app.core.metrics import Histogram
+from app.core.security import create_access_token, hash_password
+from app.core.settings import Settings
+from app.main import create_app
+from app.schemas.goals import Frequency, Goal, GoalType
+from app.schemas.user import User
+
+
+async def _hold_until_sent() -> None:
+    """Stand-in for release_request_sessions: leave it to the dependency exit."""
+
+
+def _summary(histogram: Histogram) -> tuple[int, float]:
+    samples = histogram.samples()
+    if not samples:
+        return 0, 0.0
+    return samples[0]["count"], samples[0]["sum"]
+
+
+def _delta(after: tuple[int, float], before: tuple[int, float]) -> tuple[int, float]:
+    return after[0] - before[0], after[1] - before[1]
+
+
+async def seed(users: int, goals: int) -> list[str]:
+    today = date.today()
+    tokens = []
+    async with database.get_session_factory()() as session:
+        hashed = hash_password("bench-password", rounds=4)
+        for n in range(users):
+            user = User(email=f"user{n}@example.com", hashed_password=hashed)
+            session.add(user)
+            tokens.append(create_access_token(str(user.id)))
+            for i in range(goals):
+                session.add(
+                    Goal(
+                        user_id=user.id,
+                        title=f"Goal {i}",
+                        goal_type=GoalType.PERIODIC,
+                        frequency=Frequency.WEEKLY,
+                        target_count=3,
+                        start_date=today - timedelta(days=30),
+                    )
+                )
+        await session.commit()
+    return tokens
+
+
+async def scenario(client: httpx.AsyncClient, tokens: list[str], args, *, release: bool) -> None:
+    label = "release on return" if release else "hold until sent"
+    hold_before = _summary(database.CONNECTION_HOLD)
+    wait_before = _summary(database.POOL_CHECKOUT_WAIT)
+    gate = asyncio.Semaphore(args.concurrency)
+    paths = ("/api/v1/goals/dashboard", "/api/v1/goals")
+
+    async def one(n: int) -> None:
+        headers = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"}
+        async with gate:
+            response = await client.get(paths[n % 2], headers=headers)
+        response.raise_for_status()
+
+    target = "app.core.database.release_request_sessions"
+    with nullcontext() if release else patch(target, _hold_until_sent):
+        start = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    holds, hold_sum = _delta(_summary(database.CONNECTION_HOLD), hold_before)
+    waits, wait_sum = _delta(_summary(database.POOL_CHECKOUT_WAIT), wait_before)
+    print(
+        f"{label:<18} {args.requests / elapsed:7.1f} req/s"
+        f"  mean hold {hold_sum / max(holds, 1) * 1000:6.2f} ms over {holds} checkouts"
+        f"  mean checkout wait {wait_sum / max(waits, 1) * 1000:6.2f} ms"
+    )
+
+
+async def bench(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(_env_file=None, db_pool_size=args.pool_size, db_max_overflow=0)
+        database.init_db(settings, url=f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with database._engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        tokens = await seed(args.users, args.goals)
+        print(
+            f"{args.requests} requests, {args.concurrency} concurrent, "
+            f"pool of {args.pool_size}, {args.goals} goals per user"
+        )
+
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await scenario(client, tokens, args, release=False)
+            await scenario(client, tokens, args, release=True)
+        await database.close_db()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--goals", type=int, default=20, help="goals per user")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
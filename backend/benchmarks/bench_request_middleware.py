@@ -0,0 +1,141 @@
+"""Benchmark: per-request cost of the request logging middleware.
+
+Drives a minimal Starlette app straight through the ASGI interface (no
+server, no HTTP client) so the numbers are the middleware's own overhead:
+
+* none    — the bare app;
+* legacy  — the previous ``BaseHTTPMiddleware`` version, reproduced below;
+* asgi    — the current pure-ASGI ``RequestLoggingMiddleware``.
+
+Two endpoints are timed: a small JSON response and a ``StreamingResponse``
+of ``--chunks`` body chunks, where ``BaseHTTPMiddleware`` has to relay every
+chunk through its own stream.  Log output is filtered out, so only the
+middleware plumbing is measured.
+
+    uv run python -m benchmarks.bench_request_middleware --requests 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import structlog
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.middleware.request_logging import RequestLoggingMiddleware
+
+logger = structlog.get_logger()
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        request_id = str(uuid.uuid4())[:8]
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=request_id)
+
+        start = time.perf_counter()
+        response = await call_next(request)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        logger.info(
+            "request_completed",
+            method=request.method,
+            path=request.url.path,
+            status=response.status_code,
+            elapsed_ms=elapsed_ms,
+        )
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+def _app(chunks: int) -> Starlette:
+    async def small(request):
+        return JSONResponse({"status": "ok"})
+
+    async def stream(request):
+        async def body():
+            for _ in range(chunks):
+                yield b"x" * 64
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    return Starlette(routes=[Route("/small", small), Route("/stream", stream)])
+
+
+async def _drive(app, path: str, requests: int) -> float:
+    """Requests per second for *path*, run sequentially on one event loop."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def one_request() -> None:
+        # Like a server: the body once, then ``http.disconnect`` after the response.
+        done = asyncio.Event()
+        messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+        async def receive():
+            if (message := next(messages, None)) is not None:
+                return message
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                done.set()
+
+        await app(dict(scope), receive, send)
+
+    for _ in range(min(requests, 200)):  # warm up
+        await one_request()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await one_request()
+    return requests / (time.perf_counter() - start)
+
+
+async def bench(args: argparse.Namespace) -> None:
+    variants = {
+        "none": _app(args.chunks),
+        "legacy": LegacyRequestLoggingMiddleware(_app(args.chunks)),
+        "asgi": RequestLoggingMiddleware(_app(args.chunks)),
+    }
+    print(f"{args.requests} sequential requests per cell ({args.chunks} chunks when streaming)")
+    print(f"{'endpoint':<8} {'variant':<8} {'req/s':>10} {'overhead µs/req':>16}")
+    for path in ("/small", "/stream"):
+        baseline = None
+        for name, app in variants.items():
+            rps = await _drive(app, path, args.requests)
+            baseline = baseline or rps
+            overhead = (1 / rps - 1 / baseline) * 1e6
+            print(f"{path:<8} {name:<8} {rps:10.0f} {overhead:16.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--chunks", type=int, default=50)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Benchmark: building and serializing the goal dashboard and trend payloads.
+
+Two payloads, both sized well past what the frontend usually asks for:
+
+* dashboard — ``--goals`` ``GoalWithProgress`` items (``GET /goals/dashboard``);
+* trends    — ``--series`` goals with a daily series over ``--days`` days
+  (``GET /goals/trends``).
+
+For each, the *build* rows time turning service dicts into response models,
+per item in Python (the old code) vs. one call to the precompiled adapter in
+``app.models.goals``.  The *serialize* rows time turning those models into
+response bytes three ways:
+
+* encoder — ``jsonable_encoder`` + ``json.dumps``, the path FastAPI takes when a
+  route sets its own ``response_class`` or declares no ``response_model``;
+* fastapi — the route's own ``serialize_response`` call: a pass-through
+  validation of the already-built models, then ``dump_json``;
+* adapter — ``TypeAdapter.dump_json`` on its own, the floor.
+
+    uv run python -m benchmarks.bench_response_serialization --goals 1000 --days 365
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import UTC, date, datetime, timedelta
+
+import structlog
+from fastapi import routing
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.goals import (
+    GOAL_WITH_PROGRESS_LIST,
+    TREND_POINT_LIST,
+    GoalRead,
+    GoalTrends,
+    GoalWithProgress,
+    PeriodTrendPoint,
+)
+from app.routers.goals import router
+
+
+def _goal_dict(i: int) -> dict:
+    now = datetime.now(UTC)
+    return {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "title": f"Goal {i}",
+        "description": "",
+        "goal_type": "periodic",
+        "frequency": "daily",
+        "target_count": 3,
+        "value_type": "numeric",
+        "value_unit": "km",
+        "start_date": date.today() - timedelta(days=365),
+        "end_date": None,
+        "is_active": True,
+        "strava_activity_types": ["Run"] if i % 3 == 0 else None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _point_dicts(days: int) -> list[dict]:
+    start = date.today() - timedelta(days=days - 1)
+    return [
+        {
+            "period_start": start + timedelta(days=d),
+            "completion_count": d % 4,
+            "target_count": 3,
+            "is_completed": d % 4 >= 3,
+            "sum_value": 5.0 * (d % 4) if d % 4 else None,
+            "avg_value": 5.0 if d % 4 else None,
+        }
+        for d in range(days)
+    ]
+
+
+def _best_ms(fn, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+async def _fastapi_ms(field, payload, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await routing.serialize_response(field=field, response_content=payload, dump_json=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+async def bench(args: argparse.Namespace) -> None:
+    fields = {route.path: route.response_field for route in router.routes}
+
+    # ── Dashboard ────────────────────────────────────────────────────────────
+    progress = (
+        {"period_completions": i % 4, "is_completed": i % 4 >= 3} for i in range(args.goals)
+    )
+    rows = [_goal_dict(i) | p for i, p in enumerate(progress)]
+    dashboard = GOAL_WITH_PROGRESS_LIST.validate_python(rows)
+    build = (
+        _best_ms(lambda: [GoalWithProgress.model_validate(r) for r in rows], args.rounds),
+        _best_ms(lambda: GOAL_WITH_PROGRESS_LIST.validate_python(rows), args.rounds),
+    )
+    dashboard_bytes = len(GOAL_WITH_PROGRESS_LIST.dump_json(dashboard))
+    serialize = (
+        _best_ms(lambda: json.dumps(jsonable_encoder(dashboard)).encode(), args.rounds),
+        await _fastapi_ms(fields["/goals/dashboard"], dashboard, args.rounds),
+        _best_ms(lambda: GOAL_WITH_PROGRESS_LIST.dump_json(dashboard), args.rounds),
+    )
+    _report(f"dashboard: {args.goals} goals, {dashboard_bytes / 1024:.0f} KiB", build, serialize)
+
+    # ── Trends ───────────────────────────────────────────────────────────────
+    points = _point_dicts(args.days)
+    goals = [GoalRead.model_validate(_goal_dict(i)) for i in range(args.series)]
+
+    def build_per_point():
+        return [GoalTrends(goal=g, periods=[PeriodTrendPoint(**p) for p in points]) for g in goals]
+
+    def build_adapter():
+        return [GoalTrends(goal=g, periods=TREND_POINT_LIST.validate_python(points)) for g in goals]
+
+    trends = build_adapter()
+    trends_adapter = TypeAdapter(list[GoalTrends])
+    trends_bytes = len(trends_adapter.dump_json(trends))
+    build = (_best_ms(build_per_point, args.rounds), _best_ms(build_adapter, args.rounds))
+    serialize = (
+        _best_ms(lambda: json.dumps(jsonable_encoder(trends)).encode(), args.rounds),
+        await _fastapi_ms(fields["/goals/trends"], trends, args.rounds),
+        _best_ms(lambda: trends_adapter.dump_json(trends), args.rounds),
+    )
+    label = f"trends: {args.series} goals x {args.days} days, {trends_bytes / 1024:.0f} KiB"
+    _report(label, build, serialize)
+
+
+def _report(label: str, build: tuple[float, float], serialize: tuple[float, ...]) -> None:
+    print(label)
+    print(f"  build      per-item {build[0]:8.2f} ms   adapter {build[1]:8.2f} ms")
+    encoder, fastapi, adapter = serialize
+    print(
+        f"  serialize  encoder  {encoder:8.2f} ms   fastapi {fastapi:8.2f} ms"
+        f"   adapter {adapter:8.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--goals", type=int, default=1000)
+    parser.add_argument("--series", type=int, default=20, help="goals in the trends payload")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
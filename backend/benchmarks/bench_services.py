@@ -0,0 +1,304 @@
+"""Benchmark suite: completion and trend services on a synthetic dataset.
+
+Seeds ``--users`` users, each with ``--goals`` periodic goals spread evenly
+over every frequency, and ``--years`` years of completions for each goal (a
+seeded RNG decides how many check-ins each period gets, so the same arguments
+always produce the same dataset).  Then times, per call:
+
+* ``compute_period_start`` and ``iter_periods_in_range`` for every frequency;
+* ``_build_goal_trends`` for one goal of each frequency over the full range;
+* ``get_all_goals_trends`` over the last year;
+* ``list_goals_with_progress`` (the dashboard);
+* ``check_in`` (rolled back each time, so the dataset doesn't change).
+
+Each case runs in rounds long enough to time reliably; the median round is
+reported.  Runs against in-memory SQLite by default; pass ``--url`` with a
+``postgresql+asyncpg://`` URL to run against Postgres (tables are created and
+dropped).
+
+Results can be saved as a baseline and later runs compared against it; any
+case slower than the baseline by more than ``--threshold`` percent is flagged
+and the script exits with status 1:
+
+    uv run python -m benchmarks.bench_services --save-baseline
+    # ... change something ...
+    uv run python -m benchmarks.bench_services --compare
+
+Baselines are stored per database dialect under ``benchmarks/baselines/`` and
+are only compared when the dataset arguments match.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+import structlog
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlmodel import SQLModel
+
+from app.core.database import create_engine
+from app.core.settings import Settings
+from app.models.goals import CheckInCreate, GoalRead
+from app.schemas.goals import Frequency, Goal, GoalCompletion, GoalType, ValueType
+from app.schemas.user import User
+from app.services.completions import (
+    _build_goal_trends,
+    check_in,
+    compute_period_start,
+    get_all_goals_trends,
+    iter_periods_in_range,
+    list_goals_with_progress,
+)
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+# ── Dataset ──────────────────────────────────────────────────────────────────
+
+
+async def seed(engine: AsyncEngine, args: argparse.Namespace) -> tuple[uuid.UUID, list[Goal]]:
+    """Create the dataset; return the first user's id and goals (the ones timed)."""
+    rng = random.Random(args.seed)
+    today = date.today()
+    start = today - timedelta(days=365 * args.years)
+    frequencies = list(Frequency)
+    first_user: tuple[uuid.UUID, list[Goal]] | None = None
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        for u in range(args.users):
+            user = User(email=f"bench{u}@example.com", hashed_password="x")
+            goals = [
+                Goal(
+                    user_id=user.id,
+                    title=f"Goal {i}",
+                    goal_type=GoalType.PERIODIC,
+                    frequency=frequencies[i % len(frequencies)],
+                    target_count=1 + i % 3,
+                    value_type=ValueType.NUMERIC if i % 2 else ValueType.NONE,
+                    start_date=start,
+                )
+                for i in range(args.goals)
+            ]
+            session.add(user)
+            session.add_all(goals)
+            await session.flush()
+
+            rows = []
+            for goal in goals:
+                for ps in iter_periods_in_range(goal.frequency, start, today):
+                    # Between zero and one more than the target, so some periods overshoot.
+                    for _ in range(rng.randint(0, goal.target_count + 1)):
+                        rows.append(
+                            {
+                                "id": uuid.UUID(int=rng.getrandbits(128)),
+                                "goal_id": goal.id,
+                                "completed_at": datetime.combine(ps, datetime.min.time(), UTC),
+                                "period_start": ps,
+                                "value": round(rng.uniform(1, 20), 1)
+                                if goal.value_type is ValueType.NUMERIC
+                                else None,
+                                "created_at": datetime.now(UTC),
+                            }
+                        )
+            for i in range(0, len(rows), 5000):
+                await session.execute(insert(GoalCompletion.__table__), rows[i : i + 5000])
+            if first_user is None:
+                first_user = (user.id, goals)
+        await session.commit()
+
+    assert first_user is not None
+    return first_user
+
+
+# ── Timing ───────────────────────────────────────────────────────────────────
+
+
+async def _median_us(
+    run: Callable[[], Awaitable[object]], rounds: int, min_round_seconds: float
+) -> float:
+    """Median µs per call, over *rounds* rounds of enough calls to last *min_round_seconds*."""
+    number = 1
+    while True:  # like timeit.autorange
+        start = time.perf_counter()
+        for _ in range(number):
+            await run()
+        if time.perf_counter() - start >= min_round_seconds:
+            break
+        number *= 2
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            await run()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples) * 1e6
+
+
+def _sync(fn: Callable[[], object]) -> Callable[[], Awaitable[object]]:
+    async def run() -> object:
+        return fn()
+
+    return run
+
+
+async def run_cases(
+    engine: AsyncEngine, user_id: uuid.UUID, goals: list[Goal], args: argparse.Namespace
+) -> dict[str, float]:
+    today = date.today()
+    full_range = today - timedelta(days=365 * args.years)
+    last_year = today - timedelta(days=364)
+    days = [today - timedelta(days=i) for i in range(365)]
+    one_of_each = {g.frequency: GoalRead.model_validate(g, from_attributes=True) for g in goals}
+    busiest = max(goals, key=lambda g: g.target_count)
+    busiest.target_count = 10**9  # so check-ins never hit "already completed"
+
+    async def timed(run: Callable[[], Awaitable[object]]) -> float:
+        return await _median_us(run, args.rounds, args.min_round_seconds)
+
+    results: dict[str, float] = {}
+    for frequency in Frequency:
+        results[f"compute_period_start[{frequency}]"] = await timed(
+            _sync(lambda f=frequency: [compute_period_start(f, d) for d in days])
+        ) / len(days)
+        results[f"iter_periods_in_range[{frequency}]"] = await timed(
+            _sync(lambda f=frequency: iter_periods_in_range(f, full_range, today))
+        )
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(busiest)
+        await session.commit()
+
+        for frequency, goal in one_of_each.items():
+            results[f"_build_goal_trends[{frequency}]"] = await timed(
+                lambda g=goal: _build_goal_trends(session, g, full_range, today)
+            )
+        results["get_all_goals_trends[1y]"] = await timed(
+            lambda: get_all_goals_trends(session, user_id, start_date=last_year, end_date=today)
+        )
+        results["list_goals_with_progress"] = await timed(
+            lambda: list_goals_with_progress(session, user_id)
+        )
+
+        goal_id = busiest.id  # rollback expires the instance
+
+        async def one_check_in() -> None:
+            await check_in(session, goal_id, user_id, CheckInCreate(value=1.0))
+            await session.rollback()
+
+        results["check_in"] = await timed(one_check_in)
+    return results
+
+
+# ── Baselines ────────────────────────────────────────────────────────────────
+
+
+def _baseline_path(args: argparse.Namespace, dialect: str) -> Path:
+    return Path(args.baseline) if args.baseline else BASELINE_DIR / f"bench_services.{dialect}.json"
+
+
+def _dataset(args: argparse.Namespace) -> dict[str, int]:
+    return {"users": args.users, "goals": args.goals, "years": args.years, "seed": args.seed}
+
+
+def report(results: dict[str, float], baseline: dict[str, float] | None, threshold: float) -> int:
+    """Print the results (and deltas against *baseline*); return the number of regressions."""
+    regressions = 0
+    header = f"{'case':<36} {'µs/call':>12}"
+    print(header + (f" {'baseline':>12} {'change':>9}" if baseline else ""))
+    for name, us in results.items():
+        line = f"{name:<36} {us:12.2f}"
+        if baseline and name in baseline:
+            change = (us / baseline[name] - 1) * 100
+            regressed = change > threshold
+            regressions += regressed
+            line += f" {baseline[name]:12.2f} {change:+8.1f}%" + (
+                "  REGRESSION" if regressed else ""
+            )
+        print(line)
+    return regressions
+
+
+async def bench(args: argparse.Namespace) -> int:
+    settings = Settings(_env_file=None, db_pool_size=1, db_max_overflow=0)
+    engine = create_engine(settings, args.url or "sqlite+aiosqlite://")
+    dialect = engine.dialect.name
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    try:
+        started = time.perf_counter()
+        user_id, goals = await seed(engine, args)
+        print(
+            f"{args.users} users x {args.goals} goals x {args.years} years ({dialect}), "
+            f"seeded in {time.perf_counter() - started:.1f}s; "
+            f"median of {args.rounds} rounds"
+        )
+        results = await run_cases(engine, user_id, goals, args)
+    finally:
+        if args.url:
+            async with engine.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.drop_all)
+        await engine.dispose()
+
+    path = _baseline_path(args, dialect)
+    baseline = None
+    if args.compare:
+        saved = json.loads(path.read_text())
+        if saved["dataset"] != _dataset(args):
+            print(f"Baseline {path} was recorded with {saved['dataset']}; not comparing.")
+        else:
+            baseline = saved["results"]
+    regressions = report(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "dataset": _dataset(args),
+            "dialect": dialect,
+            "python": platform.python_version(),
+            "recorded_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "results": results,
+        }
+        path.write_text(json.dumps(record, indent=2) + "\n")
+        print(f"Baseline saved to {path}")
+    if regressions:
+        print(f"{regressions} case(s) more than {args.threshold:g}% slower than the baseline")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--goals", type=int, default=12, help="goals per user")
+    parser.add_argument("--years", type=int, default=2, help="years of completions per goal")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-round-seconds", type=float, default=0.05)
+    parser.add_argument(
+        "--url",
+        help="database URL (default: in-memory SQLite); tables are created and dropped",
+    )
+    parser.add_argument("--baseline", help="baseline file (default: per dialect, in baselines/)")
+    parser.add_argument("--save-baseline", action="store_true", help="record these results")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="percent slower that counts as a regression"
+    )
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    sys.exit(asyncio.run(bench(args)))
+
+
+if __name__ == "__main__":
+    main()
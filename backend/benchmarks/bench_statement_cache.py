@@ -0,0 +1,190 @@
+"""Benchmark: rebuilt vs. prebuilt statements for the hot goal queries.
+
+For each statement in ``app.services.queries`` this times, per execution:
+
+* rebuilt   — the ``select(...)`` constructed inline on every call (the old code);
+* prebuilt  — the module-level statement with bound parameters;
+* uncached  — rebuilt with the compiled cache disabled, i.e. the cost of a full
+  SQL compile that the cache normally saves.
+
+Runs against in-memory SQLite by default.  Pass ``--url`` with a
+``postgresql+asyncpg://`` URL to include asyncpg's prepared-statement reuse;
+the script then reports how many statements the connection has prepared.
+
+    uv run python -m benchmarks.bench_statement_cache --iterations 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
+
+import structlog
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel, select
+
+from app.core.database import create_engine
+from app.core.settings import Settings
+from app.schemas.goals import Frequency, Goal, GoalCompletion, GoalType
+from app.schemas.user import User
+from app.services.queries import (
+    ACTIVE_GOAL_ROWS_BY_OWNER,
+    GOAL_BY_OWNER,
+    GOAL_READ_COLUMNS,
+    PERIOD_COMPLETION_COUNT,
+    PERIOD_COUNTS_BY_GOAL,
+    TREND_AGGREGATES,
+)
+
+
+def _cases(params: dict) -> list[tuple[str, object, object]]:
+    """(name, inline builder, prebuilt statement) for each hot query."""
+    return [
+        (
+            "goal by owner",
+            lambda: select(Goal).where(
+                Goal.id == params["goal_id"], Goal.user_id == params["user_id"]
+            ),
+            GOAL_BY_OWNER,
+        ),
+        (
+            "active goals",
+            lambda: (
+                select(*GOAL_READ_COLUMNS)
+                .where(Goal.user_id == params["user_id"], Goal.is_active.is_(True))
+                .order_by(Goal.created_at.desc())
+            ),
+            ACTIVE_GOAL_ROWS_BY_OWNER,
+        ),
+        (
+            "period count",
+            lambda: (
+                select(func.count())
+                .where(GoalCompletion.goal_id == params["goal_id"])
+                .where(GoalCompletion.period_start == params["period_start"])
+            ),
+            PERIOD_COMPLETION_COUNT,
+        ),
+        (
+            "dashboard counts",
+            lambda: (
+                select(GoalCompletion.goal_id, func.count())
+                .where(
+                    GoalCompletion.goal_id.in_(params["goal_ids"]),
+                    GoalCompletion.period_start == params["period_start"],
+                )
+                .group_by(GoalCompletion.goal_id)
+            ),
+            PERIOD_COUNTS_BY_GOAL,
+        ),
+        (
+            "trend aggregates",
+            lambda: (
+                select(
+                    GoalCompletion.period_start,
+                    func.count().label("cnt"),
+                    func.sum(GoalCompletion.value).label("sum_val"),
+                    func.avg(GoalCompletion.value).label("avg_val"),
+                )
+                .where(
+                    GoalCompletion.goal_id == params["goal_id"],
+                    GoalCompletion.period_start >= params["start_date"],
+                    GoalCompletion.period_start <= params["end_date"],
+                )
+                .group_by(GoalCompletion.period_start)
+            ),
+            TREND_AGGREGATES,
+        ),
+    ]
+
+
+async def seed(session: AsyncSession, goals: int) -> dict:
+    user = User(email="bench@example.com", hashed_password="x")
+    session.add(user)
+    today = date.today()
+    created = [
+        Goal(
+            user_id=user.id,
+            title=f"Goal {i}",
+            goal_type=GoalType.PERIODIC,
+            frequency=Frequency.WEEKLY,
+            target_count=3,
+            start_date=today - timedelta(days=90),
+        )
+        for i in range(goals)
+    ]
+    session.add_all(created)
+    await session.commit()
+    return {
+        "user_id": user.id,
+        "goal_id": created[0].id,
+        "goal_ids": [g.id for g in created],
+        "period_start": today - timedelta(days=today.weekday()),
+        "start_date": today - timedelta(days=90),
+        "end_date": today,
+    }
+
+
+async def _time(session: AsyncSession, iterations: int, run) -> float:
+    for _ in range(min(iterations, 50)):  # warm the compiled and prepared caches
+        await run()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await run()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def bench(args: argparse.Namespace) -> None:
+    settings = Settings(_env_file=None, db_pool_size=1, db_max_overflow=0)
+    engine = create_engine(settings, args.url or "sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        params = await seed(session, args.goals)
+        uncached = {"compiled_cache": None}
+        print(f"{args.iterations} executions each, {args.goals} goals ({engine.dialect.name})")
+        print(f"{'statement':<18} {'rebuilt':>10} {'prebuilt':>10} {'uncached':>10}   (µs/call)")
+        for name, build, prebuilt in _cases(params):
+            rebuilt_us = await _time(session, args.iterations, lambda b=build: session.execute(b()))
+            prebuilt_us = await _time(
+                session, args.iterations, lambda s=prebuilt: session.execute(s, params)
+            )
+            uncached_us = await _time(
+                session,
+                args.iterations,
+                lambda b=build: session.execute(b(), execution_options=uncached),
+            )
+            print(f"{name:<18} {rebuilt_us:10.1f} {prebuilt_us:10.1f} {uncached_us:10.1f}")
+
+        if engine.dialect.name == "postgresql":
+            prepared = await session.scalar(text("SELECT count(*) FROM pg_prepared_statements"))
+            print(
+                f"prepared statements on this connection: {prepared} "
+                f"(cache size {settings.db_statement_cache_size})"
+            )
+
+    if args.url:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.drop_all)
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--goals", type=int, default=20)
+    parser.add_argument(
+        "--url",
+        help="database URL (default: in-memory SQLite); tables are created and dropped",
+    )
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Benchmark: Strava activity → goal matching.
+
+Compares the original per-activity scan over every goal (with substring unit
+parsing) against the compiled ``GoalMatcher`` index, then times the full
+``apply_activities`` path against an in-memory SQLite database.
+
+    uv run python -m benchmarks.bench_strava_matcher --goals 500 --activities 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.schemas.goals import Frequency, Goal, GoalType, ValueType
+from app.schemas.user import User
+from app.services.completions import compute_period_start
+from app.services.strava_matcher import GoalMatcher, parse_activity
+from app.services.strava_sync import apply_activities
+
+ACTIVITY_TYPES = [
+    "Run",
+    "TrailRun",
+    "Ride",
+    "VirtualRide",
+    "Swim",
+    "Walk",
+    "Hike",
+    "Yoga",
+    "WeightTraining",
+    "Rowing",
+]
+UNITS = [None, "km", "miles", "minutes", "hours"]
+
+
+def make_goals(user_id: uuid.UUID, n: int, rng: random.Random) -> list[Goal]:
+    today = date.today()
+    goals = []
+    for i in range(n):
+        unit = rng.choice(UNITS)
+        goals.append(
+            Goal(
+                user_id=user_id,
+                title=f"Goal {i}",
+                goal_type=GoalType.PERIODIC,
+                frequency=rng.choice(list(Frequency)),
+                target_count=rng.randint(1, 10),
+                value_type=ValueType.NUMERIC if unit else ValueType.NONE,
+                value_unit=unit,
+                start_date=today - timedelta(days=rng.randint(0, 400)),
+                end_date=None if rng.random() < 0.8 else today + timedelta(days=30),
+                strava_activity_types=rng.sample(ACTIVITY_TYPES, k=rng.randint(1, 2)),
+            )
+        )
+    return goals
+
+
+def make_activities(n: int, rng: random.Random) -> list[dict]:
+    today = date.today()
+    activities = []
+    for i in range(n):
+        day = today - timedelta(days=rng.randint(0, 365))
+        act_type = rng.choice(ACTIVITY_TYPES)
+        activities.append(
+            {
+                "id": 10_000_000 + i,
+                "type": act_type,
+                "sport_type": act_type,
+                "start_date": f"{day.isoformat()}T06:{rng.randint(10, 59)}:00Z",
+                "distance": rng.uniform(1000, 40_000),
+                "moving_time": rng.randint(600, 7200),
+                "name": f"Activity {i}",
+            }
+        )
+    return activities
+
+
+def legacy_match(goals: list[Goal], activities: list[dict]) -> int:
+    """The pre-index inner loop: every activity visits every goal."""
+    pairs = 0
+    for activity in activities:
+        act_type = activity.get("type") or ""
+        sport_type = activity.get("sport_type") or act_type
+        start_date_str = activity.get("start_date") or ""
+        act_date = date.fromisoformat(start_date_str.split("T")[0])
+        distance = activity.get("distance") or 0
+        moving_time = activity.get("moving_time") or 0
+        for goal in goals:
+            types_list = goal.strava_activity_types or []
+            if act_type not in types_list and sport_type not in types_list:
+                continue
+            if act_date < goal.start_date:
+                continue
+            if goal.end_date and act_date > goal.end_date:
+                continue
+            compute_period_start(goal.frequency, act_date)
+            if goal.value_type == ValueType.NUMERIC and goal.value_unit:
+                unit_lower = goal.value_unit.lower()
+                if "km" in unit_lower or unit_lower == "k":
+                    round(distance / 1000, 2)
+                elif "mile" in unit_lower or "mi" in unit_lower:
+                    round(distance / 1609.34, 2)
+                elif "min" in unit_lower or "minute" in unit_lower:
+                    round(moving_time / 60, 1)
+            pairs += 1
+    return pairs
+
+
+def compiled_match(goals: list[Goal], activities: list[dict]) -> int:
+    matcher = GoalMatcher(goals)
+    pairs = 0
+    for raw in activities:
+        activity = parse_activity(raw)
+        if activity is None:
+            continue
+        for goal in matcher.match(activity):
+            goal.period_start(activity.local_date)
+            goal.value_for(activity)
+            pairs += 1
+    return pairs
+
+
+def best_of(fn, *args, repeat: int) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+async def bench_apply(goals: list[Goal], user: User, activities: list[dict]) -> float:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as session:
+        session.add(user)
+        session.add_all(goals)
+        await session.commit()
+
+        matcher = GoalMatcher(goals)
+        parsed = [a for a in map(parse_activity, activities) if a is not None]
+        start = time.perf_counter()
+        added, _ = await apply_activities(session, matcher, parsed)
+        await session.commit()
+        elapsed = time.perf_counter() - start
+
+    await engine.dispose()
+    print(f"  apply_activities (sqlite):   {elapsed * 1000:9.1f} ms  ({added} completions)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--goals", type=int, default=300)
+    parser.add_argument("--activities", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    rng = random.Random(args.seed)
+    user = User(email="bench@example.com", hashed_password="x")
+    goals = make_goals(user.id, args.goals, rng)
+    activities = make_activities(args.activities, rng)
+
+    print(f"{args.goals} goals x {args.activities} activities (best of {args.repeat})")
+    legacy_s, legacy_pairs = best_of(legacy_match, goals, activities, repeat=args.repeat)
+    compiled_s, compiled_pairs = best_of(compiled_match, goals, activities, repeat=args.repeat)
+    assert legacy_pairs == compiled_pairs, (legacy_pairs, compiled_pairs)
+
+    print(f"  legacy scan:                 {legacy_s * 1000:9.1f} ms  ({legacy_pairs} matches)")
+    print(f"  compiled matcher:            {compiled_s * 1000:9.1f} ms")
+    print(f"  speedup:                     {legacy_s / compiled_s:9.1f}x")
+
+    asyncio.run(bench_apply(goals, user, activities))
+
+
+if __name__ == "__main__":
+    main()
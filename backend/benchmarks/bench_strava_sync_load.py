@@ -0,0 +1,236 @@
+"""Benchmark: concurrent Strava OAuth links and syncs against the emulator.
+
+Drives the real FastAPI app in-process, with the shared Strava client routed to
+``benchmarks.strava_emulator``.  Each simulated user first completes the OAuth
+callback, then runs ``POST /goals/sync-strava`` for several rounds (the first
+round ingests ~31 days of activities, later rounds are incremental).  Reports
+throughput, p50/p95 latency and SQL statements per request for each phase.
+
+    uv run python -m benchmarks.bench_strava_sync_load --users 200 --concurrency 50
+    uv run python -m benchmarks.bench_strava_sync_load --latency-ms 120 --error-rate 0.02
+
+SQLite (a temporary file) is used unless ``--database-url`` points elsewhere.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import logging
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import structlog
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.core.database import get_session
+from app.core.security import create_access_token, create_oauth_state_token, hash_password
+from app.core.settings import get_settings
+from app.main import app
+from app.schemas.goals import Frequency, Goal, GoalType, ValueType
+from app.schemas.user import User
+from app.services.strava import set_http_client
+from benchmarks.strava_emulator import EmulatorConfig, StravaEmulator
+
+# SQL statements issued on behalf of the request currently being timed.
+_query_count: contextvars.ContextVar[list[int] | None] = contextvars.ContextVar(
+    "bench_query_count", default=None
+)
+
+
+def _count_query(*args) -> None:
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class PhaseResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: list[float] = []
+        self.queries: list[int] = []
+        self.failures = 0
+        self.elapsed = 0.0
+
+    def report(self) -> None:
+        ok = len(self.latencies)
+        if not ok:
+            print(f"  {self.name:<14} no successful requests ({self.failures} failed)")
+            return
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(ok - 1, int(ok * 0.95))]
+        print(
+            f"  {self.name:<14} {ok / self.elapsed:8.1f} req/s"
+            f"  p50 {statistics.median(ordered) * 1000:7.1f} ms"
+            f"  p95 {p95 * 1000:7.1f} ms"
+            f"  {statistics.mean(self.queries):5.1f} queries/req"
+            f"  {self.failures} failed"
+        )
+
+
+async def run_phase(
+    name: str,
+    jobs: list[Callable[[], Awaitable[httpx.Response]]],
+    concurrency: int,
+    ok_status: int,
+) -> PhaseResult:
+    result = PhaseResult(name)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(job: Callable[[], Awaitable[httpx.Response]]) -> None:
+        async with gate:
+            counter = [0]
+            _query_count.set(counter)
+            start = time.perf_counter()
+            response = await job()
+            elapsed = time.perf_counter() - start
+        if response.status_code != ok_status:
+            result.failures += 1
+            return
+        result.latencies.append(elapsed)
+        result.queries.append(counter[0])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(job) for job in jobs))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+async def seed_users(factory, emulator: StravaEmulator, goals_per_user: int) -> list[User]:
+    today = date.today()
+    password = hash_password("bench-password")
+    users = []
+    async with factory() as session:
+        for athlete_id in emulator.athletes:
+            user = User(email=f"athlete{athlete_id}@example.com", hashed_password=password)
+            users.append(user)
+            session.add(user)
+            for i in range(goals_per_user):
+                sport = ["Run", "Ride", "Swim", "Walk", "Hike"][i % 5]
+                session.add(
+                    Goal(
+                        user_id=user.id,
+                        title=f"{sport} goal {i}",
+                        goal_type=GoalType.PERIODIC,
+                        frequency=[Frequency.WEEKLY, Frequency.MONTHLY][i % 2],
+                        target_count=3,
+                        value_type=ValueType.NUMERIC,
+                        value_unit="km",
+                        start_date=today - timedelta(days=90),
+                        strava_activity_types=[sport],
+                    )
+                )
+        await session.commit()
+    return users
+
+
+async def bench(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    settings.strava_id = settings.strava_id or "bench-client"
+    settings.strava_secret = settings.strava_secret or "bench-secret"
+
+    emulator = StravaEmulator(
+        EmulatorConfig(
+            athletes=args.users,
+            activities_per_athlete=args.activities,
+            latency_ms=args.latency_ms,
+            latency_jitter_ms=args.latency_ms / 4,
+            error_rate=args.error_rate,
+            short_limit=10**9,
+            daily_limit=10**9,
+        )
+    )
+    set_http_client(emulator.client())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        connect_args = {"timeout": 60} if url.startswith("sqlite") else {}
+        engine = create_async_engine(url, connect_args=connect_args)
+        event.listen(engine.sync_engine, "before_cursor_execute", _count_query)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.drop_all)
+            await conn.run_sync(SQLModel.metadata.create_all)
+        factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_session():
+            async with factory() as session:
+                yield session
+
+        app.dependency_overrides[get_session] = override_session
+        users = await seed_users(factory, emulator, args.goals)
+        athlete_ids = list(emulator.athletes)
+        print(
+            f"{len(users)} users x {args.activities} activities, {args.goals} goals each, "
+            f"concurrency {args.concurrency}, Strava latency {args.latency_ms:.0f} ms, "
+            f"error rate {args.error_rate:.1%}"
+        )
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            def callback(user: User, athlete_id: int):
+                params = {
+                    "code": f"code-{athlete_id}",
+                    "state": create_oauth_state_token(str(user.id)),
+                }
+                return lambda: client.get("/api/v1/auth/strava/callback", params=params)
+
+            def sync(user: User):
+                headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+                return lambda: client.post("/api/v1/goals/sync-strava", headers=headers)
+
+            # Full-history backfills would compete with the syncs being measured.
+            with patch("app.routers.auth.schedule_backfill"):
+                results = [
+                    await run_phase(
+                        "oauth callback",
+                        [callback(u, a) for u, a in zip(users, athlete_ids, strict=True)],
+                        args.concurrency,
+                        ok_status=302,
+                    )
+                ]
+            for round_no in range(1, args.rounds + 1):
+                results.append(
+                    await run_phase(
+                        f"sync round {round_no}",
+                        [sync(u) for u in users],
+                        args.concurrency,
+                        ok_status=200,
+                    )
+                )
+
+        app.dependency_overrides.pop(get_session, None)
+        await engine.dispose()
+
+    for result in results:
+        result.report()
+    calls = ", ".join(f"{route}={n}" for route, n in sorted(emulator.stats.requests.items()))
+    print(f"  emulator: {calls}; {emulator.stats.errors_injected} injected errors")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--activities", type=int, default=300, help="history per athlete")
+    parser.add_argument("--goals", type=int, default=5, help="Strava-linked goals per user")
+    parser.add_argument("--rounds", type=int, default=2, help="sync passes per user")
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
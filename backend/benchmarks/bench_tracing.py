@@ -0,0 +1,86 @@
+"""Benchmark: cost of tracing on a traced service call, disabled vs. enabled.
+
+Times a ``@traced`` async function that opens one nested ``span`` and one
+leaf ``start_span`` (standing in for a SQL statement), against the same
+function undecorated:
+
+* plain     — no tracing code at all;
+* disabled  — tracing code present, ``TRACING_EXPORTER`` unset;
+* enabled   — spans recorded and handed to a batch processor whose exporter
+              discards them (export cost itself is on the background thread).
+
+    uv run python -m benchmarks.bench_tracing --calls 200000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import structlog
+
+from app.core.tracing import (
+    Span,
+    shutdown_tracing,
+    span,
+    start_span,
+    start_tracing,
+    traced,
+)
+
+
+class NullExporter:
+    def export(self, spans: list[Span]) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+async def plain(n: int) -> int:
+    return n + 1
+
+
+@traced
+async def instrumented(n: int) -> int:
+    with span("inner"):
+        leaf = start_span("SELECT", kind="client")
+        if leaf is not None:
+            leaf.end()
+        return n + 1
+
+
+async def _time(fn, calls: int) -> float:
+    """Nanoseconds per call."""
+    for i in range(min(calls, 1000)):  # warm up
+        await fn(i)
+    start = time.perf_counter_ns()
+    for i in range(calls):
+        await fn(i)
+    return (time.perf_counter_ns() - start) / calls
+
+
+async def bench(args: argparse.Namespace) -> None:
+    baseline = await _time(plain, args.calls)
+    disabled = await _time(instrumented, args.calls)
+    start_tracing(NullExporter(), max_queue=args.calls * 3)
+    enabled = await _time(instrumented, args.calls)
+    shutdown_tracing()
+
+    print(f"{args.calls} calls per variant")
+    print(f"{'variant':<10} {'ns/call':>10} {'overhead ns':>12}")
+    for name, ns in (("plain", baseline), ("disabled", disabled), ("enabled", enabled)):
+        print(f"{name:<10} {ns:10.0f} {ns - baseline:12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Calibrate the bcrypt cost for this host.
+
+Times ``hash_password`` at each cost factor and recommends the highest one
+whose median latency stays within the target (bcrypt doubles per step).  Run
+it on production-sized hardware and set ``PASSWORD_BCRYPT_ROUNDS``; existing
+hashes are upgraded transparently the next time each user logs in.
+
+    uv run python -m benchmarks.calibrate_password_hash --target-ms 250
+"""
+
+import argparse
+import statistics
+import time
+
+from app.core.security import hash_password, verify_password
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+def median_ms(rounds: int, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hashed = hash_password("calibration-password", rounds=rounds)
+        timings.append(time.perf_counter() - start)
+    assert verify_password("calibration-password", hashed)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="latency budget per hash")
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--start", type=int, default=10, help="first cost factor to measure")
+    args = parser.parse_args()
+
+    recommended = None
+    print(f"{'rounds':>6}  {'median':>10}")
+    for rounds in range(max(args.start, MIN_ROUNDS), MAX_ROUNDS + 1):
+        elapsed = median_ms(rounds, args.samples)
+        print(f"{rounds:>6}  {elapsed:8.1f} ms")
+        if elapsed > args.target_ms:
+            break
+        recommended = rounds
+
+    if recommended is None:
+        print(f"Even {args.start} rounds exceeds {args.target_ms:.0f} ms; lower --start.")
+        return
+    print(f"\nPASSWORD_BCRYPT_ROUNDS={recommended}  (target {args.target_ms:.0f} ms per hash)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Local Strava API emulator for load tests and integration tests.
+
+Serves the subset of Strava the backend uses — ``POST /oauth/token``,
+``GET /api/v3/athlete``, ``GET /api/v3/athlete/activities`` (with ``before``,
+``after``, ``page`` and ``per_page``) and ``GET /api/v3/activities/{id}`` — from
+deterministic synthetic athletes.  Latency, error rate and the application
+rate limit (with Strava's ``X-RateLimit-*`` headers) are configurable.
+
+In-process, route the backend's shared client through it:
+
+    emulator = StravaEmulator(EmulatorConfig(athletes=100))
+    set_http_client(emulator.client())
+
+Or run it as a server and point ``STRAVA_BASE_URL`` at it:
+
+    uv run python -m benchmarks.strava_emulator --port 8001 --latency-ms 80
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+SPORTS = [
+    ("Run", 2_000, 21_000, 330),
+    ("Ride", 10_000, 90_000, 150),
+    ("Swim", 500, 3_000, 1_200),
+    ("Walk", 1_000, 8_000, 720),
+    ("Hike", 3_000, 20_000, 900),
+]
+
+
+@dataclass
+class EmulatorConfig:
+    athletes: int = 50
+    activities_per_athlete: int = 400
+    days_of_history: int = 730
+    latency_ms: float = 0.0  # mean added latency per request
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0  # fraction of API requests answered with 503
+    short_limit: int = 600  # requests per 15 minutes (whole application)
+    daily_limit: int = 30_000
+    token_ttl_s: int = 6 * 3600
+    seed: int = 1
+
+
+@dataclass
+class Athlete:
+    id: int
+    firstname: str
+    lastname: str
+    activities: list[dict[str, Any]]  # newest first
+
+    @property
+    def code(self) -> str:
+        return f"code-{self.id}"
+
+
+@dataclass
+class EmulatorStats:
+    requests: dict[str, int] = field(default_factory=dict)
+    errors_injected: int = 0
+    rate_limited: int = 0
+
+    def count(self, route: str) -> None:
+        self.requests[route] = self.requests.get(route, 0) + 1
+
+
+def make_athletes(config: EmulatorConfig) -> dict[int, Athlete]:
+    rng = random.Random(config.seed)
+    now = datetime.now(UTC).replace(microsecond=0)
+    athletes: dict[int, Athlete] = {}
+    next_activity_id = 9_000_000_000
+    for n in range(config.athletes):
+        athlete_id = 100_000 + n
+        starts = sorted(
+            (
+                now - timedelta(seconds=rng.randint(3600, config.days_of_history * 86_400))
+                for _ in range(config.activities_per_athlete)
+            ),
+            reverse=True,
+        )
+        activities = []
+        for start in starts:
+            sport, lo, hi, pace = rng.choice(SPORTS)
+            distance = round(rng.uniform(lo, hi), 1)
+            next_activity_id += 1
+            activities.append(
+                {
+                    "id": next_activity_id,
+                    "name": f"{sport} #{next_activity_id % 10_000}",
+                    "type": sport,
+                    "sport_type": sport,
+                    "distance": distance,
+                    "moving_time": int(distance / 1000 * pace),
+                    "elapsed_time": int(distance / 1000 * pace * 1.1),
+                    "start_date": start.isoformat().replace("+00:00", "Z"),
+                    "start_date_local": start.isoformat().replace("+00:00", "Z"),
+                    "athlete": {"id": athlete_id},
+                }
+            )
+        athletes[athlete_id] = Athlete(athlete_id, "Synthetic", f"Athlete{n}", activities)
+    return athletes
+
+
+class StravaEmulator:
+    """ASGI app emulating Strava's OAuth and activity endpoints."""
+
+    def __init__(self, config: EmulatorConfig | None = None):
+        self.config = config or EmulatorConfig()
+        self.athletes = make_athletes(self.config)
+        self.stats = EmulatorStats()
+        self._rng = random.Random(self.config.seed)
+        self._tokens: dict[str, tuple[int, float]] = {}  # access token -> (athlete, expiry)
+        self._refresh: dict[str, int] = {}
+        self._window_start = 0.0
+        self._short_usage = 0
+        self._day_start = 0.0
+        self._daily_usage = 0
+        self._token_seq = 0
+        self.app = Starlette(
+            routes=[
+                Route("/oauth/token", self.token, methods=["POST"]),
+                Route("/api/v3/athlete", self.athlete, methods=["GET"]),
+                Route("/api/v3/athlete/activities", self.activities, methods=["GET"]),
+                Route("/api/v3/activities/{activity_id:int}", self.activity, methods=["GET"]),
+            ]
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.app(scope, receive, send)
+
+    def client(self) -> httpx.AsyncClient:
+        """An httpx client whose requests are served in-process by this emulator."""
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self),
+            base_url="https://www.strava.com",
+        )
+
+    # ── Token helpers ────────────────────────────────────────────────────
+
+    def issue_tokens(self, athlete_id: int) -> dict[str, Any]:
+        """Mint a token pair for an athlete (also used to seed linked users)."""
+        self._token_seq += 1
+        access = f"access-{athlete_id}-{self._token_seq}"
+        refresh = f"refresh-{athlete_id}-{self._token_seq}"
+        expires_at = int(time.time()) + self.config.token_ttl_s
+        self._tokens[access] = (athlete_id, expires_at)
+        self._refresh[refresh] = athlete_id
+        return {
+            "token_type": "Bearer",
+            "access_token": access,
+            "refresh_token": refresh,
+            "expires_at": expires_at,
+            "expires_in": self.config.token_ttl_s,
+        }
+
+    def _athlete_summary(self, athlete: Athlete) -> dict[str, Any]:
+        return {
+            "id": athlete.id,
+            "username": None,
+            "firstname": athlete.firstname,
+            "lastname": athlete.lastname,
+            "city": None,
+            "state": None,
+            "country": None,
+            "profile": None,
+            "profile_medium": None,
+            "created_at": "2020-01-01T00:00:00Z",
+            "updated_at": "2020-01-01T00:00:00Z",
+        }
+
+    # ── Request pipeline ─────────────────────────────────────────────────
+
+    def _rate_limit_headers(self) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": f"{self.config.short_limit},{self.config.daily_limit}",
+            "X-RateLimit-Usage": f"{self._short_usage},{self._daily_usage}",
+        }
+
+    async def _admit(self, route: str) -> JSONResponse | None:
+        """Apply latency, rate limiting and error injection; None means proceed."""
+        self.stats.count(route)
+        if self.config.latency_ms or self.config.latency_jitter_ms:
+            delay = self._rng.gauss(self.config.latency_ms, self.config.latency_jitter_ms)
+            await asyncio.sleep(max(delay, 0) / 1000)
+
+        now = time.time()
+        window = now - (now % 900)
+        if window != self._window_start:
+            self._window_start, self._short_usage = window, 0
+        day = now - (now % 86_400)
+        if day != self._day_start:
+            self._day_start, self._daily_usage = day, 0
+
+        if (
+            self._short_usage >= self.config.short_limit
+            or self._daily_usage >= self.config.daily_limit
+        ):
+            self.stats.rate_limited += 1
+            return JSONResponse(
+                {"message": "Rate Limit Exceeded", "errors": []},
+                status_code=429,
+                headers=self._rate_limit_headers(),
+            )
+        self._short_usage += 1
+        self._daily_usage += 1
+
+        if self.config.error_rate and self._rng.random() < self.config.error_rate:
+            self.stats.errors_injected += 1
+            return JSONResponse({"message": "Service Unavailable"}, status_code=503)
+        return None
+
+    def _authenticate(self, request: Request) -> Athlete | None:
+        header = request.headers.get("Authorization", "")
+        token = header.removeprefix("Bearer ").strip()
+        entry = self._tokens.get(token)
+        if entry is None or entry[1] < time.time():
+            return None
+        return self.athletes.get(entry[0])
+
+    def _json(self, payload: Any, status_code: int = 200) -> JSONResponse:
+        return JSONResponse(payload, status_code=status_code, headers=self._rate_limit_headers())
+
+    def _unauthorized(self) -> JSONResponse:
+        return self._json({"message": "Authorization Error", "errors": []}, status_code=401)
+
+    # ── Endpoints ────────────────────────────────────────────────────────
+
+    async def token(self, request: Request) -> JSONResponse:
+        if (rejected := await self._admit("token")) is not None:
+            return rejected
+        form = await request.form()
+        grant_type = form.get("grant_type")
+        if grant_type == "authorization_code":
+            code = str(form.get("code", ""))
+            athlete_id = int(code.removeprefix("code-")) if code.startswith("code-") else None
+            athlete = self.athletes.get(athlete_id) if athlete_id else None
+            if athlete is None:
+                return self._json({"message": "Bad Request", "errors": []}, status_code=400)
+            return self._json(
+                {**self.issue_tokens(athlete.id), "athlete": self._athlete_summary(athlete)}
+            )
+        if grant_type == "refresh_token":
+            athlete_id = self._refresh.pop(str(form.get("refresh_token", "")), None)
+            if athlete_id is None:
+                return self._json({"message": "Bad Request", "errors": []}, status_code=400)
+            return self._json(self.issue_tokens(athlete_id))
+        return self._json({"message": "Bad Request", "errors": []}, status_code=400)
+
+    async def athlete(self, request: Request) -> JSONResponse:
+        if (rejected := await self._admit("athlete")) is not None:
+            return rejected
+        athlete = self._authenticate(request)
+        if athlete is None:
+            return self._unauthorized()
+        return self._json(self._athlete_summary(athlete))
+
+    async def activities(self, request: Request) -> JSONResponse:
+        if (rejected := await self._admit("activities")) is not None:
+            return rejected
+        athlete = self._authenticate(request)
+        if athlete is None:
+            return self._unauthorized()
+
+        params = request.query_params
+        before = int(params["before"]) if "before" in params else None
+        after = int(params["after"]) if "after" in params else None
+        per_page = min(int(params.get("per_page", 30)), 200)
+        page = max(int(params.get("page", 1)), 1)
+
+        selected = athlete.activities
+        if before is not None:
+            selected = [a for a in selected if _epoch(a) < before]
+        if after is not None:
+            # Strava returns oldest first when only ``after`` is given.
+            selected = [a for a in reversed(selected) if _epoch(a) > after]
+        offset = (page - 1) * per_page
+        return self._json(selected[offset : offset + per_page])
+
+    async def activity(self, request: Request) -> JSONResponse:
+        if (rejected := await self._admit("activity")) is not None:
+            return rejected
+        athlete = self._authenticate(request)
+        if athlete is None:
+            return self._unauthorized()
+        activity_id = request.path_params["activity_id"]
+        for activity in athlete.activities:
+            if activity["id"] == activity_id:
+                return self._json(activity)
+        return self._json({"message": "Record Not Found", "errors": []}, status_code=404)
+
+
+def _epoch(activity: dict[str, Any]) -> float:
+    return datetime.fromisoformat(activity["start_date"].replace("Z", "+00:00")).timestamp()
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the Strava emulator as an HTTP server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--athletes", type=int, default=50)
+    parser.add_argument("--activities", type=int, default=400)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--short-limit", type=int, default=600)
+    parser.add_argument("--daily-limit", type=int, default=30_000)
+    args = parser.parse_args()
+
+    emulator = StravaEmulator(
+        EmulatorConfig(
+            athletes=args.athletes,
+            activities_per_athlete=args.activities,
+            latency_ms=args.latency_ms,
+            latency_jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            short_limit=args.short_limit,
+            daily_limit=args.daily_limit,
+        )
+    )
+    print("Authorization codes: code-<athlete id>, athletes", min(emulator.athletes), "...")
+    uvicorn.run(emulator, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
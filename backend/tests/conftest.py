@@ -4,7 +4,8 @@ Uses an async in-memory SQLite database so tests run without PostgreSQL.
 """
 
 import asyncio
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterator
+from contextlib import contextmanager
 
 import pytest
 from httpx import ASGITransport, AsyncClient
@@ -12,8 +13,17 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 
-from app.core.database import get_session
+from app.core.database import (
+    QueryTally,
+    get_read_session,
+    get_session,
+    install_query_timer,
+    track_queries,
+)
+from app.core.principal_cache import clear_auth_caches
+from app.core.rate_limit import reset_login_throttle
 from app.core.security import create_access_token, hash_password
+from app.core.settings import get_settings
 from app.main import create_app
 from app.schemas.user import User
 
@@ -22,6 +32,7 @@ from app.schemas.user import User
 TEST_DATABASE_URL = "sqlite+aiosqlite://"
 
 engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+install_query_timer(engine, get_settings().db_n_plus_one_threshold)
 
 TestSessionFactory = sessionmaker(
     bind=engine,
@@ -51,6 +62,36 @@ async def setup_database():
         await conn.run_sync(SQLModel.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty authentication caches and login counters."""
+    clear_auth_caches()
+    reset_login_throttle()
+    yield
+    clear_auth_caches()
+    reset_login_throttle()
+
+
+@pytest.fixture
+def max_queries():
+    """Fail unless the block runs at most *limit* SQL statements.
+
+    with max_queries(4):
+        await client.get("/api/v1/goals/dashboard", headers=auth_headers)
+    """
+
+    @contextmanager
+    def budget(limit: int) -> Iterator[QueryTally]:
+        with track_queries() as tally:
+            yield tally
+        repeated = sorted(tally.statements.items(), key=lambda item: -item[1])
+        assert tally.count <= limit, f"{tally.count} queries, budget {limit}:\n" + "\n".join(
+            f"  {n}x {statement[:120]}" for statement, n in repeated
+        )
+
+    return budget
+
+
 @pytest.fixture
 async def session() -> AsyncGenerator[AsyncSession]:
     """Yield a test database session."""
@@ -68,6 +109,7 @@ async def client(session: AsyncSession) -> AsyncGenerator[AsyncClient]:
         yield session
 
     app.dependency_overrides[get_session] = _override_get_session
+    app.dependency_overrides[get_read_session] = _override_get_session
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -0,0 +1,86 @@
+"""Tests for the configurable, instrumented connection pool."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+
+from app.core.database import (
+    POOL_CHECKOUT_TIMEOUTS,
+    POOL_CHECKOUT_WAIT,
+    POOL_PINGS,
+    create_engine,
+    engine_url,
+    pool_options,
+)
+from app.core.settings import Settings
+
+
+def _settings(**overrides) -> Settings:
+    return Settings(_env_file=None, **overrides)
+
+
+@pytest.fixture
+def db_url(tmp_path) -> str:
+    return f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+
+
+class TestPoolOptions:
+    def test_driven_by_settings(self):
+        options = pool_options(
+            _settings(db_pool_size=3, db_max_overflow=1, db_pool_pre_ping="always")
+        )
+        assert options["pool_size"] == 3
+        assert options["max_overflow"] == 1
+        assert options["pool_pre_ping"] is True
+        assert pool_options(_settings(db_pool_pre_ping="idle"))["pool_pre_ping"] is False
+
+    def test_sizes_asyncpg_statement_cache(self):
+        url = engine_url(_settings(db_statement_cache_size=0))
+        assert url.query["prepared_statement_cache_size"] == "0"
+        assert (
+            "prepared_statement_cache_size"
+            not in engine_url(_settings(), "sqlite+aiosqlite://").query
+        )
+
+    def test_rejects_unknown_pre_ping(self):
+        with pytest.raises(ValueError):
+            pool_options(_settings(db_pool_pre_ping="sometimes"))
+
+
+class TestInstrumentedPool:
+    async def test_records_checkout_wait(self, db_url: str):
+        engine = create_engine(_settings(), url=db_url)
+        before = POOL_CHECKOUT_WAIT.count()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        assert POOL_CHECKOUT_WAIT.count() == before + 1
+        await engine.dispose()
+
+    async def test_counts_checkout_timeouts(self, db_url: str):
+        engine = create_engine(
+            _settings(db_pool_size=1, db_max_overflow=0, db_pool_timeout=0.05), url=db_url
+        )
+        before = POOL_CHECKOUT_TIMEOUTS.value()
+        async with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        assert POOL_CHECKOUT_TIMEOUTS.value() == before + 1
+        await engine.dispose()
+
+    async def test_idle_pre_ping_skips_recent_connections(self, db_url: str):
+        engine = create_engine(
+            _settings(db_pool_pre_ping="idle", db_pool_pre_ping_idle_seconds=0.05), url=db_url
+        )
+        before = POOL_PINGS.value()
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        assert POOL_PINGS.value() == before
+
+        await asyncio.sleep(0.1)
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        assert POOL_PINGS.value() == before + 1
+        await engine.dispose()
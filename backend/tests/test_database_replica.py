@@ -0,0 +1,116 @@
+"""Tests for read-replica routing with read-your-writes and lag fallback."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, select
+from starlette.requests import Request
+
+from app.core import database
+from app.core.settings import Settings
+from app.schemas.user import User
+
+PRIMARY_EMAIL = "primary@example.com"
+REPLICA_EMAIL = "replica@example.com"
+
+
+async def _seed(url: str, email: str) -> User:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    user = User(email=email, hashed_password="x")
+    async with database.AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(user)
+        await session.commit()
+    await engine.dispose()
+    return user
+
+
+def _request(user_id=None, cookie: str | None = None) -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+    if user_id is not None:
+        request.state.user_id = user_id
+    return request
+
+
+async def _emails_seen(request: Request) -> list[str]:
+    sessions = database.get_read_session(request)
+    session = await anext(sessions)
+    result = await session.execute(select(User.email))
+    await sessions.aclose()
+    return list(result.scalars())
+
+
+@pytest.fixture
+async def two_databases(tmp_path):
+    """A primary and a "replica" that each hold a distinguishable user row."""
+    primary_url = f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    user = await _seed(primary_url, PRIMARY_EMAIL)
+    await _seed(replica_url, REPLICA_EMAIL)
+    database.init_db(Settings(_env_file=None), url=primary_url, replica_url=replica_url)
+    database._recent_writers.clear()
+    yield user
+    await database.close_db()
+    database._recent_writers.clear()
+
+
+class TestReadReplicaRouting:
+    async def test_reads_go_to_replica(self, two_databases: User):
+        assert await _emails_seen(_request(two_databases.id)) == [REPLICA_EMAIL]
+
+    async def test_recent_writer_reads_from_primary(self, two_databases: User):
+        database.note_write(two_databases.id)
+        assert await _emails_seen(_request(two_databases.id)) == [PRIMARY_EMAIL]
+        # Other users are unaffected.
+        assert await _emails_seen(_request()) == [REPLICA_EMAIL]
+
+    async def test_committed_write_pins_user_to_primary(self, two_databases: User):
+        sessions = database.get_session()
+        session = await anext(sessions)
+        session.info["user_id"] = two_databases.id
+        session.add(User(email="new@example.com", hashed_password="x"))
+        with pytest.raises(StopAsyncIteration):
+            await anext(sessions)
+
+        assert PRIMARY_EMAIL in await _emails_seen(_request(two_databases.id))
+
+    async def test_write_is_noted_at_commit(self, two_databases: User):
+        # release_request_sessions commits before the response; the dependency
+        # itself only finishes afterwards.
+        sessions = database.get_session()
+        session = await anext(sessions)
+        session.info["user_id"] = two_databases.id
+        session.add(User(email="new@example.com", hashed_password="x"))
+        await session.commit()
+
+        assert PRIMARY_EMAIL in await _emails_seen(_request(two_databases.id))
+        await sessions.aclose()
+
+    async def test_read_primary_cookie_pins_across_workers(self, two_databases: User):
+        # Another worker handled the write; only the cookie it set says so.
+        cookie = f"{database.READ_PRIMARY_COOKIE}=1"
+        assert await _emails_seen(_request(two_databases.id, cookie)) == [PRIMARY_EMAIL]
+
+    async def test_lagging_replica_falls_back_to_primary(self, two_databases: User):
+        with patch.object(database, "measure_replica_lag", AsyncMock(return_value=60.0)):
+            assert await _emails_seen(_request()) == [PRIMARY_EMAIL]
+        assert database.REPLICA_LAG.value() == 60.0
+
+    async def test_lag_measurement_is_reused(self, two_databases: User):
+        probe = AsyncMock(return_value=0.0)
+        with patch.object(database, "measure_replica_lag", probe):
+            for _ in range(3):
+                await _emails_seen(_request())
+        assert probe.await_count == 1
+
+    async def test_without_replica_reads_use_primary(self, tmp_path):
+        url = f"sqlite+aiosqlite:///{tmp_path / 'only.db'}"
+        await _seed(url, PRIMARY_EMAIL)
+        database.init_db(Settings(_env_file=None), url=url)
+        try:
+            assert await _emails_seen(_request()) == [PRIMARY_EMAIL]
+        finally:
+            await database.close_db()
@@ -0,0 +1,160 @@
+"""Tests for the queued logging pipeline."""
+
+import json
+import logging
+import queue
+import threading
+from unittest.mock import patch
+
+import pytest
+import structlog
+
+from app.core import logging as app_logging
+from app.core.logging import (
+    LOG_RECORDS_DROPPED,
+    LogWriter,
+    NonBlockingQueueHandler,
+    setup_logging,
+    shutdown_logging,
+)
+from app.core.settings import Settings
+
+
+@pytest.fixture
+def configure(capsys):
+    """Run setup_logging for a test, then restore structlog and the root logger."""
+    config = structlog.get_config()
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+
+    def _configure(**overrides):
+        setup_logging(Settings(_env_file=None, **{"log_json": True, **overrides}))
+
+    def lines() -> list[dict]:
+        shutdown_logging()  # flushes the queue
+        return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    _configure.lines = lines
+    yield _configure
+    shutdown_logging()
+    structlog.configure(**config)
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+class TestPipeline:
+    def test_records_are_rendered_as_json_on_the_writer_thread(self, configure):
+        rendered_on: list[str] = []
+        original = app_logging._dumps
+
+        def spy(obj, **kw):
+            rendered_on.append(threading.current_thread().name)
+            return original(obj, **kw)
+
+        with patch.object(app_logging, "_dumps", spy):
+            configure()  # JSONRenderer binds _dumps at setup
+            structlog.contextvars.bind_contextvars(request_id="abc12345")
+            structlog.get_logger("test").info("goal_created", goal_id="g1")
+            logging.getLogger("stdlib").warning("plain %s", "message")
+            out = configure.lines()
+            structlog.contextvars.clear_contextvars()
+
+        assert isinstance(logging.getLogger().handlers[0], NonBlockingQueueHandler)
+        assert out[0]["event"] == "goal_created"
+        assert out[0]["request_id"] == "abc12345"
+        assert out[0]["goal_id"] == "g1"
+        assert out[1]["event"] == "plain message"
+        assert rendered_on and threading.main_thread().name not in rendered_on
+
+    def test_exception_tracebacks_reach_the_output(self, configure):
+        configure()
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            structlog.get_logger("test").exception("sync_failed")
+            logging.getLogger("stdlib").exception("plain failure")
+        out = configure.lines()
+
+        for line in out:
+            (exception,) = line["exception"]
+            assert exception["exc_type"] == "ValueError"
+            assert exception["exc_value"] == "boom"
+            assert exception["frames"]
+
+    def test_console_tracebacks_reach_the_output(self, configure, capsys):
+        configure(log_json=False)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            structlog.get_logger("test").exception("sync_failed")
+        shutdown_logging()
+
+        out = capsys.readouterr().out
+        assert "sync_failed" in out
+        assert "ValueError" in out and "boom" in out
+
+    def test_shutdown_flushes_queued_records(self, configure):
+        configure()
+        log = structlog.get_logger("test")
+        for i in range(200):
+            log.info("tick", i=i)
+        assert [line["i"] for line in configure.lines()] == list(range(200))
+
+
+class TestSampling:
+    def test_sampled_events_are_dropped_and_counted(self, configure):
+        configure(log_sample_rates={"request_completed": 0.0})
+        before = LOG_RECORDS_DROPPED.value(reason="sampled")
+        log = structlog.get_logger("test")
+        log.info("request_completed", status=200)
+        log.info("request_completed", status=503)  # server errors are always kept
+        log.warning("request_completed", status=200)  # as are warnings
+        log.info("goal_created")  # not sampled at all
+        out = configure.lines()
+        assert [(line["event"], line.get("status")) for line in out] == [
+            ("request_completed", 503),
+            ("request_completed", 200),
+            ("goal_created", None),
+        ]
+        assert out[0]["sample_rate"] == 0.0
+        assert LOG_RECORDS_DROPPED.value(reason="sampled") == before + 1
+
+    def test_high_volume_events_are_sampled_by_default(self):
+        rates = Settings(_env_file=None).log_sample_rates
+        assert 0 < rates["request_completed"] < 1
+        assert 0 < rates["strava_completion_added"] < 1
+
+    def test_kept_events_carry_their_sample_rate(self, configure):
+        configure(log_sample_rates={"strava_completion_added": 0.25})
+        log = structlog.get_logger("test")
+        with patch("app.core.logging.random.random", side_effect=[0.1, 0.9]):
+            log.info("strava_completion_added", activity_id=1)
+            log.info("strava_completion_added", activity_id=2)
+        out = configure.lines()
+        assert [(line["activity_id"], line["sample_rate"]) for line in out] == [(1, 0.25)]
+
+
+class TestBackpressure:
+    def test_full_queue_drops_without_blocking_and_writer_reports_it(self):
+        records: queue.Queue = queue.Queue(maxsize=1)
+        before = LOG_RECORDS_DROPPED.value(reason="queue_full")
+        handler = NonBlockingQueueHandler(records)
+        for i in range(3):
+            handler.emit(
+                logging.makeLogRecord({"msg": "event %d", "args": (i,), "levelno": logging.INFO})
+            )
+        assert LOG_RECORDS_DROPPED.value(reason="queue_full") == before + 2
+
+        written: list[logging.LogRecord] = []
+        sink = logging.Handler()
+        sink.emit = written.append  # type: ignore[method-assign]
+        writer = LogWriter(records, sink)
+        writer._reported = before
+        writer.start()
+        writer.stop()
+
+        report, kept = written
+        assert report.getMessage() == "log_records_dropped"
+        assert report.levelno == logging.WARNING
+        assert (report.dropped, report.reason) == (2, "queue_full")
+        assert kept.getMessage() == "event 0"
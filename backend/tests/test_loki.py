@@ -0,0 +1,182 @@
+"""Tests for the batched Loki shipper, against a local HTTP stand-in."""
+
+import gzip
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.loki import LOKI_LINES_DROPPED, LOKI_PUSHES, LokiHandler, OverflowPolicy
+
+
+class FakeLoki:
+    """Minimal push endpoint: records decoded batches, can fail on demand."""
+
+    def __init__(self):
+        self.batches: list[dict] = []
+        self.headers: list[dict] = []
+        self.responses: list[int] = []  # statuses to return before answering 204
+        self.received = threading.Condition()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                status = fake.responses.pop(0) if fake.responses else 204
+                if status == 204:
+                    with fake.received:
+                        fake.headers.append(dict(self.headers))
+                        fake.batches.append(json.loads(gzip.decompress(body)))
+                        fake.received.notify_all()
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def wait_for(self, batches: int, timeout: float = 5.0) -> list[dict]:
+        with self.received:
+            self.received.wait_for(lambda: len(self.batches) >= batches, timeout)
+        return self.batches
+
+    def lines(self) -> list[str]:
+        return [
+            line
+            for batch in self.batches
+            for stream in batch["streams"]
+            for _, line in stream["values"]
+        ]
+
+
+@pytest.fixture
+def loki():
+    fake = FakeLoki()
+    yield fake
+    fake.server.shutdown()
+
+
+def _handler(url: str, **kwargs) -> LokiHandler:
+    kwargs = {"batch_size": 3, "flush_interval": 60.0, "backoff": 0.01} | kwargs
+    handler = LokiHandler(url, {"app": "test", "environment": "test"}, **kwargs)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def _record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.makeLogRecord(
+        {"msg": msg, "levelno": level, "levelname": logging.getLevelName(level)}
+    )
+
+
+class TestBatching:
+    def test_pushes_full_batches_then_the_rest_on_close(self, loki: FakeLoki):
+        handler = _handler(loki.url)
+        for i in range(7):
+            handler.handle(_record(f"line {i}"))
+        assert len(loki.wait_for(2)) == 2  # two full batches of 3, no timer needed
+        handler.close()
+        assert loki.lines() == [f"line {i}" for i in range(7)]
+        assert [len(b["streams"][0]["values"]) for b in loki.batches] == [3, 3, 1]
+
+    def test_partial_batch_is_pushed_after_the_flush_interval(self, loki: FakeLoki):
+        handler = _handler(loki.url, batch_size=100, flush_interval=0.05)
+        handler.handle(_record("lonely"))
+        assert loki.wait_for(1)
+        assert loki.lines() == ["lonely"]
+        handler.close()
+
+    def test_payload_is_gzipped_with_one_stream_per_severity(self, loki: FakeLoki):
+        handler = _handler(loki.url)
+        handler.handle(_record("info"))
+        handler.handle(_record("oops", logging.ERROR))
+        handler.handle(_record("info again"))
+        (batch,) = loki.wait_for(1)
+        handler.close()
+
+        assert loki.headers[0]["Content-Encoding"] == "gzip"
+        assert {s["stream"]["severity"]: [v[1] for v in s["values"]] for s in batch["streams"]} == {
+            "info": ["info", "info again"],
+            "error": ["oops"],
+        }
+        stream = batch["streams"][0]
+        assert stream["stream"] | {"severity": "info"} == {
+            "app": "test",
+            "environment": "test",
+            "severity": "info",
+        }
+        ts = int(stream["values"][0][0])
+        assert abs(ts / 1e9 - time.time()) < 60
+
+
+class TestFailures:
+    def test_retries_server_errors_with_backoff(self, loki: FakeLoki):
+        loki.responses = [503, 429]
+        retries = LOKI_PUSHES.value(outcome="retry")
+        handler = _handler(loki.url)
+        for i in range(3):
+            handler.handle(_record(f"line {i}"))
+        assert loki.wait_for(1)
+        handler.close()
+        assert loki.lines() == ["line 0", "line 1", "line 2"]
+        assert LOKI_PUSHES.value(outcome="retry") == retries + 2
+
+    def test_gives_up_after_max_retries_and_counts_the_loss(self, loki: FakeLoki):
+        loki.responses = [500, 500, 500]
+        dropped = LOKI_LINES_DROPPED.value(reason="push_failed")
+        failed = LOKI_PUSHES.value(outcome="failed")
+        handler = _handler(loki.url, max_retries=2)
+        for i in range(3):
+            handler.handle(_record(f"line {i}"))
+        deadline = time.monotonic() + 5
+        while LOKI_PUSHES.value(outcome="failed") == failed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        handler.handle(_record("next batch"))  # the shipper moves on to new lines
+        handler.close()
+        assert loki.lines() == ["next batch"]
+        assert LOKI_LINES_DROPPED.value(reason="push_failed") == dropped + 3
+
+    def test_rejected_batches_are_not_retried(self, loki: FakeLoki):
+        loki.responses = [400]
+        rejected = LOKI_LINES_DROPPED.value(reason="rejected")
+        handler = _handler(loki.url, batch_size=1)
+        handler.handle(_record("bad"))
+        handler.handle(_record("good"))
+        handler.close()
+        assert loki.lines() == ["good"]
+        assert LOKI_LINES_DROPPED.value(reason="rejected") == rejected + 1
+
+    def test_unreachable_loki_does_not_block_the_caller(self):
+        handler = _handler("http://127.0.0.1:9", batch_size=1, max_retries=100, timeout=0.5)
+        start = time.perf_counter()
+        for i in range(100):
+            handler.handle(_record(f"line {i}"))
+        assert time.perf_counter() - start < 0.5
+        handler.close()
+
+
+class TestOverflow:
+    @pytest.mark.parametrize(
+        ("policy", "kept"),
+        [
+            (OverflowPolicy.DROP_OLDEST, ["line 6", "line 7", "line 8", "line 9"]),
+            (OverflowPolicy.DROP_NEWEST, ["line 0", "line 1", "line 2", "line 3"]),
+        ],
+    )
+    def test_buffer_is_bounded(self, loki: FakeLoki, policy: OverflowPolicy, kept: list[str]):
+        dropped = LOKI_LINES_DROPPED.value(reason="overflow")
+        # The batch never fills and the timer never fires, so lines pile up.
+        handler = _handler(loki.url, batch_size=100, max_buffer=4, overflow=policy)
+        for i in range(10):
+            handler.handle(_record(f"line {i}"))
+        assert len(handler._buffer) == 4
+        handler.close()
+        assert loki.lines() == kept
+        assert LOKI_LINES_DROPPED.value(reason="overflow") == dropped + 6
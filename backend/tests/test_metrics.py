@@ -0,0 +1,173 @@
+"""Tests for the metrics registry, its Prometheus rendering and the instrumentation."""
+
+import json
+import os
+import threading
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from structlog.testing import capture_logs
+
+from app.core.database import create_engine, track_queries
+from app.core.metrics import (
+    MetricsRegistry,
+    collect,
+    merge_snapshots,
+    render_prometheus,
+    write_worker_snapshot,
+)
+from app.core.settings import Settings
+from app.middleware.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from app.services import strava
+
+
+class TestRegistry:
+    def test_concurrent_recording_is_not_lost(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("hits_total", "Hits")
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+
+        def record():
+            for _ in range(10_000):
+                counter.inc(route="/a")
+                histogram.observe(0.5, route="/a")
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.value(route="/a") == 40_000
+        (sample,) = histogram.samples()
+        assert sample["buckets"] == {"0.1": 0, "1": 40_000, "+Inf": 40_000}
+        assert sample["sum"] == pytest.approx(20_000)
+
+    def test_gauge_inc_and_dec_across_threads(self):
+        gauge = MetricsRegistry().gauge("in_flight", "In flight")
+        gauge.inc()
+        worker = threading.Thread(target=gauge.dec)
+        worker.start()
+        worker.join()
+        gauge.inc(2)
+        assert gauge.value() == 2
+
+
+class TestPrometheusFormat:
+    def test_renders_counters_gauges_and_histograms(self):
+        registry = MetricsRegistry()
+        registry.counter("hits_total", "Hits").inc(2, route='/say "hi"')
+        registry.gauge("pool_size", "Pool size", lambda: 5)
+        registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1)).observe(0.25)
+
+        assert render_prometheus(registry.snapshot()).splitlines() == [
+            "# HELP hits_total Hits",
+            "# TYPE hits_total counter",
+            'hits_total{route="/say \\"hi\\""} 2',
+            "# HELP pool_size Pool size",
+            "# TYPE pool_size gauge",
+            "pool_size 5",
+            "# HELP latency_seconds Latency",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{le="0.1"} 0',
+            'latency_seconds_bucket{le="1"} 1',
+            'latency_seconds_bucket{le="+Inf"} 1',
+            "latency_seconds_sum 0.25",
+            "latency_seconds_count 1",
+        ]
+
+
+class TestWorkers:
+    def _snapshot(self, hits: int, in_flight: int, observed: float) -> dict:
+        registry = MetricsRegistry()
+        registry.counter("hits_total", "Hits").inc(hits, route="/a")
+        registry.gauge("in_flight", "In flight").set(in_flight)
+        registry.histogram("latency_seconds", "Latency", buckets=(1,)).observe(observed)
+        return registry.snapshot()
+
+    def test_merge_sums_counters_and_histograms_and_labels_gauges(self):
+        merged = merge_snapshots({1: self._snapshot(2, 3, 0.5), 2: self._snapshot(5, 1, 2.0)})
+        assert merged["hits_total"]["samples"] == [{"labels": {"route": "/a"}, "value": 7}]
+        assert merged["in_flight"]["samples"] == [
+            {"labels": {"pid": "1"}, "value": 3},
+            {"labels": {"pid": "2"}, "value": 1},
+        ]
+        (histogram,) = merged["latency_seconds"]["samples"]
+        assert histogram["buckets"] == {"1": 1, "+Inf": 2}
+        assert (histogram["count"], histogram["sum"]) == (2, 2.5)
+
+    def test_collect_merges_other_workers_files(self, tmp_path):
+        settings = MagicMock(metrics_multiproc_dir=str(tmp_path), metrics_flush_interval_seconds=5)
+        (tmp_path / "999999.json").write_text(json.dumps(self._snapshot(4, 1, 0.5)))
+        stale = tmp_path / "888888.json"  # a worker that died without removing its file
+        stale.write_text(json.dumps(self._snapshot(100, 1, 0.5)))
+        os.utime(stale, (0, 0))
+
+        with patch("app.core.metrics.get_settings", return_value=settings):
+            write_worker_snapshot(str(tmp_path))  # our own file is skipped in favour of live values
+            merged = collect()
+
+        assert (tmp_path / f"{os.getpid()}.json").exists()
+        assert merged["hits_total"]["samples"] == [{"labels": {"route": "/a"}, "value": 4}]
+        assert merged["in_flight"]["samples"] == [{"labels": {"pid": "999999"}, "value": 1}]
+        assert "http_request_duration_seconds" in merged  # this worker's live metrics
+
+
+class TestInstrumentation:
+    async def test_requests_are_timed_by_route_template(self, client: AsyncClient):
+        before = HTTP_REQUEST_DURATION.count(method="GET", route="/health", status=200)
+        missing = HTTP_REQUEST_DURATION.count(method="GET", route="unmatched", status=404)
+        await client.get("/api/v1/health")
+        await client.get("/api/v1/no-such-route")
+        assert HTTP_REQUEST_DURATION.count(method="GET", route="/health", status=200) == before + 1
+        assert HTTP_REQUEST_DURATION.count(method="GET", route="unmatched", status=404) == (
+            missing + 1
+        )
+        assert HTTP_REQUESTS_IN_FLIGHT.value() == 0
+
+    async def test_queries_are_tallied_per_context(self, tmp_path):
+        engine = create_engine(
+            Settings(_env_file=None), url=f"sqlite+aiosqlite:///{tmp_path / 'q.db'}"
+        )
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))  # outside any tally
+            with track_queries() as tally:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+        await engine.dispose()
+        assert tally.count == 2
+        assert tally.seconds > 0
+
+    async def test_repeated_statements_are_flagged_once(self, tmp_path):
+        settings = Settings(_env_file=None, db_n_plus_one_threshold=3)
+        engine = create_engine(settings, url=f"sqlite+aiosqlite:///{tmp_path / 'q.db'}")
+        async with engine.connect() as conn:
+            with track_queries(), capture_logs() as logs:
+                for goal_id in range(5):
+                    await conn.execute(text("SELECT :goal_id"), {"goal_id": goal_id})
+                await conn.execute(text("SELECT 2"))
+        await engine.dispose()
+        assert logs == [
+            {
+                "event": "n_plus_one_suspected",
+                "log_level": "warning",
+                "statement": "SELECT ?",
+                "executions": 3,
+            }
+        ]
+
+    async def test_strava_calls_are_timed_by_endpoint(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+        strava.set_http_client(httpx.AsyncClient(transport=transport, base_url="http://strava"))
+        duration = strava.STRAVA_REQUEST_DURATION
+        labels = {"method": "GET", "endpoint": "/api/v3/activities/{id}", "status": 200}
+        before = duration.count(**labels)
+        try:
+            await strava.get_http_client().get("/api/v3/activities/12345")
+            await strava.get_http_client().get("/api/v3/activities/67890")
+        finally:
+            await strava.close_http_client()
+        assert duration.count(**labels) == before + 2
@@ -0,0 +1,120 @@
+"""Tests for the request logging middleware."""
+
+import asyncio
+
+import pytest
+import structlog
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from structlog.testing import capture_logs
+
+from app.core.database import create_engine
+from app.core.settings import Settings
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.request_logging import RequestLoggingMiddleware
+
+
+async def _context(request):
+    return JSONResponse(structlog.contextvars.get_contextvars())
+
+
+async def _stream(request):
+    async def chunks():
+        for i in range(3):
+            await asyncio.sleep(0.01)
+            yield f"chunk-{i}\n".encode()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+async def _boom(request):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+async def client():
+    app = Starlette(
+        routes=[Route("/context", _context), Route("/stream", _stream), Route("/boom", _boom)]
+    )
+    wrapped = RequestLoggingMiddleware(app)
+    transport = ASGITransport(app=wrapped, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+class TestRequestLoggingMiddleware:
+    async def test_binds_request_id_and_returns_it(self, client: AsyncClient):
+        with capture_logs() as logs:
+            response = await client.get("/context")
+        request_id = response.headers["X-Request-ID"]
+        assert len(request_id) == 8
+        assert response.json() == {"request_id": request_id}
+        assert logs == [
+            {
+                "event": "request_completed",
+                "log_level": "info",
+                "method": "GET",
+                "path": "/context",
+                "status": 200,
+                "elapsed_ms": logs[0]["elapsed_ms"],
+            }
+        ]
+
+    async def test_each_request_gets_its_own_id(self, client: AsyncClient):
+        first = await client.get("/context")
+        second = await client.get("/context")
+        assert first.headers["X-Request-ID"] != second.headers["X-Request-ID"]
+
+    async def test_streaming_body_passes_through_and_is_timed(self, client: AsyncClient):
+        with capture_logs() as logs:
+            response = await client.get("/stream")
+        assert response.text == "chunk-0\nchunk-1\nchunk-2\n"
+        assert "X-Request-ID" in response.headers
+        # Timing runs until the last chunk has been sent, not just the headers.
+        assert logs[0]["elapsed_ms"] >= 30
+
+    async def test_unhandled_error_is_logged_as_500(self, client: AsyncClient):
+        with capture_logs() as logs:
+            response = await client.get("/boom")
+        assert response.status_code == 500
+        assert logs[0]["status"] == 500
+
+    async def test_non_http_scopes_pass_through(self):
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(scope["type"])
+
+        with capture_logs() as logs:
+            await RequestLoggingMiddleware(app)({"type": "lifespan"}, None, None)
+        assert seen == ["lifespan"]
+        assert logs == []
+
+
+class TestQueryTally:
+    @pytest.fixture
+    async def client(self):
+        engine = create_engine(Settings(_env_file=None), url="sqlite+aiosqlite://")
+
+        async def _query(request):
+            async with engine.connect() as conn:
+                for _ in range(3):
+                    await conn.execute(text("SELECT 1"))
+            return JSONResponse({})
+
+        app = Starlette(routes=[Route("/query", _query)])
+        wrapped = MetricsMiddleware(RequestLoggingMiddleware(app, query_headers=True))
+        async with AsyncClient(transport=ASGITransport(app=wrapped), base_url="http://test") as ac:
+            yield ac
+        await engine.dispose()
+
+    async def test_statements_are_logged_and_sent_as_headers(self, client: AsyncClient):
+        with capture_logs() as logs:
+            response = await client.get("/query")
+        assert response.headers["X-DB-Queries"] == "3"
+        assert float(response.headers["X-DB-Time-Ms"]) > 0
+        assert logs[0]["db_queries"] == 3
+        assert logs[0]["db_ms"] == pytest.approx(float(response.headers["X-DB-Time-Ms"]), abs=0.01)
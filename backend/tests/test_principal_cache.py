@@ -0,0 +1,90 @@
+"""Tests for the cached token / principal lookup in ``get_current_user``."""
+
+from unittest.mock import patch
+
+from httpx import AsyncClient
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.principal_cache import TTLCache, invalidate_user, principal_cache
+from app.core.security import decode_access_token
+from app.schemas.user import User
+from tests.conftest import engine
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(engine.sync_engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine.sync_engine, "before_cursor_execute", self)
+
+    @property
+    def user_selects(self) -> int:
+        return sum("FROM users" in s for s in self.statements)
+
+
+class TestTTLCache:
+    def test_evicts_least_recently_used(self):
+        cache: TTLCache[str, int] = TTLCache(max_size=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        assert cache.get("a") == 1
+        cache.set("c", 3, ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_expired_entries_are_misses(self):
+        cache: TTLCache[str, int] = TTLCache(max_size=2)
+        cache.set("a", 1, ttl=0)
+        assert cache.get("a") is None
+        with patch("app.core.principal_cache.time.monotonic", return_value=0):
+            cache.set("b", 2, ttl=5)
+        with patch("app.core.principal_cache.time.monotonic", return_value=6):
+            assert cache.get("b") is None
+
+
+class TestCachedPrincipal:
+    async def test_repeat_requests_skip_user_select(
+        self, client: AsyncClient, session: AsyncSession, test_user: User, auth_headers: dict
+    ):
+        session.expunge_all()  # make get_current_user load the row itself
+        assert (await client.get("/api/v1/auth/me", headers=auth_headers)).status_code == 200
+        session.expunge_all()
+
+        with _QueryCounter() as queries:
+            response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == test_user.email
+        assert queries.user_selects == 0
+
+    async def test_repeat_requests_skip_token_verification(
+        self, client: AsyncClient, test_user: User, auth_headers: dict
+    ):
+        with patch("app.core.deps.decode_access_token", wraps=decode_access_token) as decode:
+            for _ in range(3):
+                await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert decode.call_count == 1
+
+    async def test_deactivation_takes_effect_after_invalidation(
+        self, client: AsyncClient, session: AsyncSession, test_user: User, auth_headers: dict
+    ):
+        session.expunge_all()
+        assert (await client.get("/api/v1/auth/me", headers=auth_headers)).status_code == 200
+        assert principal_cache.get(test_user.id) is not None
+
+        await session.execute(update(User).where(User.id == test_user.id).values(is_active=False))
+        invalidate_user(test_user.id, session)
+        await session.commit()
+        session.expunge_all()
+
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 403
@@ -0,0 +1,103 @@
+"""Unit tests for the sliding-window login throttle."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from starlette.requests import Request
+
+from app.core.rate_limit import (
+    LOGIN_THROTTLE_ATTEMPTS,
+    LoginThrottle,
+    LoginThrottledError,
+    MemoryThrottleBackend,
+)
+
+
+def _throttle(
+    ip_limit: int = 0,
+    email_limit: int = 0,
+    window: int = 60,
+    trusted_proxies: tuple[str, ...] = (),
+) -> LoginThrottle:
+    settings = MagicMock(
+        login_throttle_ip_limit=ip_limit,
+        login_throttle_ip_window_seconds=window,
+        login_throttle_email_limit=email_limit,
+        login_throttle_email_window_seconds=window,
+        trusted_proxies=list(trusted_proxies),
+    )
+    return LoginThrottle(MemoryThrottleBackend(), settings)
+
+
+def _request(peer: str, forwarded_for: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 40000)})
+
+
+class TestMemoryThrottleBackend:
+    async def test_previous_window_is_weighted_by_overlap(self):
+        backend = MemoryThrottleBackend()
+        for _ in range(10):
+            await backend.hit("k", 60, now=30)
+        # Halfway through the next window half of the previous ten still count.
+        assert await backend.hit("k", 60, now=90) == pytest.approx(1 + 10 * 0.5)
+
+    async def test_idle_keys_forget_old_windows(self):
+        backend = MemoryThrottleBackend()
+        await backend.hit("k", 60, now=0)
+        assert await backend.hit("k", 60, now=185) == 1
+
+    async def test_bounded_key_count(self):
+        backend = MemoryThrottleBackend(max_keys=3)
+        for i in range(10):
+            await backend.hit(f"k{i}", 60, now=0)
+        assert len(backend) == 3
+
+
+class TestLoginThrottle:
+    async def test_rejects_per_email_case_insensitively(self):
+        throttle = _throttle(email_limit=2)
+        allowed = LOGIN_THROTTLE_ATTEMPTS.value(outcome="allowed")
+        rejected = LOGIN_THROTTLE_ATTEMPTS.value(outcome="rejected_email")
+        await throttle.check("a@example.com", "10.0.0.1", now=0)
+        await throttle.check("A@Example.com ", "10.0.0.2", now=1)
+        with pytest.raises(LoginThrottledError) as exc_info:
+            await throttle.check("a@example.com", "10.0.0.3", now=2)
+        assert exc_info.value.scope == "email"
+        assert exc_info.value.retry_after == 58
+        assert LOGIN_THROTTLE_ATTEMPTS.value(outcome="allowed") == allowed + 2
+        assert LOGIN_THROTTLE_ATTEMPTS.value(outcome="rejected_email") == rejected + 1
+
+    async def test_rejects_per_ip_across_emails(self):
+        throttle = _throttle(ip_limit=3)
+        rejected = LOGIN_THROTTLE_ATTEMPTS.value(outcome="rejected_ip")
+        for i in range(3):
+            await throttle.check(f"user{i}@example.com", "10.0.0.1", now=i)
+        with pytest.raises(LoginThrottledError):
+            await throttle.check("other@example.com", "10.0.0.1", now=4)
+        await throttle.check("other@example.com", "10.0.0.2", now=4)
+        assert LOGIN_THROTTLE_ATTEMPTS.value(outcome="rejected_ip") == rejected + 1
+
+    async def test_success_clears_email_count(self):
+        throttle = _throttle(email_limit=2)
+        await throttle.check("a@example.com", None, now=0)
+        await throttle.check("a@example.com", None, now=1)
+        await throttle.succeeded("a@example.com")
+        await throttle.check("a@example.com", None, now=2)
+
+
+class TestClientIp:
+    def test_forwarded_for_ignored_from_untrusted_peer(self):
+        throttle = _throttle(trusted_proxies=("172.28.0.10",))
+        assert throttle.client_ip(_request("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+    def test_spoofed_hops_do_not_change_the_key(self):
+        # The proxy appends the real peer; whatever the client sent sits to its left.
+        throttle = _throttle(trusted_proxies=("172.28.0.0/24",))
+        for spoofed in ("198.51.100.1", "198.51.100.2, 10.0.0.9"):
+            request = _request("172.28.0.10", f"{spoofed}, 203.0.113.7")
+            assert throttle.client_ip(request) == "203.0.113.7"
+
+    def test_trusted_peer_without_header_is_the_client(self):
+        throttle = _throttle(trusted_proxies=("172.28.0.10",))
+        assert throttle.client_ip(_request("172.28.0.10")) == "172.28.0.10"
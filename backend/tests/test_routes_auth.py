@@ -4,8 +4,12 @@ import uuid
 from unittest.mock import patch
 
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
 
-from app.core.security import create_access_token
+from app.core.security import PasswordPoolBusyError, create_access_token
+from app.core.settings import get_settings
+from app.schemas.session import RefreshSession
 from app.schemas.user import User
 
 
@@ -94,6 +98,128 @@ class TestLoginRoute:
         )
         assert response.status_code == 403
 
+    async def test_login_sheds_load_when_password_pool_full(
+        self, client: AsyncClient, test_user: User
+    ):
+        with patch(
+            "app.services.auth.verify_password_async",
+            side_effect=PasswordPoolBusyError("full"),
+        ):
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": "testuser@example.com", "password": "testpassword"},
+            )
+        assert response.status_code == 503
+
+    async def test_login_throttled_before_password_check(
+        self, client: AsyncClient, test_user: User
+    ):
+        payload = {"email": "testuser@example.com", "password": "wrongpassword"}
+        settings = get_settings()
+        with patch("app.services.auth.verify_password_async", return_value=False) as verify:
+            for _ in range(settings.login_throttle_email_limit):
+                assert (await client.post("/api/v1/auth/login", json=payload)).status_code == 401
+            response = await client.post("/api/v1/auth/login", json=payload)
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert verify.call_count == settings.login_throttle_email_limit
+
+    async def test_login_throttle_key_ignores_spoofed_forwarded_for(
+        self, client: AsyncClient, test_user: User
+    ):
+        payload = {"email": "testuser@example.com", "password": "testpassword"}
+        with patch("app.core.rate_limit.LoginThrottle.check") as check:
+            for spoofed in ("198.51.100.1", "198.51.100.2"):
+                await client.post(
+                    "/api/v1/auth/login", json=payload, headers={"X-Forwarded-For": spoofed}
+                )
+        ips = {call.args[1] for call in check.call_args_list}
+        assert len(ips) == 1
+        assert not ips & {"198.51.100.1", "198.51.100.2"}
+
+
+async def _login(client: AsyncClient) -> dict:
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "testuser@example.com", "password": "testpassword"},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestRefreshRoute:
+    async def test_rotates_without_password_verify(self, client: AsyncClient, test_user: User):
+        tokens = await _login(client)
+        assert tokens["refresh_token"]
+
+        with patch("app.services.auth.verify_password_async") as verify:
+            response = await client.post(
+                "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+            )
+        verify.assert_not_called()
+        assert response.status_code == 200
+        rotated = response.json()
+        assert rotated["refresh_token"] != tokens["refresh_token"]
+
+        me = await client.get(
+            "/api/v1/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}
+        )
+        assert me.status_code == 200
+
+    async def test_reuse_revokes_the_family(
+        self, client: AsyncClient, test_user: User, monkeypatch
+    ):
+        monkeypatch.setattr(get_settings(), "refresh_token_reuse_grace_seconds", 0)
+        first = (await _login(client))["refresh_token"]
+        second = (await client.post("/api/v1/auth/refresh", json={"refresh_token": first})).json()[
+            "refresh_token"
+        ]
+
+        replay = await client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+        assert replay.status_code == 401
+        # The legitimate successor dies with it.
+        after = await client.post("/api/v1/auth/refresh", json={"refresh_token": second})
+        assert after.status_code == 401
+
+    async def test_replay_within_grace_returns_the_successor(
+        self, client: AsyncClient, test_user: User
+    ):
+        # Two tabs refreshing with the same token: the loser gets the winner's successor.
+        first = (await _login(client))["refresh_token"]
+        winner = await client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+        loser = await client.post("/api/v1/auth/refresh", json={"refresh_token": first})
+        assert winner.status_code == loser.status_code == 200
+        second = winner.json()["refresh_token"]
+        assert loser.json()["refresh_token"] == second
+
+        after = await client.post("/api/v1/auth/refresh", json={"refresh_token": second})
+        assert after.status_code == 200
+
+    async def test_no_live_token_is_stored(
+        self, client: AsyncClient, session: AsyncSession, test_user: User
+    ):
+        first = (await _login(client))["refresh_token"]
+        second = (await client.post("/api/v1/auth/refresh", json={"refresh_token": first})).json()[
+            "refresh_token"
+        ]
+
+        rows = (await session.execute(select(RefreshSession))).scalars().all()
+        stored = {str(value) for row in rows for value in row.model_dump().values()}
+        assert not {first, second} & stored
+
+    async def test_unknown_token(self, client: AsyncClient):
+        response = await client.post("/api/v1/auth/refresh", json={"refresh_token": "nope"})
+        assert response.status_code == 401
+
+    async def test_logout_revokes(self, client: AsyncClient, test_user: User):
+        refresh_token = (await _login(client))["refresh_token"]
+        response = await client.post("/api/v1/auth/logout", json={"refresh_token": refresh_token})
+        assert response.status_code == 204
+
+        response = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+        assert response.status_code == 401
+
 
 class TestMeRoute:
     async def test_me_authenticated(
@@ -0,0 +1,133 @@
+"""Tests for the goal read routes' response payloads."""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi import routing
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.goals import Frequency, Goal, GoalCompletion, GoalType
+from app.schemas.user import User
+
+
+@pytest.fixture
+async def goals(session: AsyncSession, test_user: User) -> list[Goal]:
+    today = date.today()
+    created = [
+        Goal(
+            user_id=test_user.id,
+            title=f"Goal {i}",
+            goal_type=GoalType.PERIODIC,
+            frequency=Frequency.DAILY,
+            target_count=1 + i,
+            start_date=today - timedelta(days=365),
+        )
+        for i in range(3)
+    ]
+    session.add_all(created)
+    # Goal 0 is done for today; goal 1 has one of its two check-ins.
+    session.add(GoalCompletion(goal_id=created[0].id, period_start=today, value=2.5))
+    session.add(GoalCompletion(goal_id=created[1].id, period_start=today))
+    await session.commit()
+    return created
+
+
+class TestResponseSerialization:
+    @pytest.fixture
+    def dump_json_flags(self):
+        """Record whether FastAPI serialized each response straight to JSON bytes."""
+        seen: list[bool] = []
+        original = routing.serialize_response
+
+        async def spy(*args, **kwargs):
+            seen.append(kwargs["dump_json"])
+            return await original(*args, **kwargs)
+
+        with patch.object(routing, "serialize_response", spy):
+            yield seen
+
+    async def test_read_routes_serialize_to_bytes_in_pydantic_core(
+        self,
+        client: AsyncClient,
+        auth_headers: dict[str, str],
+        goals: list[Goal],
+        dump_json_flags: list[bool],
+    ):
+        today = date.today().isoformat()
+        paths = [
+            "/api/v1/goals",
+            "/api/v1/goals/dashboard",
+            f"/api/v1/goals/{goals[0].id}",
+            f"/api/v1/goals/{goals[0].id}/completions",
+            f"/api/v1/goals/trends?start_date={today}&end_date={today}",
+            f"/api/v1/goals/{goals[0].id}/trends?start_date={today}&end_date={today}",
+        ]
+        for path in paths:
+            response = await client.get(path, headers=auth_headers)
+            assert response.status_code == 200, path
+            assert response.headers["content-type"] == "application/json"
+        assert dump_json_flags == [True] * len(paths)
+
+    async def test_dashboard_progress(
+        self, client: AsyncClient, auth_headers: dict[str, str], goals: list[Goal]
+    ):
+        response = await client.get("/api/v1/goals/dashboard", headers=auth_headers)
+        progress = {
+            g["title"]: (g["period_completions"], g["is_completed"]) for g in response.json()
+        }
+        assert progress == {"Goal 0": (1, True), "Goal 1": (1, False), "Goal 2": (0, False)}
+
+    async def test_long_daily_trend_series(
+        self, client: AsyncClient, auth_headers: dict[str, str], goals: list[Goal]
+    ):
+        end = date.today()
+        start = end - timedelta(days=364)
+        response = await client.get(
+            f"/api/v1/goals/{goals[0].id}/trends",
+            params={"start_date": start.isoformat(), "end_date": end.isoformat()},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["goal"]["id"] == str(goals[0].id)
+        periods = body["periods"]
+        assert len(periods) == 365
+        assert periods[0] == {
+            "period_start": start.isoformat(),
+            "completion_count": 0,
+            "target_count": 1,
+            "is_completed": False,
+            "sum_value": None,
+            "avg_value": None,
+        }
+        assert periods[-1]["is_completed"] is True
+        assert periods[-1]["sum_value"] == 2.5
+        assert periods[-1]["avg_value"] == 2.5
+
+
+class TestQueryBudgets:
+    """Read routes run a fixed number of statements, however many goals there are."""
+
+    async def test_dashboard(
+        self, client: AsyncClient, auth_headers: dict[str, str], goals: list[Goal], max_queries
+    ):
+        with max_queries(2):
+            response = await client.get("/api/v1/goals/dashboard", headers=auth_headers)
+        assert len(response.json()) == 3
+
+    async def test_all_goal_trends(
+        self, client: AsyncClient, auth_headers: dict[str, str], goals: list[Goal], max_queries
+    ):
+        today = date.today().isoformat()
+        with max_queries(2):
+            response = await client.get(
+                "/api/v1/goals/trends",
+                params={"start_date": today, "end_date": today},
+                headers=auth_headers,
+            )
+        completions = {
+            t["goal"]["title"]: t["periods"][0]["completion_count"] for t in response.json()
+        }
+        assert completions == {"Goal 0": 1, "Goal 1": 1, "Goal 2": 0}
@@ -0,0 +1,47 @@
+"""Tests for the internal metrics endpoint."""
+
+from unittest.mock import MagicMock, patch
+
+from httpx import AsyncClient
+
+
+def _settings(**overrides) -> MagicMock:
+    settings = MagicMock(metrics_token="", environment="production")
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    return settings
+
+
+class TestMetricsEndpoint:
+    async def test_open_in_development(self, client: AsyncClient):
+        with patch("app.core.deps.get_settings", return_value=_settings(environment="development")):
+            response = await client.get("/api/v1/internal/metrics")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["db_pool_checkout_wait_seconds"]["type"] == "histogram"
+        assert body["db_pool_checked_out"]["type"] == "gauge"
+
+    async def test_hidden_without_token_outside_development(self, client: AsyncClient):
+        with patch("app.core.deps.get_settings", return_value=_settings()):
+            response = await client.get("/api/v1/internal/metrics")
+        assert response.status_code == 404
+
+    async def test_requires_matching_token(self, client: AsyncClient):
+        with patch("app.core.deps.get_settings", return_value=_settings(metrics_token="s3cret")):
+            denied = await client.get(
+                "/api/v1/internal/metrics", headers={"Authorization": "Bearer nope"}
+            )
+            allowed = await client.get(
+                "/api/v1/internal/metrics", headers={"Authorization": "Bearer s3cret"}
+            )
+        assert denied.status_code == 401
+        assert allowed.status_code == 200
+
+    async def test_prometheus_text_format(self, client: AsyncClient):
+        with patch("app.core.deps.get_settings", return_value=_settings(environment="development")):
+            await client.get("/api/v1/health")
+            response = await client.get("/api/v1/internal/metrics/prometheus")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert 'route="/health",status="200"' in response.text
@@ -0,0 +1,101 @@
+"""Tests for how routes use their database sessions and connections."""
+
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from fastapi import routing
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from app.core import database
+from app.core.security import create_access_token, hash_password
+from app.core.settings import Settings
+from app.main import create_app
+from app.schemas.user import User
+
+
+@pytest.fixture
+async def live_client(tmp_path):
+    """A client against the real session dependencies (no overrides) on a SQLite file."""
+    database.init_db(Settings(_env_file=None), url=f"sqlite+aiosqlite:///{tmp_path / 'ro.db'}")
+    async with database._engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    user = User(email="reader@example.com", hashed_password=hash_password("pw", rounds=4))
+    async with database.get_session_factory()() as session:
+        session.add(user)
+        await session.commit()
+
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+    transport = ASGITransport(app=create_app())
+    async with AsyncClient(transport=transport, base_url="http://test", headers=headers) as ac:
+        yield ac
+    await database.close_db()
+
+
+class TestReadOnlyRoutes:
+    @pytest.mark.parametrize(
+        "path", ["/api/v1/goals", "/api/v1/goals/dashboard", "/api/v1/auth/me"]
+    )
+    async def test_get_routes_skip_commit_and_share_one_session(
+        self, live_client: AsyncClient, path: str
+    ):
+        sessions_before = sum(s["value"] for s in database.READ_SESSIONS.samples())
+        with patch.object(AsyncSession, "commit", autospec=True) as commit:
+            response = await live_client.get(path)
+        assert response.status_code == 200
+        commit.assert_not_called()
+        # The principal and the route's queries went through the same session.
+        assert sum(s["value"] for s in database.READ_SESSIONS.samples()) == sessions_before + 1
+
+    async def test_read_sessions_are_read_only(self, live_client: AsyncClient):
+        assert database._read_binds["primary"].get_execution_options()["postgresql_readonly"]
+
+    async def test_writes_pin_the_client_to_the_primary(self, live_client: AsyncClient):
+        with patch.object(database, "_replica_engine", database._engine):  # "has a replica"
+            created = await live_client.post("/api/v1/goals", json={"title": "Stretch"})
+            listed = await live_client.get("/api/v1/goals")
+        assert created.status_code == 201
+        assert database.READ_PRIMARY_COOKIE in created.cookies
+        assert "set-cookie" not in listed.headers
+
+
+class TestConnectionRelease:
+    @pytest.fixture
+    def checked_out_at_serialization(self):
+        """Record how many connections are checked out while the response is serialized."""
+        seen: list[int] = []
+        original = routing.serialize_response
+
+        async def spy(*args, **kwargs):
+            seen.append(database._engine.pool.checkedout())
+            return await original(*args, **kwargs)
+
+        with patch.object(routing, "serialize_response", spy):
+            yield seen
+
+    async def test_read_route_releases_before_serializing(
+        self, live_client: AsyncClient, checked_out_at_serialization: list[int]
+    ):
+        response = await live_client.get("/api/v1/goals/dashboard")
+        assert response.status_code == 200
+        assert checked_out_at_serialization == [0]
+
+    async def test_write_route_commits_before_serializing(
+        self, live_client: AsyncClient, checked_out_at_serialization: list[int]
+    ):
+        payload = {"title": "Run", "goal_type": "periodic", "frequency": "weekly"}
+        payload |= {"target_count": 3, "start_date": date.today().isoformat()}
+        response = await live_client.post("/api/v1/goals", json=payload)
+        assert response.status_code == 201
+        assert checked_out_at_serialization == [0]
+
+        # The commit happened before the response, so the goal is already visible.
+        listed = await live_client.get("/api/v1/goals")
+        assert [g["title"] for g in listed.json()] == ["Run"]
+
+    async def test_connection_hold_time_is_recorded(self, live_client: AsyncClient):
+        before = database.CONNECTION_HOLD.count()
+        await live_client.get("/api/v1/goals")
+        assert database.CONNECTION_HOLD.count() > before
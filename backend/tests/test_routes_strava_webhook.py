@@ -0,0 +1,303 @@
+"""Integration tests for Strava webhook verification and event ingestion.
+
+Recorded webhook payloads in ``fixtures/strava_webhook_events.json`` are replayed
+through the endpoint; a stand-in for ``GET /activities/{id}`` serves the
+activity snapshot recorded alongside each event.
+"""
+
+import asyncio
+import json
+from datetime import UTC, date, datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import httpx
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from structlog.testing import capture_logs
+
+from app.models.strava import StravaWebhookEvent
+from app.schemas.goals import Frequency, Goal, GoalCompletion, GoalType, ValueType
+from app.schemas.strava import StravaActivity
+from app.schemas.user import User
+from app.services import strava_webhook
+from app.services.strava_webhook import (
+    drain_event_queue,
+    enqueue_event,
+    process_event,
+    stop_webhook_worker,
+)
+
+RECORDED_EVENTS = json.loads(
+    (Path(__file__).parent / "fixtures" / "strava_webhook_events.json").read_text()
+)
+ATHLETE_ID = "134815"
+SUBSCRIPTION_ID = 120475
+
+
+def _http_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://www.strava.com/api/v3")
+    return httpx.HTTPStatusError(
+        "stand-in", request=request, response=httpx.Response(status, request=request)
+    )
+
+
+def _settings(**overrides) -> MagicMock:
+    settings = MagicMock()
+    settings.strava_webhook_verify_token = "s3cret"
+    settings.strava_webhook_subscription_id = SUBSCRIPTION_ID
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    return settings
+
+
+class TestWebhookVerification:
+    async def test_echoes_challenge(self, client: AsyncClient):
+        with patch("app.routers.strava.get_settings", return_value=_settings()):
+            response = await client.get(
+                "/api/v1/strava/webhook",
+                params={
+                    "hub.mode": "subscribe",
+                    "hub.challenge": "15f7d1a91c1f40f8a748fd134752feb3",
+                    "hub.verify_token": "s3cret",
+                },
+            )
+        assert response.status_code == 200
+        assert response.json() == {"hub.challenge": "15f7d1a91c1f40f8a748fd134752feb3"}
+
+    async def test_rejects_wrong_token(self, client: AsyncClient):
+        with patch("app.routers.strava.get_settings", return_value=_settings()):
+            response = await client.get(
+                "/api/v1/strava/webhook",
+                params={"hub.mode": "subscribe", "hub.challenge": "x", "hub.verify_token": "nope"},
+            )
+        assert response.status_code == 403
+
+    async def test_rejects_foreign_subscription(self, client: AsyncClient):
+        payload = {**RECORDED_EVENTS[0]["payload"], "subscription_id": 1}
+        with patch("app.routers.strava.get_settings", return_value=_settings()):
+            response = await client.post("/api/v1/strava/webhook", json=payload)
+        assert response.status_code == 403
+
+    async def test_rejects_events_until_subscription_configured(self, client: AsyncClient):
+        settings = _settings(strava_webhook_subscription_id=None)
+        with patch("app.routers.strava.get_settings", return_value=settings):
+            response = await client.post(
+                "/api/v1/strava/webhook", json=RECORDED_EVENTS[0]["payload"]
+            )
+        assert response.status_code == 403
+        assert strava_webhook.get_event_queue().empty()
+
+
+class TestWebhookReplay:
+    async def test_replays_recorded_events(
+        self, client: AsyncClient, session: AsyncSession, test_user: User
+    ):
+        test_user.strava_athlete_id = ATHLETE_ID
+        test_user.strava_access_token = "access"
+        test_user.strava_refresh_token = "refresh"
+        test_user.strava_expires_at = 4_102_444_800  # 2100-01-01
+        goal = Goal(
+            user_id=test_user.id,
+            title="Run 3x a week",
+            goal_type=GoalType.PERIODIC,
+            frequency=Frequency.WEEKLY,
+            target_count=3,
+            value_type=ValueType.NUMERIC,
+            value_unit="km",
+            start_date=date(2025, 10, 1),
+            strava_activity_types=["Run"],
+        )
+        session.add_all([test_user, goal])
+        await session.commit()
+
+        async def completions() -> dict[int, float | None]:
+            rows = await session.execute(
+                select(GoalCompletion.strava_activity_id, GoalCompletion.value)
+            )
+            return dict(rows.all())
+
+        recorded: dict = {}
+
+        async def strava_stand_in(access_token: str, activity_id: int) -> dict:
+            if recorded["aspect_type"] == "delete":
+                raise _http_error(404)  # Strava confirms the delete
+            activity = recorded["activity"]
+            assert activity is not None, "event should not need an API call"
+            assert activity["id"] == activity_id
+            return activity
+
+        observed = []
+        with (
+            patch("app.routers.strava.get_settings", return_value=_settings()),
+            patch("app.services.strava_webhook.fetch_activity", side_effect=strava_stand_in),
+            patch(
+                "app.services.strava_webhook.refresh_strava_token",
+                side_effect=_http_error(400),  # the refresh token was revoked
+            ),
+        ):
+            for entry in RECORDED_EVENTS:
+                recorded["activity"] = entry["activity"]
+                recorded["aspect_type"] = entry["payload"]["aspect_type"]
+                response = await client.post("/api/v1/strava/webhook", json=entry["payload"])
+                assert response.status_code == 200
+                assert await drain_event_queue(session) == 1
+                observed.append(await completions())
+
+        create_run, rename, create_ride, ride_to_run, delete_run, deauth = observed
+        assert create_run == {16021040001: 8.05}
+        assert rename == create_run
+        assert create_ride == create_run
+        assert ride_to_run == {16021040001: 8.05, 16021040002: 10.15}
+        assert delete_run == {16021040002: 10.15}
+        assert deauth == delete_run
+
+        stored = (await session.execute(select(StravaActivity))).scalars().all()
+        assert [(a.id, a.type) for a in stored] == [(16021040002, "Run")]
+        await session.refresh(test_user)
+        assert test_user.strava_connected is False
+
+    async def test_rename_updates_store_without_api_call(
+        self, client: AsyncClient, session: AsyncSession, test_user: User
+    ):
+        test_user.strava_athlete_id = ATHLETE_ID
+        test_user.strava_access_token = "access"
+        session.add(test_user)
+        session.add(
+            StravaActivity(
+                id=16021040001,
+                user_id=test_user.id,
+                type="Run",
+                sport_type="Run",
+                name="Morning Run",
+                start_date=datetime(2025, 10, 19, 6, 40, tzinfo=UTC),
+                local_date=date(2025, 10, 19),
+            )
+        )
+        await session.commit()
+
+        with (
+            patch("app.routers.strava.get_settings", return_value=_settings()),
+            patch("app.services.strava_webhook.fetch_activity") as fetch,
+        ):
+            await client.post("/api/v1/strava/webhook", json=RECORDED_EVENTS[1]["payload"])
+            await drain_event_queue(session)
+
+        fetch.assert_not_called()
+        stored = (await session.execute(select(StravaActivity))).scalars().one()
+        await session.refresh(stored)
+        assert stored.name == "Tempo Run"
+
+
+def _event(object_id: int, aspect_type: str = "update", **fields) -> StravaWebhookEvent:
+    return StravaWebhookEvent(
+        object_type="activity",
+        object_id=object_id,
+        aspect_type=aspect_type,
+        owner_id=int(ATHLETE_ID),
+        subscription_id=SUBSCRIPTION_ID,
+        event_time=1760856000,
+        **fields,
+    )
+
+
+async def _connected_with_activity(session: AsyncSession, user: User) -> None:
+    user.strava_athlete_id = ATHLETE_ID
+    user.strava_access_token = "access"
+    user.strava_refresh_token = "refresh"
+    user.strava_expires_at = 4_102_444_800  # 2100-01-01
+    session.add(user)
+    session.add(
+        StravaActivity(
+            id=16021040001,
+            user_id=user.id,
+            type="Run",
+            start_date=datetime(2025, 10, 19, 6, 40, tzinfo=UTC),
+            local_date=date(2025, 10, 19),
+        )
+    )
+    await session.commit()
+
+
+class TestForgedEvents:
+    async def test_delete_for_an_activity_strava_still_has_is_ignored(
+        self, session: AsyncSession, test_user: User
+    ):
+        await _connected_with_activity(session, test_user)
+        event = _event(16021040001, aspect_type="delete")
+        with patch("app.services.strava_webhook.fetch_activity", return_value={"id": 16021040001}):
+            await process_event(session, event)
+        await session.commit()
+
+        assert await session.get(StravaActivity, 16021040001) is not None
+
+    async def test_deauth_while_the_token_still_refreshes_is_ignored(
+        self, session: AsyncSession, test_user: User
+    ):
+        await _connected_with_activity(session, test_user)
+        event = StravaWebhookEvent(
+            object_type="athlete",
+            object_id=int(ATHLETE_ID),
+            aspect_type="update",
+            owner_id=int(ATHLETE_ID),
+            subscription_id=SUBSCRIPTION_ID,
+            event_time=1760856000,
+            updates={"authorized": "false"},
+        )
+        refreshed = {"access_token": "new", "refresh_token": "refresh2", "expires_at": 1}
+        with patch("app.services.strava_webhook.refresh_strava_token", return_value=refreshed):
+            await process_event(session, event)
+        await session.commit()
+
+        await session.refresh(test_user)
+        assert test_user.strava_connected is True
+
+
+class TestEventProcessing:
+    async def test_unexpected_error_does_not_stop_the_drain(
+        self, session: AsyncSession, test_user: User
+    ):
+        test_user.strava_athlete_id = ATHLETE_ID
+        test_user.strava_access_token = "access"
+        session.add(test_user)
+        session.add(
+            StravaActivity(
+                id=2,
+                user_id=test_user.id,
+                start_date=datetime(2025, 10, 19, 6, 40, tzinfo=UTC),
+                local_date=date(2025, 10, 19),
+            )
+        )
+        await session.commit()
+
+        async def flaky(session: AsyncSession, event: StravaWebhookEvent) -> None:
+            if event.object_id == 1:
+                # A database error, not an HTTP or validation one.
+                await session.execute(text("SELECT * FROM missing_table"))
+            await process_event(session, event)
+
+        enqueue_event(_event(1, updates={"title": "Broken"}))
+        enqueue_event(_event(2, updates={"title": "Renamed"}))
+        with patch("app.services.strava_webhook.process_event", flaky):
+            assert await drain_event_queue(session) == 2
+
+        stored = await session.get(StravaActivity, 2)
+        await session.refresh(stored)
+        assert stored.name == "Renamed"
+
+    async def test_stop_logs_events_left_in_the_queue(self):
+        stuck = asyncio.Event()
+        strava_webhook._worker = asyncio.create_task(stuck.wait())  # never consumes
+        enqueue_event(_event(1))
+        enqueue_event(_event(2))
+        try:
+            with capture_logs() as logs:
+                await stop_webhook_worker(timeout=0.01)
+        finally:
+            strava_webhook._queue = None
+
+        assert strava_webhook._worker is None
+        (dropped,) = [e for e in logs if e["event"] == "strava_webhook_events_dropped"]
+        assert dropped["count"] == 2
@@ -2,13 +2,21 @@
 
 import uuid
 
+import pytest
 from jose import JWTError, jwt
 
 from app.core.security import (
+    PASSWORD_HASH_DURATION,
+    PASSWORD_POOL_REJECTED,
+    PasswordPoolBusyError,
     create_access_token,
     decode_access_token,
     hash_password,
+    hash_password_async,
+    needs_rehash,
+    password_pool_stats,
     verify_password,
+    verify_password_async,
 )
 from app.core.settings import get_settings
 
@@ -35,6 +43,37 @@ class TestPasswordHashing:
         h2 = hash_password("mypassword")
         assert h1 != h2  # salt differs
 
+    def test_needs_rehash_follows_policy(self):
+        rounds = get_settings().password_bcrypt_rounds
+        assert needs_rehash(hash_password("pw", rounds=rounds)) is False
+        assert needs_rehash(hash_password("pw", rounds=4)) is True
+        legacy = hash_password("pw", rounds=rounds).replace("$2b$", "$2a$", 1)
+        assert needs_rehash(legacy) is True
+        assert needs_rehash("not-a-hash") is True
+
+
+class TestPasswordPool:
+    async def test_hash_and_verify_off_loop(self):
+        completed = password_pool_stats.completed
+        verified = PASSWORD_HASH_DURATION.count(op="verify_password")
+        hashed = await hash_password_async("mypassword")
+        assert await verify_password_async("mypassword", hashed) is True
+        assert await verify_password_async("wrongpassword", hashed) is False
+        assert password_pool_stats.completed == completed + 3
+        assert password_pool_stats.queued == 0
+        assert password_pool_stats.in_flight == 0
+        assert PASSWORD_HASH_DURATION.count(op="verify_password") == verified + 2
+
+    async def test_rejects_when_queue_full(self, monkeypatch):
+        await hash_password_async("warm-up")  # create the pool before shrinking its queue
+        monkeypatch.setattr(password_pool_stats, "max_queue", 0)
+        rejected = password_pool_stats.rejected
+        counted = PASSWORD_POOL_REJECTED.value()
+        with pytest.raises(PasswordPoolBusyError):
+            await verify_password_async("mypassword", hash_password("mypassword"))
+        assert password_pool_stats.rejected == rejected + 1
+        assert PASSWORD_POOL_REJECTED.value() == counted + 1
+
 
 class TestJWT:
     def test_create_and_decode_token(self):
@@ -5,6 +5,7 @@ from unittest.mock import patch
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.security import hash_password, needs_rehash, verify_password
 from app.models.user import UserCreate
 from app.schemas.user import User
 from app.services.auth import AuthError, authenticate_user, register_user
@@ -73,3 +74,18 @@ class TestAuthenticateUser:
         with pytest.raises(AuthError, match="disabled") as exc_info:
             await authenticate_user(session, "inactive@example.com", "testpassword")
         assert exc_info.value.status_code == 403
+
+    async def test_authenticate_rehashes_outdated_hash(
+        self, session: AsyncSession, test_user: User
+    ):
+        old_hash = hash_password("testpassword", rounds=4)
+        test_user.hashed_password = old_hash
+        await session.commit()
+
+        await authenticate_user(session, "testuser@example.com", "testpassword")
+        await session.commit()
+        await session.refresh(test_user)
+
+        assert test_user.hashed_password != old_hash
+        assert not needs_rehash(test_user.hashed_password)
+        assert verify_password("testpassword", test_user.hashed_password)
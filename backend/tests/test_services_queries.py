@@ -0,0 +1,133 @@
+"""Tests for the prebuilt goal/completion statements and row-projected read paths."""
+
+import uuid
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.goals import GoalRead
+from app.schemas.goals import Frequency, Goal, GoalCompletion, GoalType
+from app.schemas.user import User
+from app.services.completions import (
+    compute_period_start,
+    get_all_goals_trends,
+    get_goal_trends,
+    list_goals_with_progress,
+)
+from app.services.goals import delete_goal, get_goal, list_goals
+from tests.conftest import engine
+
+
+@pytest.fixture
+def cache_outcomes():
+    """Record each statement's compiled-cache outcome (e.g. "generated", "cached")."""
+    outcomes: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        outcomes.append(context.cache_hit.name)
+
+    event.listen(engine.sync_engine, "after_cursor_execute", _record)
+    yield outcomes
+    event.remove(engine.sync_engine, "after_cursor_execute", _record)
+
+
+async def _add_goals(session: AsyncSession, user: User, frequencies: list[Frequency]) -> list[Goal]:
+    goals = [
+        Goal(
+            user_id=user.id,
+            title=f"Goal {i}",
+            goal_type=GoalType.PERIODIC,
+            frequency=frequency,
+            target_count=2,
+            start_date=date.today() - timedelta(days=30),
+        )
+        for i, frequency in enumerate(frequencies)
+    ]
+    session.add_all(goals)
+    await session.commit()
+    return goals
+
+
+class TestPrebuiltStatements:
+    async def test_dashboard_counts_per_goal(self, session: AsyncSession, test_user: User):
+        weekly, daily = await _add_goals(session, test_user, [Frequency.WEEKLY, Frequency.DAILY])
+        for goal in (weekly, weekly, daily):
+            session.add(
+                GoalCompletion(
+                    goal_id=goal.id,
+                    completed_at=datetime.now(UTC),
+                    period_start=compute_period_start(goal.frequency, date.today()),
+                )
+            )
+        await session.commit()
+
+        progress = {p.id: p for p in await list_goals_with_progress(session, test_user.id)}
+        assert progress[weekly.id].period_completions == 2
+        assert progress[weekly.id].is_completed
+        assert progress[daily.id].period_completions == 1
+        assert not progress[daily.id].is_completed
+
+    async def test_repeat_calls_reuse_compiled_statements(
+        self, session: AsyncSession, test_user: User, cache_outcomes: list[str]
+    ):
+        goals = await _add_goals(session, test_user, [Frequency.WEEKLY])
+        await list_goals_with_progress(session, test_user.id)
+        await get_goal(session, goals[0].id, test_user.id)
+
+        # Different values and a longer IN list still hit the same cache entries.
+        await _add_goals(session, test_user, [Frequency.WEEKLY, Frequency.WEEKLY])
+        cache_outcomes.clear()
+        await list_goals_with_progress(session, test_user.id)
+        await get_goal(session, goals[0].id, test_user.id)
+        await list_goals(session, test_user.id)
+
+        assert cache_outcomes
+        assert set(cache_outcomes) == {"CACHE_HIT"}
+
+
+class TestRowProjections:
+    async def test_list_goals_builds_read_models(self, session: AsyncSession, test_user: User):
+        kept, dropped = await _add_goals(session, test_user, [Frequency.WEEKLY, Frequency.DAILY])
+        await delete_goal(session, dropped.id, test_user.id)
+        await session.commit()
+
+        active = await list_goals(session, test_user.id)
+        assert [type(g) for g in active] == [GoalRead]
+        assert active[0].id == kept.id
+        assert active[0].frequency == Frequency.WEEKLY
+        assert {g.id for g in await list_goals(session, test_user.id, active_only=False)} == {
+            kept.id,
+            dropped.id,
+        }
+
+    async def test_trends_from_rows(self, session: AsyncSession, test_user: User):
+        (goal,) = await _add_goals(session, test_user, [Frequency.DAILY])
+        today = date.today()
+        for value in (2.0, 4.0):
+            session.add(
+                GoalCompletion(
+                    goal_id=goal.id, completed_at=datetime.now(UTC), period_start=today, value=value
+                )
+            )
+        await session.commit()
+
+        start = today - timedelta(days=2)
+        trends = await get_goal_trends(
+            session, goal.id, test_user.id, start_date=start, end_date=today
+        )
+        assert trends is not None
+        assert trends.goal.id == goal.id
+        assert [p.completion_count for p in trends.periods] == [0, 0, 2]
+        assert trends.periods[-1].is_completed
+        assert trends.periods[-1].avg_value == 3.0
+
+        (all_trends,) = await get_all_goals_trends(
+            session, test_user.id, start_date=start, end_date=today
+        )
+        assert all_trends == trends
+        assert (
+            await get_goal_trends(session, goal.id, uuid.uuid4(), start_date=start, end_date=today)
+            is None
+        )
@@ -0,0 +1,202 @@
+"""Tests for the resumable Strava history backfill."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.schemas.strava import BackfillStatus, StravaActivity
+from app.schemas.user import User
+from app.services.strava import RateLimitStatus, StravaRateLimitError
+from app.services.strava_backfill import run_backfill, start_backfill
+
+PAGE_SIZE = 3
+
+
+def _history(count: int) -> list[dict]:
+    """Activities one day apart, newest first (as Strava returns them)."""
+    newest = datetime(2025, 6, 1, 8, 0, tzinfo=UTC)
+    return [
+        {
+            "id": 1000 + i,
+            "type": "Run",
+            "start_date": (newest - timedelta(days=i)).isoformat().replace("+00:00", "Z"),
+            "distance": 5000.0,
+            "moving_time": 1500,
+            "name": f"Run {i}",
+        }
+        for i in range(count)
+    ]
+
+
+def _fake_strava(history: list[dict], limits: RateLimitStatus | None = None) -> AsyncMock:
+    async def fetch_page(access_token, *, before=None, per_page=200):
+        older = [
+            a
+            for a in history
+            if before is None or datetime.fromisoformat(a["start_date"]).timestamp() < before
+        ]
+        return older[:per_page], limits
+
+    return AsyncMock(side_effect=fetch_page)
+
+
+def _settings(headroom: int = 0) -> MagicMock:
+    settings = MagicMock()
+    settings.strava_backfill_page_size = PAGE_SIZE
+    settings.strava_rate_limit_headroom = headroom
+    settings.strava_backfill_lease_seconds = 120
+    return settings
+
+
+async def _linked_user(session: AsyncSession, user: User) -> User:
+    user.strava_access_token = "access"
+    user.strava_refresh_token = "refresh"
+    user.strava_expires_at = 4_102_444_800  # 2100-01-01
+    session.add(user)
+    await session.commit()
+    return user
+
+
+class TestRunBackfill:
+    async def test_walks_history_in_pages(self, session: AsyncSession, test_user: User):
+        user = await _linked_user(session, test_user)
+        await start_backfill(session, user.id)
+        fetch = _fake_strava(_history(7))
+
+        with (
+            patch("app.services.strava_backfill.fetch_athlete_activities_page", fetch),
+            patch("app.services.strava_backfill.get_settings", return_value=_settings()),
+        ):
+            job = await run_backfill(session, user.id)
+
+        assert job.status == BackfillStatus.COMPLETED
+        assert job.pages_fetched == 3
+        assert job.activities_ingested == 7
+        stored = (await session.execute(select(StravaActivity))).scalars().all()
+        assert len(stored) == 7
+
+    async def test_resumes_from_checkpoint(self, session: AsyncSession, test_user: User):
+        user = await _linked_user(session, test_user)
+        await start_backfill(session, user.id)
+        history = _history(7)
+
+        # First run dies on the second page.
+        calls = {"n": 0}
+        healthy = _fake_strava(history)
+
+        async def flaky(*args, **kwargs):
+            calls["n"] += 1
+            if calls["n"] == 2:
+                raise httpx.ConnectError("boom")
+            return await healthy(*args, **kwargs)
+
+        with (
+            patch("app.services.strava_backfill.fetch_athlete_activities_page", flaky),
+            patch("app.services.strava_backfill.get_settings", return_value=_settings()),
+        ):
+            job = await run_backfill(session, user.id)
+        assert job.status == BackfillStatus.FAILED
+        assert job.activities_ingested == PAGE_SIZE
+        cursor = job.cursor_before
+
+        await start_backfill(session, user.id)
+        fetch = _fake_strava(history)
+        with (
+            patch("app.services.strava_backfill.fetch_athlete_activities_page", fetch),
+            patch("app.services.strava_backfill.get_settings", return_value=_settings()),
+        ):
+            job = await run_backfill(session, user.id)
+
+        assert fetch.await_args_list[0].kwargs["before"] == cursor
+        assert job.status == BackfillStatus.COMPLETED
+        assert job.activities_ingested == 7
+
+    async def test_waits_out_rate_limit(self, session: AsyncSession, test_user: User):
+        user = await _linked_user(session, test_user)
+        await start_backfill(session, user.id)
+        healthy = _fake_strava(_history(2))
+        errors = [StravaRateLimitError(120)]
+
+        async def fetch_page(*args, **kwargs):
+            if errors:
+                raise errors.pop()
+            return await healthy(*args, **kwargs)
+
+        sleep = AsyncMock()
+        with (
+            patch("app.services.strava_backfill.fetch_athlete_activities_page", fetch_page),
+            patch("app.services.strava_backfill.get_settings", return_value=_settings()),
+            patch("app.services.strava_backfill.asyncio.sleep", sleep),
+        ):
+            job = await run_backfill(session, user.id)
+
+        sleep.assert_awaited_once_with(120)
+        assert job.status == BackfillStatus.COMPLETED
+        assert job.activities_ingested == 2
+
+    async def test_skips_job_leased_by_another_worker(self, session: AsyncSession, test_user: User):
+        user = await _linked_user(session, test_user)
+        job = await start_backfill(session, user.id)
+        job.lease_owner = "other-pod:1:abcd"
+        job.lease_expires_at = datetime.now(UTC) + timedelta(minutes=1)
+        await session.commit()
+        fetch = _fake_strava(_history(2))
+
+        with (
+            patch("app.services.strava_backfill.fetch_athlete_activities_page", fetch),
+            patch("app.services.strava_backfill.get_settings", return_value=_settings()),
+        ):
+            job = await run_backfill(session, user.id)
+
+        fetch.assert_not_awaited()
+        assert job.status == BackfillStatus.PENDING
+        assert job.lease_owner == "other-pod:1:abcd"
+
+    async def test_takes_over_an_expired_lease(self, session: AsyncSession, test_user: User):
+        user = await _linked_user(session, test_user)
+        job = await start_backfill(session, user.id)
+        job.status = BackfillStatus.RUNNING
+        job.lease_owner = "crashed-pod:1:abcd"
+        job.lease_expires_at = datetime.now(UTC) - timedelta(seconds=1)
+        await session.commit()
+
+        with (
+            patch("app.services.strava_backfill.fetch_athlete_activities_page", _fake_strava([])),
+            patch("app.services.strava_backfill.get_settings", return_value=_settings()),
+        ):
+            job = await run_backfill(session, user.id)
+
+        assert job.status == BackfillStatus.COMPLETED
+        assert job.lease_owner is None
+
+    def test_rate_limit_headers(self):
+        headers = httpx.Headers({"X-RateLimit-Limit": "200,2000", "X-RateLimit-Usage": "198,500"})
+        limits = RateLimitStatus.from_headers(headers)
+        assert limits.remaining() == 2
+        assert limits.seconds_until_reset(now=900 * 10 + 60) == 840
+
+
+class TestBackfillRoutes:
+    async def test_status_not_found(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get("/api/v1/strava/backfill", headers=auth_headers)
+        assert response.status_code == 404
+
+    async def test_status_reports_progress(
+        self, client: AsyncClient, session: AsyncSession, test_user: User, auth_headers: dict
+    ):
+        job = await start_backfill(session, test_user.id)
+        job.pages_fetched = 2
+        job.activities_ingested = 150
+        job.cursor_before = 1_700_000_000
+        await session.commit()
+
+        response = await client.get("/api/v1/strava/backfill", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "pending"
+        assert data["activities_ingested"] == 150
+        assert data["oldest_activity_at"].startswith("2023-11-14")
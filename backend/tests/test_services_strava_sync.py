@@ -0,0 +1,378 @@
+"""Tests for the compiled Strava matcher and the activity → goal sync."""
+
+import uuid
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.goals import GoalCreate, GoalUpdate
+from app.schemas.goals import Frequency, Goal, GoalCompletion, GoalType, ValueType
+from app.schemas.strava import StravaActivity
+from app.schemas.user import User
+from app.services.goals import create_goal, update_goal
+from app.services.strava import close_http_client, set_http_client
+from app.services.strava_matcher import GoalMatcher, parse_activity, resolve_unit
+from app.services.strava_store import ingest_activities
+from app.services.strava_sync import apply_activities, sync_strava_to_goals
+from benchmarks.strava_emulator import EmulatorConfig, StravaEmulator
+
+
+def _activity(act_id: int, day: date, *, type_: str = "Run", **extra) -> dict:
+    return {
+        "id": act_id,
+        "type": type_,
+        "sport_type": extra.pop("sport_type", type_),
+        "start_date": f"{day.isoformat()}T07:30:00Z",
+        "distance": 5000.0,
+        "moving_time": 1500,
+        "name": f"Activity {act_id}",
+        **extra,
+    }
+
+
+def _goal(user_id, **kwargs) -> Goal:
+    defaults = {
+        "user_id": user_id,
+        "title": "Run",
+        "goal_type": GoalType.PERIODIC,
+        "frequency": Frequency.WEEKLY,
+        "target_count": 3,
+        "start_date": date.today() - timedelta(days=60),
+        "strava_activity_types": ["Run"],
+    }
+    return Goal(**{**defaults, **kwargs})
+
+
+class TestResolveUnit:
+    def test_known_aliases(self):
+        assert resolve_unit("km").name == "km"
+        assert resolve_unit("Miles").name == "mi"
+        assert resolve_unit("minutes").name == "min"
+        assert resolve_unit("hrs").name == "h"
+
+    def test_minutes_do_not_resolve_to_miles(self):
+        assert resolve_unit("min").name == "min"
+
+    def test_multi_word_unit(self):
+        assert resolve_unit("km run").name == "km"
+
+    def test_unknown_unit(self):
+        assert resolve_unit("pages") is None
+        assert resolve_unit(None) is None
+
+    def test_one_letter_units_are_not_guessed(self):
+        for unit in ("5k", "5 k", "10h", "10 h", "k", "h", "m"):
+            assert resolve_unit(unit) is None, unit
+
+
+class TestGoalMatcher:
+    def test_matches_only_indexed_types(self, test_user: User):
+        run = _goal(test_user.id, strava_activity_types=["Run"])
+        ride = _goal(test_user.id, strava_activity_types=["Ride"])
+        matcher = GoalMatcher([run, ride])
+
+        activity = parse_activity(_activity(1, date.today()))
+        assert [g.id for g in matcher.match(activity)] == [run.id]
+
+    def test_matches_sport_type_once(self, test_user: User):
+        goal = _goal(test_user.id, strava_activity_types=["Run", "TrailRun"])
+        matcher = GoalMatcher([goal])
+
+        activity = parse_activity(_activity(1, date.today(), sport_type="TrailRun"))
+        assert [g.id for g in matcher.match(activity)] == [goal.id]
+
+    def test_respects_date_window(self, test_user: User):
+        goal = _goal(
+            test_user.id,
+            start_date=date.today() - timedelta(days=5),
+            end_date=date.today() - timedelta(days=1),
+        )
+        matcher = GoalMatcher([goal])
+
+        assert matcher.match(parse_activity(_activity(1, date.today()))) == []
+        assert matcher.match(parse_activity(_activity(2, date.today() - timedelta(days=10)))) == []
+        inside = parse_activity(_activity(3, date.today() - timedelta(days=2)))
+        assert len(matcher.match(inside)) == 1
+
+    def test_skips_goals_without_types(self, test_user: User):
+        matcher = GoalMatcher([_goal(test_user.id, strava_activity_types=[])])
+        assert not matcher
+
+    def test_parse_activity_rejects_bad_payloads(self):
+        assert parse_activity({"type": "Run"}) is None
+        assert parse_activity({"id": 1, "start_date": "not-a-date"}) is None
+
+
+class TestSyncStravaToGoals:
+    async def _connect(self, session: AsyncSession, user: User) -> User:
+        user.strava_access_token = "access"
+        user.strava_refresh_token = "refresh"
+        user.strava_expires_at = 4_102_444_800  # 2100-01-01
+        session.add(user)
+        await session.commit()
+        return user
+
+    async def test_creates_completions_with_values(self, session: AsyncSession, test_user: User):
+        user = await self._connect(session, test_user)
+        goal = _goal(user.id, value_type=ValueType.NUMERIC, value_unit="km", target_count=5)
+        session.add(goal)
+        await session.commit()
+
+        today = date.today()
+        activities = [_activity(1, today), _activity(2, today, type_="Ride")]
+        with patch(
+            "app.services.strava_sync.fetch_athlete_activities",
+            AsyncMock(return_value=activities),
+        ):
+            result = await sync_strava_to_goals(session, user)
+
+        assert result == {"activities_fetched": 2, "completions_added": 1, "goals_updated": 1}
+        completions = (await session.execute(select(GoalCompletion))).scalars().all()
+        assert len(completions) == 1
+        assert completions[0].strava_activity_id == 1
+        assert completions[0].value == 5.0
+
+    async def test_is_idempotent_and_respects_target(self, session: AsyncSession, test_user: User):
+        user = await self._connect(session, test_user)
+        session.add(_goal(user.id, frequency=Frequency.DAILY, target_count=1))
+        await session.commit()
+
+        today = date.today()
+        activities = [_activity(1, today), _activity(2, today)]
+        with patch(
+            "app.services.strava_sync.fetch_athlete_activities",
+            AsyncMock(return_value=activities),
+        ):
+            first = await sync_strava_to_goals(session, user)
+            second = await sync_strava_to_goals(session, user)
+
+        assert first["completions_added"] == 1
+        assert second["completions_added"] == 0
+
+    async def test_statement_count_does_not_grow_with_activities(
+        self, session: AsyncSession, test_user: User, max_queries
+    ):
+        user = await self._connect(session, test_user)
+        session.add(_goal(user.id, frequency=Frequency.DAILY, target_count=1))
+        await session.commit()
+
+        today = date.today()
+        activities = [_activity(i, today - timedelta(days=i)) for i in range(1, 31)]
+        with (
+            patch(
+                "app.services.strava_sync.fetch_athlete_activities",
+                AsyncMock(return_value=activities),
+            ),
+            max_queries(7),
+        ):
+            result = await sync_strava_to_goals(session, user)
+
+        assert result["completions_added"] == 30
+
+    async def test_late_uploads_inside_the_lookback_are_matched(
+        self, session: AsyncSession, test_user: User
+    ):
+        user = await self._connect(session, test_user)
+        session.add(_goal(user.id, frequency=Frequency.DAILY, target_count=1))
+        yesterday = date.today() - timedelta(days=1)
+        await ingest_activities(session, user.id, [parse_activity(_activity(1, yesterday))])
+        await session.commit()
+
+        # Activity 2 started before the newest stored one but was uploaded later.
+        late = _activity(2, date.today() - timedelta(days=5))
+        fetch = AsyncMock(return_value=[_activity(1, yesterday), late])
+        with patch("app.services.strava_sync.fetch_athlete_activities", fetch):
+            result = await sync_strava_to_goals(session, user)
+
+        lookback = datetime.now(UTC) - timedelta(days=31)
+        assert abs(fetch.await_args.kwargs["after"] - lookback.timestamp()) < 60
+        assert result["completions_added"] == 2  # activity 1 was stored, never matched
+        completions = (await session.execute(select(GoalCompletion))).scalars().all()
+        assert sorted(c.strava_activity_id for c in completions) == [1, 2]
+
+    async def test_activity_edited_on_strava_is_matched_on_next_sync(
+        self, session: AsyncSession, test_user: User
+    ):
+        user = await self._connect(session, test_user)
+        session.add(_goal(user.id, frequency=Frequency.DAILY, target_count=1))
+        yesterday = date.today() - timedelta(days=1)
+        await session.commit()
+
+        synced = []
+        for type_ in ("Ride", "Run"):  # recorded as a ride, corrected to a run
+            fetch = AsyncMock(return_value=[_activity(1, yesterday, type_=type_)])
+            with patch("app.services.strava_sync.fetch_athlete_activities", fetch):
+                synced.append(await sync_strava_to_goals(session, user))
+            await session.commit()
+
+        assert [r["completions_added"] for r in synced] == [0, 1]
+        fetch = AsyncMock(return_value=[_activity(1, yesterday)])
+        with patch("app.services.strava_sync.fetch_athlete_activities", fetch):
+            assert (await sync_strava_to_goals(session, user))["completions_added"] == 0
+
+    async def test_refreshes_and_syncs_against_emulator(
+        self, session: AsyncSession, test_user: User
+    ):
+        emulator = StravaEmulator(EmulatorConfig(athletes=1, activities_per_athlete=60))
+        athlete_id = next(iter(emulator.athletes))
+        tokens = emulator.issue_tokens(athlete_id)
+        test_user.strava_athlete_id = str(athlete_id)
+        test_user.strava_access_token = "expired"
+        test_user.strava_refresh_token = tokens["refresh_token"]
+        test_user.strava_expires_at = 0
+        session.add_all([test_user, _goal(test_user.id, strava_activity_types=["Run", "Ride"])])
+        await session.commit()
+
+        settings = MagicMock(strava_id="client", strava_secret="secret")
+        set_http_client(emulator.client())
+        try:
+            with patch("app.services.strava.get_settings", return_value=settings):
+                first = await sync_strava_to_goals(session, test_user)
+                await session.commit()
+                second = await sync_strava_to_goals(session, test_user)
+        finally:
+            await close_http_client()
+
+        assert emulator.stats.requests == {"token": 1, "activities": 2}
+        assert first["activities_fetched"] > 0
+        assert first["completions_added"] > 0
+        assert second["activities_fetched"] == first["activities_fetched"]
+        assert second["completions_added"] == 0
+        await session.refresh(test_user)
+        assert test_user.strava_expires_at > 0
+
+
+class TestApplyActivities:
+    async def test_concurrent_duplicate_is_skipped(self, session: AsyncSession, test_user: User):
+        goal = _goal(test_user.id, frequency=Frequency.DAILY)
+        session.add(goal)
+        await session.flush()
+        activity = parse_activity(_activity(1, date.today()))
+
+        # Another worker records the same match right after the duplicate check.
+        real_execute = session.execute
+        raced = []
+
+        async def racing_execute(stmt, *args, **kwargs):
+            result = await real_execute(stmt, *args, **kwargs)
+            if not raced:
+                raced.append(True)
+                await real_execute(
+                    insert(GoalCompletion.__table__),
+                    {
+                        "id": uuid.uuid4(),
+                        "goal_id": goal.id,
+                        "completed_at": activity.started_at,
+                        "period_start": activity.local_date,
+                        "strava_activity_id": activity.id,
+                        "created_at": datetime.now(UTC),
+                    },
+                )
+            return result
+
+        with patch.object(session, "execute", racing_execute):
+            added, goals_updated = await apply_activities(session, GoalMatcher([goal]), [activity])
+
+        assert (added, goals_updated) == (0, set())
+        assert len(await _completions(session, goal)) == 1
+
+
+async def _completions(session: AsyncSession, goal: Goal) -> list[GoalCompletion]:
+    stmt = select(GoalCompletion).where(GoalCompletion.goal_id == goal.id)
+    return list((await session.execute(stmt)).scalars().all())
+
+
+class TestStravaActivityStore:
+    async def test_ingest_deduplicates_by_activity_id(self, session: AsyncSession, test_user: User):
+        today = date.today()
+        first = await ingest_activities(
+            session, test_user.id, [parse_activity(_activity(1, today))]
+        )
+        renamed = parse_activity({**_activity(1, today), "name": "Renamed"})
+        second = await ingest_activities(
+            session, test_user.id, [renamed, parse_activity(_activity(2, today))]
+        )
+
+        assert [a.id for a in first] == [1]
+        assert [a.id for a in second] == [2]
+        rows = (await session.execute(select(StravaActivity))).scalars().all()
+        assert len(rows) == 2
+        await session.refresh(rows[0])
+        assert {r.name for r in rows} == {"Renamed", "Activity 2"}
+
+    async def test_create_goal_backfills_from_store(self, session: AsyncSession, test_user: User):
+        days = [date.today() - timedelta(days=n) for n in (1, 2, 40)]
+        await ingest_activities(
+            session,
+            test_user.id,
+            [parse_activity(_activity(i, d)) for i, d in enumerate(days, start=1)],
+        )
+
+        goal = await create_goal(
+            session,
+            test_user.id,
+            GoalCreate(
+                title="Run daily",
+                goal_type=GoalType.PERIODIC,
+                frequency=Frequency.DAILY,
+                start_date=date.today() - timedelta(days=7),
+                strava_activity_types=["Run"],
+            ),
+        )
+
+        completions = await _completions(session, goal)
+        assert sorted(c.strava_activity_id for c in completions) == [1, 2]
+
+    async def test_type_edit_rematches_from_store(self, session: AsyncSession, test_user: User):
+        day = date.today() - timedelta(days=1)
+        await ingest_activities(
+            session,
+            test_user.id,
+            [parse_activity(_activity(1, day)), parse_activity(_activity(2, day, type_="Ride"))],
+        )
+        goal = await create_goal(
+            session,
+            test_user.id,
+            GoalCreate(
+                title="Run",
+                goal_type=GoalType.PERIODIC,
+                frequency=Frequency.DAILY,
+                target_count=2,
+                start_date=day,
+                strava_activity_types=["Run"],
+            ),
+        )
+        assert [c.strava_activity_id for c in await _completions(session, goal)] == [1]
+
+        await update_goal(
+            session, goal.id, test_user.id, GoalUpdate(strava_activity_types=["Ride"])
+        )
+
+        assert [c.strava_activity_id for c in await _completions(session, goal)] == [2]
+
+    async def test_edit_keeps_completions_missing_from_store(
+        self, session: AsyncSession, test_user: User
+    ):
+        # Completions synced before the store existed have no stored activity.
+        goal = _goal(test_user.id, frequency=Frequency.DAILY, target_count=1)
+        session.add(goal)
+        start = date.today() - timedelta(days=10)
+        session.add_all(
+            GoalCompletion(
+                goal_id=goal.id,
+                completed_at=datetime.combine(start + timedelta(days=n), datetime.min.time()),
+                period_start=start + timedelta(days=n),
+                strava_activity_id=100 + n,
+            )
+            for n in range(10)
+        )
+        await session.flush()
+
+        await update_goal(session, goal.id, test_user.id, GoalUpdate(target_count=4))
+        assert len(await _completions(session, goal)) == 10
+
+        await update_goal(session, goal.id, test_user.id, GoalUpdate(frequency=Frequency.WEEKLY))
+        assert len(await _completions(session, goal)) == 10
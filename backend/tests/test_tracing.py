@@ -0,0 +1,193 @@
+"""Tests for request tracing: span nesting, instrumentation and exporters."""
+
+import json
+
+import httpx
+import pytest
+import structlog
+from httpx import AsyncClient
+from sqlalchemy import exc, text
+
+from app.core import tracing
+from app.core.database import create_engine
+from app.core.settings import Settings
+from app.core.tracing import (
+    FileSpanExporter,
+    OTLPSpanExporter,
+    Span,
+    shutdown_tracing,
+    span,
+    start_span,
+    start_tracing,
+    traced,
+)
+from app.services import strava
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+    def shutdown(self) -> None:
+        pass
+
+
+@pytest.fixture
+def traces():
+    """Start tracing into a list; call the fixture to flush and get the spans by name."""
+    exporter = ListExporter()
+
+    def start(sample_rate: float = 1.0) -> None:
+        start_tracing(exporter, sample_rate=sample_rate, flush_interval=0.01)
+
+    def finished() -> dict[str, Span]:
+        shutdown_tracing()
+        return {s.name: s for s in exporter.spans}
+
+    finished.start = start
+    start()
+    yield finished
+    shutdown_tracing()
+
+
+@traced
+async def outer() -> str:
+    with span("inner", {"step": 1}):
+        return await failing()
+
+
+@traced
+async def failing() -> str:
+    raise ValueError("nope")
+
+
+class TestSpans:
+    async def test_disabled_tracing_is_a_no_op(self):
+        with span("anything") as s:
+            assert s is None
+        assert start_span("leaf") is None
+        with pytest.raises(ValueError):
+            await outer()
+
+    async def test_nesting_follows_the_call_stack(self, traces):
+        with pytest.raises(ValueError):
+            await outer()
+        spans = traces()
+        root, inner, leaf = (
+            spans["test_tracing.outer"],
+            spans["inner"],
+            spans["test_tracing.failing"],
+        )
+        assert root.parent_id is None
+        assert inner.parent_id == root.span_id
+        assert leaf.parent_id == inner.span_id
+        assert {s.trace_id for s in spans.values()} == {root.trace_id}
+        assert inner.attributes == {"step": 1}
+        assert leaf.error == "ValueError: nope"
+        assert root.end_ns >= leaf.end_ns >= leaf.start_ns >= root.start_ns
+
+    async def test_unsampled_traces_record_nothing(self, traces):
+        shutdown_tracing()
+        traces.start(sample_rate=0.0)
+        with span("root") as root:
+            assert root is None
+            assert start_span("child") is None
+        assert traces() == {}
+
+
+class TestInstrumentation:
+    async def test_request_route_service_and_sql_spans(
+        self, client: AsyncClient, auth_headers, traces
+    ):
+        response = await client.get("/api/v1/goals", headers=auth_headers)
+        assert response.status_code == 200
+        spans = traces()
+
+        request = spans["GET /goals"]
+        service = spans["goals.list_goals"]
+        query = spans["SELECT"]
+        assert request.kind == "server"
+        assert request.attributes["http.route"] == "/goals"
+        assert request.attributes["http.response.status_code"] == 200
+        assert request.attributes["request_id"] == response.headers["X-Request-ID"]
+        assert service.parent_id == request.span_id
+        assert query.parent_id == service.span_id
+        assert query.attributes["db.statement"].startswith("SELECT goals.id")
+        # Log lines emitted during the request carry the trace ID.
+        assert structlog.contextvars.get_contextvars()["trace_id"] == request.trace_id_hex
+
+    async def test_failed_statement_span_records_the_error(self, tmp_path, traces):
+        engine = create_engine(
+            Settings(_env_file=None), url=f"sqlite+aiosqlite:///{tmp_path / 'x.db'}"
+        )
+        async with engine.connect() as conn:
+            with pytest.raises(exc.OperationalError):
+                await conn.execute(text("SELECT * FROM missing_table"))
+        await engine.dispose()
+        assert "no such table" in traces()["SELECT"].error
+
+    async def test_strava_calls_are_client_spans(self, traces):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"id": 1}))
+        strava.set_http_client(httpx.AsyncClient(transport=transport, base_url="http://strava"))
+        try:
+            await strava.fetch_athlete("token")
+        finally:
+            await strava.close_http_client()
+        spans = traces()
+        call = spans["GET /api/v3/athlete"]
+        assert call.kind == "client"
+        assert call.parent_id == spans["strava.fetch_athlete"].span_id
+        assert call.attributes["http.response.status_code"] == 200
+
+
+class TestExporters:
+    def _span(self) -> Span:
+        s = Span("GET /goals", {"http.route": "/goals", "n": 3}, "server", None)
+        s.end_ns = s.start_ns + 2_000_000
+        return s
+
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        path = tmp_path / "traces" / "spans.jsonl"
+        exporter = FileSpanExporter(str(path))
+        exporter.export([self._span(), self._span()])
+        exporter.shutdown()
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(lines) == 2
+        assert lines[0]["name"] == "GET /goals"
+        assert lines[0]["duration_ms"] == 2.0
+        assert lines[0]["attributes"] == {"http.route": "/goals", "n": 3}
+
+    def test_otlp_exporter_posts_otlp_json(self):
+        posted: list[httpx.Request] = []
+        exporter = OTLPSpanExporter("http://collector:4318/", "accountabilidash")
+        exporter._client = httpx.Client(
+            transport=httpx.MockTransport(lambda r: posted.append(r) or httpx.Response(200))
+        )
+        exporter.export([self._span()])
+        exporter.shutdown()
+
+        (request,) = posted
+        assert str(request.url) == "http://collector:4318/v1/traces"
+        (resource,) = json.loads(request.content)["resourceSpans"]
+        assert resource["resource"]["attributes"] == [
+            {"key": "service.name", "value": {"stringValue": "accountabilidash"}}
+        ]
+        (otlp_span,) = resource["scopeSpans"][0]["spans"]
+        assert otlp_span["kind"] == 2
+        assert len(otlp_span["traceId"]) == 32
+        assert {"key": "n", "value": {"intValue": "3"}} in otlp_span["attributes"]
+
+    def test_failed_exports_are_counted(self):
+        class Broken(ListExporter):
+            def export(self, spans):
+                raise OSError("collector down")
+
+        dropped = tracing.TRACE_SPANS_DROPPED.value(reason="export_failed")
+        start_tracing(Broken(), flush_interval=0.01)
+        with span("lost"):
+            pass
+        shutdown_tracing()
+        assert tracing.TRACE_SPANS_DROPPED.value(reason="export_failed") == dropped + 1
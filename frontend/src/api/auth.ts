@@ -15,6 +15,11 @@ export async function login(data: LoginRequest): Promise<TokenResponse> {
   return res.data;
 }
 
+/** Revoke a refresh token (and every token rotated from the same login). */
+export async function logout(refreshToken: string): Promise<void> {
+  await client.post(`${PREFIX}/logout`, { refresh_token: refreshToken });
+}
+
 /** Fetch the currently authenticated user. */
 export async function fetchCurrentUser(): Promise<User> {
   const res = await client.get<User>(`${PREFIX}/me`);
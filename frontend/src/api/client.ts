@@ -1,7 +1,9 @@
-import axios from "axios";
+import axios, { type InternalAxiosRequestConfig } from "axios";
 import { storage } from "@/lib/utils";
+import type { TokenResponse } from "@/types";
 
 const TOKEN_KEY = "access_token";
+const REFRESH_TOKEN_KEY = "refresh_token";
 
 /**
  * Pre-configured Axios instance.
@@ -23,12 +25,46 @@ client.interceptors.request.use((config) => {
   return config;
 });
 
-// ── Response interceptor: handle 401 globally ──────────────────────────────
+// ── Refresh: trade the refresh token for a new pair (one call at a time) ──
+let refreshing: Promise<string | null> | null = null;
+
+function refreshAccessToken(): Promise<string | null> {
+  const refreshToken = storage.get(REFRESH_TOKEN_KEY);
+  if (!refreshToken) return Promise.resolve(null);
+  refreshing ??= axios
+    .post<TokenResponse>(`${client.defaults.baseURL}/api/v1/auth/refresh`, {
+      refresh_token: refreshToken,
+    })
+    .then(({ data }) => {
+      storage.set(TOKEN_KEY, data.access_token);
+      if (data.refresh_token) storage.set(REFRESH_TOKEN_KEY, data.refresh_token);
+      return data.access_token;
+    })
+    .catch(() => null)
+    .finally(() => {
+      refreshing = null;
+    });
+  return refreshing;
+}
+
+// ── Response interceptor: refresh once, then handle 401 globally ───────────
 client.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
     if (axios.isAxiosError(error) && error.response?.status === 401) {
+      const original = error.config as
+        | (InternalAxiosRequestConfig & { _retried?: boolean })
+        | undefined;
+      if (original && !original._retried) {
+        original._retried = true;
+        const token = await refreshAccessToken();
+        if (token) {
+          original.headers.Authorization = `Bearer ${token}`;
+          return client(original);
+        }
+      }
       storage.remove(TOKEN_KEY);
+      storage.remove(REFRESH_TOKEN_KEY);
       // Redirect to login if not already there
       if (window.location.pathname !== "/login") {
         window.location.href = "/login";
@@ -38,5 +74,5 @@ client.interceptors.response.use(
   },
 );
 
-export { TOKEN_KEY };
+export { REFRESH_TOKEN_KEY, TOKEN_KEY };
 export default client;
@@ -7,7 +7,7 @@ import {
 } from "react";
 import { authApi } from "@/api";
 import { storage } from "@/lib/utils";
-import { TOKEN_KEY } from "@/api/client";
+import { REFRESH_TOKEN_KEY, TOKEN_KEY } from "@/api/client";
 import type { LoginRequest, RegisterRequest, User } from "@/types";
 import { AuthContext } from "./auth-context";
 
@@ -45,8 +45,9 @@ export function AuthProvider({ children }: { children: ReactNode }) {
   }, []);
 
   const login = useCallback(async (data: LoginRequest) => {
-    const { access_token } = await authApi.login(data);
+    const { access_token, refresh_token } = await authApi.login(data);
     storage.set(TOKEN_KEY, access_token);
+    if (refresh_token) storage.set(REFRESH_TOKEN_KEY, refresh_token);
     const me = await authApi.fetchCurrentUser();
     setUser(me);
   }, []);
@@ -61,7 +62,10 @@ export function AuthProvider({ children }: { children: ReactNode }) {
   );
 
   const logout = useCallback(() => {
+    const refreshToken = storage.get(REFRESH_TOKEN_KEY);
+    if (refreshToken) authApi.logout(refreshToken).catch(() => {});
     storage.remove(TOKEN_KEY);
+    storage.remove(REFRESH_TOKEN_KEY);
     setUser(null);
   }, []);
 
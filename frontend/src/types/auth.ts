@@ -15,4 +15,5 @@ export interface RegisterRequest {
 export interface TokenResponse {
   access_token: string;
   token_type: string;
+  refresh_token?: string | null;
 }